@@ -0,0 +1,33 @@
+import asyncio
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException
+
+from app import config
+from app.registry import registry
+
+router = APIRouter(prefix="/admin")
+
+
+def _check_token(token: str | None):
+    # Disabled (404) unless ADMIN_TOKEN is configured
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token, config.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.post("/reload")
+async def reload_index(force: bool = False, x_admin_token: str | None = Header(None)):
+    """
+    Swap in the index version the manifest points at, without a restart.
+    Only the worker answering this request reloads; the others pick the new
+    version up through their manifest watcher.
+    """
+    _check_token(x_admin_token)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(None, registry.reload_vector_store, force)
+    except Exception as e:
+        # The old index is still being served
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
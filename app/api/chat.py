@@ -1,27 +1,100 @@
+import json
+
 from fastapi import APIRouter
-from pydantic import BaseModel
-from app.rag.rag_pipeline import get_rag_pipeline
+from fastapi.responses import StreamingResponse
+
+from app import config
+from app.models.schemas import BatchChatRequest, ChatRequest, SearchRequest
+from app.registry import registry
 
 # Create router (NO prefix here)
 router = APIRouter()
 
-# Initialize RAG pipeline once
-rag_pipeline = get_rag_pipeline()
-
-
-class ChatRequest(BaseModel):
-    query: str
-    language: str = "English"
-    return_sources: bool = False
-
 
 @router.post("/chat")
-def chat(request: ChatRequest):
+async def chat(request: ChatRequest):
     """
     Main chat endpoint for Vidyamitra
     """
-    return rag_pipeline.query(
+    rag_pipeline = await registry.arag_pipeline()
+    return await rag_pipeline.aquery(
         user_query=request.query,
         language=request.language,
         return_sources=request.return_sources,
+        use_cache=request.use_cache,
+        filters=request.filters,
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint (Server-Sent Events)
+    """
+
+    async def event_stream():
+        try:
+            rag_pipeline = await registry.arag_pipeline()
+            async for event, data in rag_pipeline.astream(
+                user_query=request.query,
+                language=request.language,
+                return_sources=request.return_sources,
+                use_cache=request.use_cache,
+                filters=request.filters,
+            ):
+                yield _sse(event, data)
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
     )
+
+
+@router.post("/chat/batch")
+async def chat_batch(request: BatchChatRequest):
+    """
+    Batch chat endpoint: one retrieval pass for all queries, bounded-parallel
+    LLM calls, results streamed as NDJSON lines in completion order
+    """
+
+    async def result_stream():
+        rag_pipeline = await registry.arag_pipeline()
+        async for index, response in rag_pipeline.aquery_batch(
+            request.queries,
+            language=request.language,
+            return_sources=request.return_sources,
+            use_cache=request.use_cache,
+            concurrency=min(request.concurrency, config.BATCH_MAX_CONCURRENCY),
+            filters=request.filters,
+        ):
+            line = {"index": index, "query": request.queries[index], **response}
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+@router.post("/search")
+async def search(request: SearchRequest):
+    """
+    Retrieval only: the context chunks /chat would answer from, without an
+    LLM call
+    """
+    rag_pipeline = await registry.arag_pipeline()
+    chunks = await rag_pipeline.aretrieve(request.query, filters=request.filters)
+    return {
+        "query": request.query,
+        "results": [
+            {"text": c.get("text", ""), "metadata": c.get("metadata", {}), "score": c.get("score", 0)}
+            for c in chunks
+        ],
+    }
@@ -0,0 +1,232 @@
+"""
+Runtime Configuration Module for Vidyamitra
+Central place for tunables; every value can be overridden via environment
+variables (app.main loads .env before anything reads these)
+"""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# ---------------------------
+# Startup & serving
+# ---------------------------
+# Load models and index in the background at startup; when off they load on
+# the first request
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "1") == "1"
+
+# Memory-map the serving FAISS index read-only instead of reading it into
+# each process, so all workers share one copy through the page cache
+INDEX_MMAP = os.getenv("INDEX_MMAP", "1") == "1"
+
+# Index versions live under this directory (manifest.json + versions/);
+# builds publish a new version, serving processes swap it in
+INDEX_ROOT = os.getenv("INDEX_ROOT", "data/vector_db")
+
+# Published versions kept on disk (for rollback), the current one included
+INDEX_KEEP_VERSIONS = _env_int("INDEX_KEEP_VERSIONS", 3)
+
+# How often each process checks the manifest for a new version
+# (0 disables watching; POST /admin/reload still works)
+INDEX_RELOAD_INTERVAL_SECONDS = _env_float("INDEX_RELOAD_INTERVAL_SECONDS", 10.0)
+
+# Token required in X-Admin-Token by the /admin endpoints (empty disables them)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# ---------------------------
+# Upstream LLM
+# ---------------------------
+# Maximum number of in-flight Groq calls per process (async path)
+LLM_MAX_CONCURRENCY = _env_int("LLM_MAX_CONCURRENCY", 32)
+
+# Pooled HTTP connections kept open to the Groq API
+LLM_HTTP_MAX_CONNECTIONS = _env_int("LLM_HTTP_MAX_CONNECTIONS", 64)
+LLM_HTTP_TIMEOUT_SECONDS = _env_float("LLM_HTTP_TIMEOUT_SECONDS", 60.0)
+
+# Languages answered directly in one LLM call instead of
+# generate-in-English-then-translate, e.g. "Kannada,Hindi". Opt-in: empty
+# by default until answer quality has been evaluated per language
+DIRECT_GENERATION_LANGUAGES = {
+    lang.strip().lower()
+    for lang in os.getenv("DIRECT_GENERATION_LANGUAGES", "").split(",")
+    if lang.strip()
+}
+
+# Batch chat: upper bounds per /chat/batch request
+BATCH_MAX_QUERIES = _env_int("BATCH_MAX_QUERIES", 5000)
+BATCH_MAX_CONCURRENCY = _env_int("BATCH_MAX_CONCURRENCY", 16)
+
+# ---------------------------
+# Translation cache
+# ---------------------------
+TRANSLATION_CACHE_SIZE = _env_int("TRANSLATION_CACHE_SIZE", 2048)
+
+# SQLite file shared by workers; set to an empty string to disable the disk tier
+TRANSLATION_CACHE_DB = os.getenv(
+    "TRANSLATION_CACHE_DB", "data/cache/translations.sqlite3"
+)
+TRANSLATION_CACHE_DISK_MAX_ENTRIES = _env_int(
+    "TRANSLATION_CACHE_DISK_MAX_ENTRIES", 100_000
+)
+
+# ---------------------------
+# Ingestion
+# ---------------------------
+# Worker processes for page extraction / OCR
+INGEST_WORKERS = _env_int("INGEST_WORKERS", os.cpu_count() or 1)
+
+# Pages handed to a worker at a time (the PDF is opened once per batch)
+INGEST_PAGES_PER_TASK = _env_int("INGEST_PAGES_PER_TASK", 4)
+
+# Completed pages are recorded here so interrupted runs resume
+INGEST_CHECKPOINT_DIR = os.getenv("INGEST_CHECKPOINT_DIR", "data/cache/ingest")
+
+# Pages whose embedded text layer is shorter than this are OCR'd
+TEXT_LAYER_MIN_CHARS = _env_int("TEXT_LAYER_MIN_CHARS", 20)
+
+# Chunk size limit in embedding-model tokens (the model's max sequence
+# length, special tokens included) and tokens repeated between chunks
+CHUNK_MAX_TOKENS = _env_int("CHUNK_MAX_TOKENS", 128)
+CHUNK_OVERLAP_TOKENS = _env_int("CHUNK_OVERLAP_TOKENS", 16)
+
+# Near-duplicate chunk removal: estimated Jaccard similarity (over word
+# shingles) above which chunks count as copies, and MinHash signature size
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_THRESHOLD = _env_float("DEDUP_THRESHOLD", 0.85)
+DEDUP_NUM_PERM = _env_int("DEDUP_NUM_PERM", 128)
+
+# JSON file with text cleaning rules (drop_patterns, stopwords,
+# collapse_whitespace); empty uses the built-in defaults
+TEXT_CLEANING_RULES = os.getenv("TEXT_CLEANING_RULES", "")
+
+# OCR: Tesseract language / render DPI; binaries are looked up on PATH
+# unless these point at them explicitly
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_DPI = _env_int("OCR_DPI", 300)
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", "")
+POPPLER_PATH = os.getenv("POPPLER_PATH", "")
+
+# ---------------------------
+# Retrieval
+# ---------------------------
+# SentenceTransformer model used for chunks and queries
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "paraphrase-MiniLM-L3-v2")
+
+# How the model runs: torch (sentence-transformers) | onnx | onnx-int8
+# (ONNX Runtime, no torch; export first with scripts/export_onnx.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+
+# Exported ONNX models, one subdirectory per embedding model, and ONNX
+# Runtime threads per encode (0 = one per core)
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "data/models/onnx")
+ONNX_THREADS = _env_int("ONNX_THREADS", 0)
+
+# Chunks produced by ingestion (JSONL, one chunk per line; legacy .json
+# arrays are still readable)
+CHUNKS_FILE = os.getenv("CHUNKS_FILE", "data/processed/cleaned_chunks.jsonl")
+
+# Dedicated threads for CPU-bound embedding + FAISS work
+EMBEDDING_EXECUTOR_WORKERS = _env_int(
+    "EMBEDDING_EXECUTOR_WORKERS", min(4, os.cpu_count() or 1)
+)
+
+# Most chunks placed in the prompt per question
+RETRIEVAL_TOP_K = _env_int("RETRIEVAL_TOP_K", 3)
+
+# dense | hybrid (dense + BM25 fused with reciprocal rank fusion; falls back
+# to dense when the index has no lexical part)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+
+# Hybrid: candidates taken from each ranking, RRF damping constant and
+# BM25 term-frequency saturation / length normalization
+HYBRID_CANDIDATES = _env_int("HYBRID_CANDIDATES", 20)
+RRF_K = _env_int("RRF_K", 60)
+BM25_K1 = _env_float("BM25_K1", 1.2)
+BM25_B = _env_float("BM25_B", 0.75)
+
+# Metadata fields requests may filter on (ID sets are precomputed for every
+# value of these fields when the index is loaded)
+FILTER_FIELDS = [
+    name.strip()
+    for name in os.getenv("FILTER_FIELDS", "language,grade,subject,category,source").split(",")
+    if name.strip()
+]
+
+# Filters matching at most this many chunks are answered by an exact scan of
+# just those rows (full-precision vectors file) instead of a filtered index
+# search, which degrades when few vectors pass
+FILTER_EXACT_MAX_ROWS = _env_int("FILTER_EXACT_MAX_ROWS", 4096)
+
+# Query micro-batching: concurrent queries arriving within the window are
+# embedded and searched together (window 0 disables batching)
+EMBED_BATCH_WINDOW_MS = _env_float("EMBED_BATCH_WINDOW_MS", 5.0)
+EMBED_BATCH_MAX_SIZE = _env_int("EMBED_BATCH_MAX_SIZE", 32)
+
+# Persistent cache of corpus embeddings used by index builds
+# (empty string disables it)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "data/cache/embeddings")
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+
+# Texts per encode call when embedding the corpus
+EMBEDDING_BATCH_SIZE = _env_int("EMBEDDING_BATCH_SIZE", 256)
+
+# Chunks read from the chunks file per embedding step during index builds;
+# bounds build memory independently of corpus size
+EMBEDDING_STREAM_BATCH = _env_int("EMBEDDING_STREAM_BATCH", 4096)
+
+# FAISS index type used when building: flat | ivf_flat | ivf_pq | hnsw
+INDEX_TYPE = os.getenv("INDEX_TYPE", "flat")
+
+# How index vectors are stored: float32 | float16 | int8 (scalar
+# quantizer). Quantized indexes re-score their top candidates against the
+# full-precision vectors file when RESCORE_FACTOR > 1 (candidates fetched =
+# top_k * RESCORE_FACTOR)
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "float32")
+RESCORE_FACTOR = _env_int("RESCORE_FACTOR", 4)
+
+# IVF: number of centroids (0 = auto from corpus size) and lists probed per query
+IVF_NLIST = _env_int("IVF_NLIST", 0)
+IVF_NPROBE = _env_int("IVF_NPROBE", 8)
+
+# IVF-PQ: sub-quantizers and bits per code
+PQ_M = _env_int("PQ_M", 16)
+PQ_NBITS = _env_int("PQ_NBITS", 8)
+
+# HNSW: graph degree, build-time and search-time beam width
+HNSW_M = _env_int("HNSW_M", 32)
+HNSW_EF_CONSTRUCTION = _env_int("HNSW_EF_CONSTRUCTION", 80)
+HNSW_EF_SEARCH = _env_int("HNSW_EF_SEARCH", 64)
+
+# ---------------------------
+# Context assembly
+# ---------------------------
+# Candidates retrieved per question and reranked before packing the prompt
+# (0 = retrieve only RETRIEVAL_TOP_K, no reranking)
+CONTEXT_CANDIDATES = _env_int("CONTEXT_CANDIDATES", 12)
+
+# Maximal marginal relevance trade-off: 1.0 ranks by relevance only, lower
+# values prefer chunks unlike the ones already picked
+MMR_LAMBDA = _env_float("MMR_LAMBDA", 0.7)
+
+# Prompt-token budget for retrieved context; the chunk that would overflow
+# it is cut at a sentence boundary
+CONTEXT_MAX_TOKENS = _env_int("CONTEXT_MAX_TOKENS", 450)
+
+# ---------------------------
+# Semantic answer cache
+# ---------------------------
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") == "1"
+
+# Minimum cosine similarity between queries to reuse an answer
+SEMANTIC_CACHE_THRESHOLD = _env_float("SEMANTIC_CACHE_THRESHOLD", 0.92)
+SEMANTIC_CACHE_SIZE = _env_int("SEMANTIC_CACHE_SIZE", 1000)
+SEMANTIC_CACHE_TTL_SECONDS = _env_float("SEMANTIC_CACHE_TTL_SECONDS", 86400.0)
@@ -0,0 +1,263 @@
+"""
+Batch Ingestion Module for Vidyamitra
+Ingests many documents at once:
+- PDF pages are spread over a process pool (text layer or OCR per page)
+- Every completed page is checkpointed, so an interrupted run resumes
+  where it stopped instead of re-OCRing finished pages
+- Pages come back out per document, in page order, tagged with the
+  document's metadata from an optional `<document>.meta.json` sidecar
+  (e.g. {"language": "Hindi", "grade": 6, "category": "pedagogy"})
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from app import config
+from app.ingestion.pdf_loader import count_pdf_pages, extract_pages_task, iter_text_pages
+
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt")
+
+
+def find_documents(inputs: Iterable[str]) -> List[str]:
+    """Expand files and directories (recursively) into a sorted document list"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(
+                    os.path.join(root, name)
+                    for name in files
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS)
+                )
+        else:
+            paths.append(item)
+    return sorted(paths)
+
+
+def document_metadata(path: str) -> Dict:
+    sidecar = path + ".meta.json"
+    if not os.path.exists(sidecar):
+        return {}
+    with open(sidecar, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class PageCheckpoint:
+    """
+    Append-only record of extracted pages for one document. Keyed by path,
+    size and mtime, so an edited document starts over.
+
+    Only the byte offset of each page is kept in memory; pages are read
+    back from the file one at a time when they are handed out.
+    """
+
+    def __init__(self, checkpoint_dir: str, path: str):
+        stat = os.stat(path)
+        key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.path = os.path.join(checkpoint_dir, f"{digest}.pages.jsonl")
+        # Page number -> byte offset of its line
+        self.offsets: Dict[int, int] = {}
+        self._file = None
+        self._reader = None
+
+    def load(self) -> Dict[int, int]:
+        """
+        Scan the pages of an earlier run (streamed, offsets only). A torn
+        last line from an interrupted write is cut off, so new pages are
+        appended after the last complete one.
+        """
+        self.offsets = {}
+        if not os.path.exists(self.path):
+            return self.offsets
+
+        end = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    page = json.loads(line)["metadata"]["page"]
+                except (ValueError, KeyError):
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self.offsets[page] = end
+                end += len(line)
+
+        if os.path.getsize(self.path) > end:
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+        return self.offsets
+
+    def append(self, page: Dict):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self.offsets[page["metadata"]["page"]] = self._file.tell()
+        self._file.write((json.dumps(page, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._file.flush()
+
+    def read(self, page_number: int) -> Dict:
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+        self._reader.seek(self.offsets[page_number])
+        return json.loads(self._reader.readline())
+
+    def close(self):
+        for handle in (self._file, self._reader):
+            if handle is not None:
+                handle.close()
+        self._file = self._reader = None
+
+
+class WorkerStats:
+    """Pages and busy seconds per worker process"""
+
+    def __init__(self):
+        self.pages = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.resumed = 0
+        self.failed = 0
+        self._started = time.perf_counter()
+
+    def record(self, worker: int, pages: int, seconds: float):
+        self.pages[worker] += pages
+        self.seconds[worker] += seconds
+
+    def print_report(self):
+        elapsed = time.perf_counter() - self._started
+        total = sum(self.pages.values())
+
+        print(f"\n{'worker':<10}{'pages':>10}{'busy s':>10}{'pages/s':>10}")
+        for worker in sorted(self.pages):
+            busy = max(self.seconds[worker], 1e-9)
+            print(f"{worker:<10}{self.pages[worker]:>10}{busy:>10.1f}"
+                  f"{self.pages[worker] / busy:>10.2f}")
+        print(f"\n📄 {total} pages extracted in {elapsed:.1f}s "
+              f"({total / max(elapsed, 1e-9):.2f} pages/s overall), "
+              f"{self.resumed} resumed from checkpoint, {self.failed} failed")
+
+
+def iter_document_pages(
+    paths: List[str],
+    workers: int | None = None,
+    checkpoint_dir: str | None = None,
+    stats: WorkerStats | None = None,
+    count_fn: Callable[[str], int] = count_pdf_pages,
+    task_fn: Callable[[str, List[int]], Dict] = extract_pages_task,
+) -> Iterator[Dict]:
+    """
+    Yield page records for many documents, in document then page order
+
+    PDF pages are extracted in parallel by `workers` processes; at most a
+    few batches per worker are in flight. Each page is handed out as soon
+    as every page before it is out; pages finished ahead of their turn wait
+    in the checkpoint file, not in memory, so memory does not depend on the
+    number or size of documents. Text files are streamed directly.
+
+    Pages that fail are logged and left out of the checkpoint; the next run
+    retries them.
+    """
+    workers = workers or config.INGEST_WORKERS
+    checkpoint_dir = checkpoint_dir or config.INGEST_CHECKPOINT_DIR
+    stats = stats if stats is not None else WorkerStats()
+    per_task = max(1, config.INGEST_PAGES_PER_TASK)
+
+    pdfs = []
+    for path in paths:
+        if path.lower().endswith(".pdf"):
+            checkpoint = PageCheckpoint(checkpoint_dir, path)
+            done = checkpoint.load()
+            stats.resumed += len(done)
+            count = count_fn(path)
+            todo = [n for n in range(1, count + 1) if n not in done]
+            pdfs.append({"path": path, "checkpoint": checkpoint, "todo": todo,
+                         "count": count, "next": 1, "failed": set()})
+        else:
+            pdfs.append({"path": path, "checkpoint": None, "todo": []})
+
+    def tasks():
+        for doc in pdfs:
+            todo = doc["todo"]
+            for i in range(0, len(todo), per_task):
+                yield doc, todo[i:i + per_task]
+
+    def tag(doc, page):
+        if "extra" not in doc:
+            doc["extra"] = document_metadata(doc["path"])
+        if doc["extra"]:
+            page["metadata"] = {**doc["extra"], **page["metadata"]}
+        return page
+
+    def drain(doc):
+        """The document's next pages, for as long as they are in"""
+        checkpoint = doc["checkpoint"]
+        while doc["next"] <= doc["count"]:
+            number = doc["next"]
+            if number in checkpoint.offsets:
+                page = checkpoint.read(number)
+            elif number in doc["failed"]:
+                page = None
+            else:
+                return
+            doc["next"] += 1
+            if page is not None:
+                yield tag(doc, page)
+
+    next_doc = 0
+    pending_tasks = tasks()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+
+        def refill():
+            while len(in_flight) < workers * 2:
+                task = next(pending_tasks, None)
+                if task is None:
+                    return
+                doc, numbers = task
+                in_flight[pool.submit(task_fn, doc["path"], numbers)] = (doc, numbers)
+
+        refill()
+        while next_doc < len(pdfs):
+            doc = pdfs[next_doc]
+            if doc["checkpoint"] is None:
+                for page in iter_text_pages(doc["path"]):
+                    yield tag(doc, page)
+                next_doc += 1
+                continue
+
+            # Hand out pages in order as soon as the next one is in
+            yield from drain(doc)
+            if doc["next"] > doc["count"]:
+                doc["checkpoint"].close()
+                next_doc += 1
+                continue
+
+            # Tasks are submitted in document order, so the missing page
+            # is in flight
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done_doc, numbers = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    stats.failed += len(numbers)
+                    done_doc["failed"].update(numbers)
+                    print(f"⚠️ {done_doc['path']} pages {numbers}: {e}")
+                    continue
+
+                for page in result["pages"]:
+                    done_doc["checkpoint"].append(page)
+                stats.record(result["worker"], len(result["pages"]), result["seconds"])
+            refill()
+
+    for doc in pdfs:
+        if doc["checkpoint"] is not None:
+            doc["checkpoint"].close()
@@ -1,18 +1,186 @@
-def chunk_text(text, chunk_size=400):
-    words = text.split()
-    chunks = []
-
-    for i in range(0, len(words), chunk_size):
-        chunk_words = words[i:i + chunk_size]
-        chunk_text = " ".join(chunk_words)
-
-        chunks.append({
-            "content": chunk_text,
-            "metadata": {
-                "source": "NCERT",
-                "category": "pedagogy",
-                "language": "English"
-            }
-        })
-
-    return chunks
+"""
+Chunking Module for Vidyamitra
+Packs cleaned pages into chunks sized in embedding-model tokens:
+- Never exceeds the model's max sequence length, so nothing is silently
+  truncated at embedding time
+- Splits at sentence boundaries (a single over-long sentence is split by
+  words) and never lets a chunk span a section heading or two documents
+- Repeats the last sentences of a chunk (up to the overlap budget) at the
+  start of the next one
+- Carries the page's metadata (source, page, language, grade, ...) and
+  records the page range a chunk covers
+"""
+
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from app import config
+from app.retrieval.embedding_backend import TOKENIZER_FILE, onnx_model_dir
+
+
+# [CLS] / [SEP] added by the tokenizer around every input
+SPECIAL_TOKENS = 2
+
+SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+# Keywords match in any case; a numbered heading ("2.5 Fractions") must
+# start with a capital, so "2.5 kg of rice" stays body text
+SECTION_HEADING = re.compile(
+    r"^(?:(?i:(?:chapter|unit|section|lesson|module|part)\s+(?:\d+|[ivxlc]+)\b)"
+    r"|\d+(?:\.\d+)+\s+[A-Z])"
+)
+_WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+
+# Metadata keys that describe a single page rather than the chunk
+_PAGE_ONLY_KEYS = ("ocr",)
+
+
+def approximate_token_count(text: str) -> int:
+    """
+    WordPiece-like estimate used when the model tokenizer is unavailable:
+    every word and punctuation mark is a token, long words split further.
+    Errs on the high side so chunks stay under the limit.
+    """
+    return sum(max(1, math.ceil(len(piece) / 6)) for piece in _WORD_PIECES.findall(text))
+
+
+@lru_cache(maxsize=4)
+def get_token_counter(model_name: str | None = None) -> Callable[[str], int]:
+    """Token counter of the embedding model's tokenizer (no special tokens)"""
+    model_name = model_name or config.EMBEDDING_MODEL
+
+    # Tokenizer shipped with an ONNX export: no transformers needed
+    tokenizer_file = os.path.join(onnx_model_dir(model_name), TOKENIZER_FILE)
+    if os.path.exists(tokenizer_file):
+        from tokenizers import Tokenizer
+
+        fast_tokenizer = Tokenizer.from_file(tokenizer_file)
+        fast_tokenizer.no_truncation()
+        fast_tokenizer.no_padding()
+        return lambda text: len(fast_tokenizer.encode(text, add_special_tokens=False).ids)
+
+    try:
+        from transformers import AutoTokenizer
+
+        repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        tokenizer = AutoTokenizer.from_pretrained(repo)
+    except Exception as e:
+        print(f"⚠️ Tokenizer for {model_name} unavailable ({e}); "
+              "using approximate token counts")
+        return approximate_token_count
+
+    return lambda text: len(tokenizer.tokenize(text))
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in SENTENCE_END.split(text) if s]
+
+
+class Chunker:
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        overlap_tokens: int | None = None,
+        count_tokens: Callable[[str], int] | None = None,
+    ):
+        """
+        Args:
+            max_tokens: Model max sequence length (defaults to CHUNK_MAX_TOKENS)
+            overlap_tokens: Tokens repeated between consecutive chunks
+            count_tokens: Token counter (defaults to the embedding tokenizer)
+        """
+        max_tokens = max_tokens or config.CHUNK_MAX_TOKENS
+        self.budget = max_tokens - SPECIAL_TOKENS
+        self.overlap_tokens = (
+            config.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        )
+        self.count_tokens = count_tokens or get_token_counter()
+
+    def _pieces(self, sentence: str) -> Iterator[tuple[str, int]]:
+        """The sentence, or word windows of it if it alone exceeds the budget"""
+        tokens = self.count_tokens(sentence)
+        if tokens <= self.budget:
+            yield sentence, tokens
+            return
+
+        words, used = [], 0
+        for word in sentence.split():
+            n = self.count_tokens(word)
+            if words and used + n > self.budget:
+                yield " ".join(words), used
+                words, used = [], 0
+            words.append(word)
+            used += n
+        if words:
+            yield " ".join(words), used
+
+    @staticmethod
+    def _make_chunk(parts: List[tuple[str, int, Dict]]) -> Dict:
+        metadata = {k: v for k, v in parts[0][2].items() if k not in _PAGE_ONLY_KEYS}
+        last_page = parts[-1][2].get("page")
+        if last_page is not None and last_page != metadata.get("page"):
+            metadata["page_end"] = last_page
+
+        return {
+            "text": " ".join(text for text, _, _ in parts),
+            "metadata": metadata,
+        }
+
+    def _overlap(self, parts: List[tuple[str, int, Dict]]) -> List[tuple[str, int, Dict]]:
+        tail, used = [], 0
+        for part in reversed(parts):
+            if used + part[1] > self.overlap_tokens:
+                break
+            tail.insert(0, part)
+            used += part[1]
+        return tail
+
+    def iter_chunks(self, pages: Iterable[Dict]) -> Iterator[Dict]:
+        # streaming stage: holds at most one page plus one chunk
+        parts: List[tuple[str, int, Dict]] = []
+        used = 0
+        fresh = 0  # parts not already emitted as overlap
+        source = None
+
+        for page in pages:
+            metadata = page.get("metadata", {})
+
+            if metadata.get("source") != source:
+                if fresh:
+                    yield self._make_chunk(parts)
+                parts, used, fresh = [], 0, 0
+                source = metadata.get("source")
+
+            for sentence in split_sentences(page["text"]):
+                if SECTION_HEADING.match(sentence):
+                    if fresh:
+                        yield self._make_chunk(parts)
+                    parts, used, fresh = [], 0, 0
+
+                for text, tokens in self._pieces(sentence):
+                    if fresh and used + tokens > self.budget:
+                        yield self._make_chunk(parts)
+                        parts = self._overlap(parts)
+                        used = sum(p[1] for p in parts)
+                        fresh = 0
+                    # Overlap gives way when it would push the chunk over
+                    while parts and used + tokens > self.budget:
+                        used -= parts.pop(0)[1]
+
+                    parts.append((text, tokens, metadata))
+                    used += tokens
+                    fresh += 1
+
+        if fresh:
+            yield self._make_chunk(parts)
+
+
+def chunk_text(text, metadata=None, **chunker_args):
+    page = {"text": text, "metadata": metadata or {}}
+    return list(Chunker(**chunker_args).iter_chunks([page]))
+
+
+def iter_chunks(pages, **chunker_args):
+    return Chunker(**chunker_args).iter_chunks(pages)
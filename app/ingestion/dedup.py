@@ -0,0 +1,251 @@
+"""
+Near-Duplicate Removal Module for Vidyamitra
+Finds chunks that repeat (almost) the same text across modules and
+editions, keeps one canonical copy and merges the others' metadata into it.
+
+- MinHash signatures over word shingles estimate Jaccard similarity
+- LSH banding: each band of the signature is hashed, and only chunks that
+  share a band hash are compared. Bands are grouped with a sort per band
+  (O(n log n)), never pairwise, so millions of chunks are fine
+- The first occurrence of a duplicate group is canonical; the metadata of
+  the dropped copies is listed under "also_in"
+"""
+
+import os
+import re
+import zlib
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from app import config
+from app.ingestion.pipeline import read_jsonl, record_text, write_jsonl
+
+
+_MIX = np.uint64(0x9E3779B1)
+_WORDS = re.compile(r"\w+")
+# Texts hashed per vectorized signature batch
+_SIGNATURE_BATCH = 256
+
+
+def choose_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """
+    (bands, rows) with bands * rows <= num_perm whose LSH S-curve midpoint
+    (1 / bands) ** (1 / rows) is closest to, but not above, the threshold
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        if midpoint <= threshold and (best is None or midpoint > best[0]):
+            best = (midpoint, bands, rows)
+    return (best[1], best[2]) if best else (num_perm, 1)
+
+
+class MinHasher:
+    """
+    MinHash over word 3-gram shingles. Permutations are multiply-shift
+    hashes ((a * x + b) mod 2**64) >> 32, evaluated for a whole batch of
+    texts at once.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, 2 ** 63, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """32-bit hashes of the text's word shingles (at least one)"""
+        words = np.fromiter(
+            (zlib.crc32(w.encode("utf-8")) for w in _WORDS.findall(text.lower())),
+            dtype=np.uint64,
+        )
+        if len(words) == 0:
+            return np.zeros(1, dtype=np.uint64)
+
+        k = min(self.shingle_size, len(words))
+        hashed = words[:len(words) - k + 1].copy()
+        for offset in range(1, k):
+            hashed = (hashed * _MIX) ^ words[offset:len(words) - k + 1 + offset]
+        return hashed & np.uint64(0xFFFFFFFF)
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), num_perm) uint32 MinHash signatures"""
+        shingles = [self.shingles(t) for t in texts]
+        starts = np.cumsum([0] + [len(s) for s in shingles[:-1]])
+        hashed = (self._a * np.concatenate(shingles) + self._b) >> np.uint64(32)
+        return np.minimum.reduceat(hashed, starts, axis=1).T.astype(np.uint32)
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.signatures([text])[0]
+
+
+def find_duplicate_groups(
+    signatures: np.ndarray, threshold: float, bands: int, rows: int
+) -> np.ndarray:
+    """
+    Returns:
+        (n,) array mapping every chunk to its canonical chunk (the smallest
+        index in its duplicate group; itself if unique)
+    """
+    n = len(signatures)
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        cols = signatures[:, band * rows:(band + 1) * rows]
+        keys = np.ascontiguousarray(cols).view(
+            np.dtype((np.void, cols.dtype.itemsize * rows))
+        ).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        # First member of every run of equal band hashes
+        starts = np.ones(n, dtype=bool)
+        starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        heads = order[np.maximum.accumulate(np.where(starts, np.arange(n), 0))]
+
+        candidates = np.nonzero(~starts)[0]
+        if not len(candidates):
+            continue
+        members, reps = order[candidates], heads[candidates]
+
+        # Verify the candidate pairs on the full signature
+        similarity = (signatures[members] == signatures[reps]).mean(axis=1)
+        for a, b in zip(members[similarity >= threshold], reps[similarity >= threshold]):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+    return np.array([find(i) for i in range(n)])
+
+
+class DedupReport:
+    def __init__(self, chunks_in: int, chunks_out: int, bytes_removed: int):
+        self.chunks_in = chunks_in
+        self.chunks_out = chunks_out
+        self.bytes_removed = bytes_removed
+
+    @property
+    def removed(self) -> int:
+        return self.chunks_in - self.chunks_out
+
+    @property
+    def ratio(self) -> float:
+        return self.removed / self.chunks_in if self.chunks_in else 0.0
+
+    def index_bytes_saved(self, dimension: int = 384, bytes_per_dim: int = 4) -> int:
+        """Vector storage not spent on duplicates (flat float32 index by default)"""
+        return self.removed * dimension * bytes_per_dim
+
+    def print_report(self, dimension: int = 384):
+        print(f"\n🧹 Dedup: {self.chunks_in} -> {self.chunks_out} chunks "
+              f"({self.removed} near-duplicates, {self.ratio:.1%} dedup ratio)")
+        print(f"   Saved {self.bytes_removed / 1e6:.2f} MB of chunk text and "
+              f"~{self.index_bytes_saved(dimension) / 1e6:.2f} MB of flat index")
+
+
+def _merge(canonical: Dict, duplicates: List[Dict]) -> Dict:
+    own = canonical.get("metadata", {})
+    also_in = list(own.get("also_in", []))
+    for dup in duplicates:
+        metadata = {k: v for k, v in dup.get("metadata", {}).items() if k != "also_in"}
+        if metadata != own and metadata not in also_in:
+            also_in.append(metadata)
+    if not also_in:
+        return canonical
+    return {**canonical, "metadata": {**own, "also_in": also_in}}
+
+
+def _hasher_and_bands(threshold, num_perm):
+    threshold = config.DEDUP_THRESHOLD if threshold is None else threshold
+    hasher = MinHasher(num_perm or config.DEDUP_NUM_PERM)
+    return threshold, hasher, choose_bands(hasher.num_perm, threshold)
+
+
+def dedup_chunks(
+    chunks: List[Dict], threshold: float | None = None, num_perm: int | None = None
+) -> tuple[List[Dict], DedupReport]:
+    """In-memory near-duplicate removal for a list of chunks"""
+    threshold, hasher, (bands, rows) = _hasher_and_bands(threshold, num_perm)
+    if not chunks:
+        return [], DedupReport(0, 0, 0)
+
+    signatures = np.concatenate([
+        hasher.signatures([record_text(c) for c in chunks[i:i + _SIGNATURE_BATCH]])
+        for i in range(0, len(chunks), _SIGNATURE_BATCH)
+    ])
+    roots = find_duplicate_groups(signatures, threshold, bands, rows)
+
+    groups: Dict[int, List[Dict]] = {}
+    for i, root in enumerate(roots):
+        if root != i:
+            groups.setdefault(int(root), []).append(chunks[i])
+
+    kept = [_merge(c, groups.get(i, [])) for i, c in enumerate(chunks) if roots[i] == i]
+    removed_bytes = sum(
+        len(record_text(c).encode("utf-8")) for i, c in enumerate(chunks) if roots[i] != i
+    )
+    return kept, DedupReport(len(chunks), len(kept), removed_bytes)
+
+
+def dedup_jsonl(
+    input_path: str,
+    output_path: str,
+    threshold: float | None = None,
+    num_perm: int | None = None,
+) -> DedupReport:
+    """
+    Streaming dedup of a chunks JSONL file: the first pass spools MinHash
+    signatures to disk, the second collects the dropped copies' metadata
+    and the third rewrites the file without duplicates. Chunk text is never
+    held in memory.
+    """
+    threshold, hasher, (bands, rows) = _hasher_and_bands(threshold, num_perm)
+    spool = output_path + ".minhash.tmp"
+
+    n = 0
+    with open(spool, "wb") as f:
+        batch = []
+        for chunk in read_jsonl(input_path):
+            batch.append(record_text(chunk))
+            if len(batch) == _SIGNATURE_BATCH:
+                f.write(hasher.signatures(batch).tobytes())
+                n, batch = n + len(batch), []
+        if batch:
+            f.write(hasher.signatures(batch).tobytes())
+            n += len(batch)
+
+    try:
+        if n == 0:
+            write_jsonl([], output_path)
+            return DedupReport(0, 0, 0)
+
+        signatures = np.memmap(spool, dtype=np.uint32, mode="r", shape=(n, hasher.num_perm))
+        roots = find_duplicate_groups(signatures, threshold, bands, rows)
+        del signatures
+    finally:
+        os.remove(spool)
+
+    # Metadata of every dropped copy, grouped under its canonical chunk
+    merged: Dict[int, List[Dict]] = {}
+    removed_bytes = 0
+    for i, chunk in enumerate(read_jsonl(input_path)):
+        if roots[i] != i:
+            merged.setdefault(int(roots[i]), []).append({"metadata": chunk.get("metadata", {})})
+            removed_bytes += len(record_text(chunk).encode("utf-8"))
+
+    def kept() -> Iterator[Dict]:
+        for i, chunk in enumerate(read_jsonl(input_path)):
+            if roots[i] == i:
+                yield _merge(chunk, merged.get(i, []))
+
+    chunks_out = write_jsonl(kept(), output_path)
+    return DedupReport(n, chunks_out, removed_bytes)
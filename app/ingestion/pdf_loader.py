@@ -1,29 +1,137 @@
-from pdf2image import convert_from_path
-import pytesseract
+"""
+Document Loader Module for Vidyamitra
+Reads source documents page by page:
+- Plain-text dumps (pages split on form feeds)
+- PDFs: embedded text layer via pdfplumber, OCR (pdf2image + Tesseract)
+  for pages whose text layer is missing or too thin
 
-# Explicit Windows paths
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+OCR tools are found on PATH; TESSERACT_CMD / POPPLER_PATH override that.
+"""
 
-POPPLER_PATH = r"C:\Users\91807\Downloads\Release-25.12.0-0\Library\bin"
+import os
+import time
+from typing import Dict, Iterator, List
 
-# def load_pdf_text(pdf_path):
-#     pages = convert_from_path(
-#         pdf_path,
-#         poppler_path=POPPLER_PATH
-    # )
-# def load_pdf_text(path):
-#     with open(path, "r", encoding="utf-8") as f:
-#         return f.read()
+from app import config
+
+
+# Text dumps without form feeds are cut into pseudo-pages of about this size
+MAX_PAGE_CHARS = 64 * 1024
+
+
+def _page_record(path: str, page_no: int, text: str, **extra) -> Dict:
+    return {
+        "text": text,
+        "metadata": {"source": os.path.basename(path), "page": page_no, **extra},
+    }
+
+
+def iter_text_pages(path: str) -> Iterator[Dict]:
+    """
+    Yield a text file one page at a time. Pages are separated by form feeds;
+    long runs without one are split at line boundaries so memory stays
+    bounded.
+    """
+    page_no = 1
+    buffer = []
+    size = 0
 
-def load_pdf_text(path):
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        return f.read()
+        for line in f:
+            while "\f" in line:
+                head, line = line.split("\f", 1)
+                buffer.append(head)
+                yield _page_record(path, page_no, "".join(buffer))
+                page_no += 1
+                buffer, size = [], 0
+
+            buffer.append(line)
+            size += len(line)
+            if size >= MAX_PAGE_CHARS:
+                yield _page_record(path, page_no, "".join(buffer))
+                page_no += 1
+                buffer, size = [], 0
+
+    if buffer:
+        yield _page_record(path, page_no, "".join(buffer))
+
+
+def count_pdf_pages(pdf_path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
 
-    all_text = []
+def ocr_page(pdf_path: str, page_no: int) -> str:
+    """Rasterize one page (1-based) and run Tesseract on it"""
+    try:
+        import pytesseract
+        from pdf2image import convert_from_path
+    except ImportError as e:
+        raise RuntimeError(
+            "Page has no text layer and OCR is unavailable; install "
+            "pdf2image + pytesseract (and the poppler / tesseract binaries)"
+        ) from e
+
+    if config.TESSERACT_CMD:
+        pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_CMD
+
+    images = convert_from_path(
+        pdf_path,
+        dpi=config.OCR_DPI,
+        first_page=page_no,
+        last_page=page_no,
+        poppler_path=config.POPPLER_PATH or None,
+    )
+    return "\n".join(
+        pytesseract.image_to_string(image, lang=config.OCR_LANG) for image in images
+    )
+
+
+def extract_pdf_pages(pdf_path: str, page_numbers: List[int]) -> List[Dict]:
+    """
+    Extract the given 1-based pages, preferring the embedded text layer and
+    falling back to OCR per page. Opens the PDF once for the whole batch.
+    """
+    import pdfplumber
+
+    records = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_no in page_numbers:
+            text = pdf.pages[page_no - 1].extract_text() or ""
+            ocr = len(text.strip()) < config.TEXT_LAYER_MIN_CHARS
+            if ocr:
+                text = ocr_page(pdf_path, page_no)
+            records.append(_page_record(pdf_path, page_no, text, ocr=ocr))
+    return records
+
+
+def iter_pdf_pages(pdf_path: str) -> Iterator[Dict]:
+    for page_no in range(1, count_pdf_pages(pdf_path) + 1):
+        yield from extract_pdf_pages(pdf_path, [page_no])
+
+
+def iter_pages(path: str) -> Iterator[Dict]:
+    """Yield {"text", "metadata"} page records for a PDF or text file"""
+    if path.lower().endswith(".pdf"):
+        return iter_pdf_pages(path)
+    return iter_text_pages(path)
+
+
+def load_pdf_text(path):
+    return "\n".join(page["text"] for page in iter_pages(path))
 
-    for page in pages:
-        text = pytesseract.image_to_string(page, lang="eng")
-        if text.strip():
-            all_text.append(text)
 
-    return "\n".join(all_text)
+def extract_pages_task(pdf_path: str, page_numbers: List[int]) -> Dict:
+    """
+    Process-pool entry point: extracted pages plus timing for the per-worker
+    throughput report
+    """
+    started = time.perf_counter()
+    pages = extract_pdf_pages(pdf_path, page_numbers)
+    return {
+        "pages": pages,
+        "worker": os.getpid(),
+        "seconds": time.perf_counter() - started,
+    }
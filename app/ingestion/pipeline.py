@@ -0,0 +1,135 @@
+"""
+Ingestion Pipeline Utilities for Vidyamitra
+Streaming helpers shared by the ingestion stages:
+- JSONL reading / writing, one record per line
+- Per-stage throughput metering for generator pipelines
+
+Records flowing between stages are dicts with a "text" field (legacy
+chunk files use "content") and a "metadata" dict.
+"""
+
+import json
+import os
+import resource
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator
+
+
+def record_text(record: Dict) -> str:
+    return record.get("text") or record.get("content", "")
+
+
+def write_jsonl(records: Iterable[Dict], path: str) -> int:
+    """
+    Stream records to a JSONL file (written to a temp file, then renamed)
+
+    Returns:
+        Number of records written
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    count = 0
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+
+    os.replace(tmp_path, path)
+    return count
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class ChunkFile:
+    """
+    Lazy, re-iterable view over an ingestion output file. JSONL is read one
+    line at a time; legacy JSON arrays are loaded whole.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self.path.endswith(".jsonl"):
+            yield from read_jsonl(self.path)
+        else:
+            with open(self.path, "r", encoding="utf-8") as f:
+                yield from json.load(f)
+
+
+class StageMeter:
+    """
+    Measures items, bytes and time per stage of a chain of generators.
+
+    Each wrapped stage's time includes its upstream stages (pulling an item
+    runs the whole chain), so per-stage time is reported as the difference
+    to the previous stage.
+    """
+
+    def __init__(self):
+        self._stages: "OrderedDict[str, Dict]" = OrderedDict()
+        self._started = time.perf_counter()
+
+    def wrap(self, name: str, records: Iterable[Dict]) -> Iterator[Dict]:
+        # Registered eagerly so stages are reported in pipeline order
+        stats = self._stages.setdefault(name, {"items": 0, "bytes": 0, "seconds": 0.0})
+        return self._metered(stats, iter(records))
+
+    @staticmethod
+    def _metered(stats: Dict, iterator: Iterator[Dict]) -> Iterator[Dict]:
+        while True:
+            started = time.perf_counter()
+            try:
+                record = next(iterator)
+            except StopIteration:
+                stats["seconds"] += time.perf_counter() - started
+                return
+            stats["seconds"] += time.perf_counter() - started
+            stats["items"] += 1
+            stats["bytes"] += len(record_text(record).encode("utf-8"))
+            yield record
+
+    def report(self) -> list:
+        rows = []
+        upstream = 0.0
+        for name, stats in self._stages.items():
+            own = max(stats["seconds"] - upstream, 1e-9)
+            upstream = stats["seconds"]
+            mb = stats["bytes"] / 1e6
+            rows.append({
+                "stage": name,
+                "items": stats["items"],
+                "mb": mb,
+                "seconds": own,
+                "mb_per_s": mb / own,
+            })
+
+        total = time.perf_counter() - self._started
+        if rows:
+            # Whatever consumed the last stage (e.g. the JSONL writer)
+            sink = max(total - upstream, 1e-9)
+            rows.append({
+                "stage": "write",
+                "items": rows[-1]["items"],
+                "mb": rows[-1]["mb"],
+                "seconds": sink,
+                "mb_per_s": rows[-1]["mb"] / sink,
+            })
+        return rows
+
+    def print_report(self):
+        print(f"\n{'stage':<10}{'items':>10}{'MB':>10}{'seconds':>10}{'MB/s':>10}")
+        for row in self.report():
+            print(f"{row['stage']:<10}{row['items']:>10}{row['mb']:>10.2f}"
+                  f"{row['seconds']:>10.2f}{row['mb_per_s']:>10.2f}")
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"\n📈 Peak RSS: {peak_mb:.1f} MB")
@@ -1,21 +1,115 @@
+"""
+Text Cleaning Module for Vidyamitra
+All removal rules are compiled into one regex with a constant (empty)
+replacement, applied in a single pass; whitespace is collapsed by a C-level
+split/join. The previous cleaner made one full copy of the text per rule.
+
+Rules (built-in defaults below, or a JSON file named by TEXT_CLEANING_RULES):
+- collapse_whitespace: runs of whitespace become one space
+- drop_patterns: regexes removed outright (e.g. page numbers)
+- stopwords: words / phrases removed as whole words only. An all-lowercase
+  entry matches any case ("policy" also drops "Policy"); an entry with
+  capitals matches exactly ("NEP" keeps "nep").
+"""
+
+import json
 import re
+from typing import Dict, Iterable, Iterator, List
 
-def clean_text(text):
-    # remove multiple spaces
-    text = re.sub(r'\s+', ' ', text)
+from app import config
 
-    # remove page numbers like 57, 58 etc
-    text = re.sub(r'\b\d{2,3}\b', '', text)
 
-    # remove common policy words
-    remove_words = [
+DEFAULT_RULES = {
+    "collapse_whitespace": True,
+    # page numbers like 57, 58 etc
+    "drop_patterns": [r"\b\d{2,3}\b"],
+    # common policy words
+    "stopwords": [
         "NEP",
         "policy",
         "framework",
-        "guidelines for implementation"
-    ]
+        "guidelines for implementation",
+    ],
+}
+
+
+def _phrase(word: str) -> str:
+    return r"\s+".join(re.escape(part) for part in word.split())
+
+
+class TextCleaner:
+    def __init__(
+        self,
+        drop_patterns: List[str] | None = None,
+        stopwords: List[str] | None = None,
+        collapse_whitespace: bool = True,
+    ):
+        self.collapse_whitespace = collapse_whitespace
+
+        words = [w for w in (stopwords or []) if w.strip()]
+        exact = [_phrase(w) for w in words if w != w.lower()]
+        any_case = [_phrase(w) for w in words if w == w.lower()]
+        if any_case:
+            exact.append("(?i:" + "|".join(any_case) + ")")
+
+        # Stopwords share one word-boundary group instead of one branch each
+        drops = [f"(?:{p})" for p in (drop_patterns or [])]
+        if exact:
+            drops.append(r"\b(?:" + "|".join(exact) + r")\b")
+
+        self._pattern = None
+        if drops:
+            # A dropped token takes one following space with it, so
+            # removals do not leave double spaces behind
+            self._pattern = re.compile(
+                "(?:" + "|".join(drops) + ")" + (" ?" if collapse_whitespace else "")
+            )
+
+    @classmethod
+    def from_rules(cls, rules: Dict) -> "TextCleaner":
+        return cls(
+            drop_patterns=rules.get("drop_patterns", []),
+            stopwords=rules.get("stopwords", []),
+            collapse_whitespace=rules.get("collapse_whitespace", True),
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "TextCleaner":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_rules(json.load(f))
+
+    def clean(self, text: str) -> str:
+        if self.collapse_whitespace:
+            text = " ".join(text.split())
+        if self._pattern is not None:
+            text = self._pattern.sub("", text)
+        return text.strip()
+
+    def clean_pages(self, pages: Iterable[Dict]) -> Iterator[Dict]:
+        # streaming stage: clean one page record at a time, dropping empty pages
+        for page in pages:
+            text = self.clean(page["text"])
+            if text:
+                yield {**page, "text": text}
+
+
+_default_cleaner: TextCleaner | None = None
+
+
+def get_text_cleaner() -> TextCleaner:
+    """Cleaner built from TEXT_CLEANING_RULES, or the built-in defaults"""
+    global _default_cleaner
+    if _default_cleaner is None:
+        if config.TEXT_CLEANING_RULES:
+            _default_cleaner = TextCleaner.from_file(config.TEXT_CLEANING_RULES)
+        else:
+            _default_cleaner = TextCleaner.from_rules(DEFAULT_RULES)
+    return _default_cleaner
+
+
+def clean_text(text):
+    return get_text_cleaner().clean(text)
 
-    for word in remove_words:
-        text = text.replace(word, "")
 
-    return text.strip()
+def clean_pages(pages):
+    return get_text_cleaner().clean_pages(pages)
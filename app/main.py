@@ -15,7 +15,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse
 
+from app import config
+from app.api.admin import router as admin_router
 from app.api.chat import router as chat_router
+from app.registry import registry
+from app.utils.metrics import metrics
 
 app = FastAPI(
     title="Vidyamitra",
@@ -34,6 +38,7 @@ app.add_middleware(
 
 # API routes
 app.include_router(chat_router)
+app.include_router(admin_router)
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -51,18 +56,39 @@ app.mount(
 def serve_frontend():
     return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
 
-# Health check (Render requirement)
+# Health check (Render requirement): the process is up, even while loading
 @app.get("/health", include_in_schema=False)
 def health():
-    return JSONResponse({"status": "ok"})
+    return JSONResponse({"status": "ok", "ready": registry.is_ready()})
 
-# 🔥 IMPORTANT: Warm-up to avoid blank responses
+# Readiness: 200 once models and index are loaded, 503 until then
+@app.get("/ready", include_in_schema=False)
+def ready():
+    status = registry.status()
+    if status["ready"]:
+        return JSONResponse({"status": "ready", **status})
+
+    failed = any(c["state"] == "failed" for c in status["components"].values())
+    return JSONResponse(
+        {"status": "failed" if failed else "loading", **status}, status_code=503
+    )
+
+# In-process metrics (latency per generation mode, cache counters, ...)
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return JSONResponse(metrics.snapshot())
+
+# 🔥 IMPORTANT: Warm-up to avoid blank responses. Runs in the background so
+# the port opens immediately; /ready reports when it is done
 @app.on_event("startup")
 def warm_up():
-    print("🔥 Warming up models and vector store...")
-    from app.retrieval.vector_store import get_vector_store
-    from app.rag.llm import get_llm
+    if config.WARM_UP_ON_STARTUP:
+        print("🔥 Warming up models and vector store...")
+        registry.start_warm_up()
+    # Swap in newly published index versions without a restart
+    registry.start_index_watcher()
+
 
-    from app.rag.llm import get_llm
-    get_llm()
-    print("✅ Warm-up complete")
+@app.on_event("shutdown")
+async def close_clients():
+    await registry.aclose()
@@ -0,0 +1,63 @@
+"""
+Request schemas for the Vidyamitra API
+"""
+
+from typing import Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field, field_validator
+
+from app import config
+
+
+FilterValue = Union[str, int, float, bool]
+
+
+def _check_filters(filters):
+    if filters:
+        unknown = sorted(set(filters) - set(config.FILTER_FIELDS))
+        if unknown:
+            raise ValueError(
+                f"Cannot filter on {unknown}; filterable fields: {config.FILTER_FIELDS}"
+            )
+    return filters
+
+
+class ChatRequest(BaseModel):
+    query: str
+    language: str = "English"
+    return_sources: bool = False
+    # Set to false to always compute a fresh answer
+    use_cache: bool = True
+    # Restrict retrieval by chunk metadata, e.g. {"grade": 6, "subject": ["math", "science"]}
+    filters: Optional[Dict[str, Union[FilterValue, List[FilterValue]]]] = None
+
+    @field_validator("filters")
+    @classmethod
+    def known_filter_fields(cls, filters):
+        return _check_filters(filters)
+
+
+class BatchChatRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=config.BATCH_MAX_QUERIES)
+    language: str = "English"
+    return_sources: bool = False
+    use_cache: bool = True
+    # Parallel LLM calls for this batch (capped by BATCH_MAX_CONCURRENCY)
+    concurrency: int = Field(default=8, ge=1)
+    # Applied to every query of the batch
+    filters: Optional[Dict[str, Union[FilterValue, List[FilterValue]]]] = None
+
+    @field_validator("filters")
+    @classmethod
+    def known_filter_fields(cls, filters):
+        return _check_filters(filters)
+
+
+class SearchRequest(BaseModel):
+    query: str
+    filters: Optional[Dict[str, Union[FilterValue, List[FilterValue]]]] = None
+
+    @field_validator("filters")
+    @classmethod
+    def known_filter_fields(cls, filters):
+        return _check_filters(filters)
@@ -0,0 +1,164 @@
+"""
+Context Assembly Module for Vidyamitra
+Turns over-retrieved candidates into the context placed in the prompt:
+- Reranks with maximal marginal relevance (MMR), using the chunk
+  embeddings stored in the index, so near-identical chunks do not crowd
+  out other relevant material
+- Packs chunks until a prompt-token budget is reached; the chunk that would
+  overflow it is cut at a sentence boundary instead of being dropped (the
+  top chunk is never dropped: if its first sentence alone is over budget,
+  it is cut at a word)
+"""
+
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app import config
+from app.ingestion.chunker import approximate_token_count, split_sentences
+from app.utils.metrics import metrics
+
+
+def mmr_order(
+    vectors: np.ndarray,
+    relevance: np.ndarray,
+    k: int,
+    mmr_lambda: float,
+) -> List[int]:
+    """
+    Greedy MMR: repeatedly pick the candidate maximizing
+    lambda * relevance - (1 - lambda) * max cosine to the picked ones
+
+    Args:
+        vectors: (n, d) L2-normalized candidate embeddings
+        relevance: (n,) relevance per candidate, scaled to [0, 1]
+        k: Candidates to pick
+        mmr_lambda: Relevance / diversity trade-off
+
+    Returns:
+        Picked candidate positions, in pick order
+    """
+    n = len(vectors)
+    similarity = vectors @ vectors.T
+    redundancy = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    picked = []
+
+    for _ in range(min(k, n)):
+        scores = mmr_lambda * relevance - (1 - mmr_lambda) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        picked.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+
+    return picked
+
+
+class ContextBuilder:
+    def __init__(
+        self,
+        max_chunks: int | None = None,
+        max_tokens: int | None = None,
+        mmr_lambda: float | None = None,
+        count_tokens: Callable[[str], int] | None = None,
+    ):
+        """
+        Args:
+            max_chunks: Most chunks in the context (defaults to RETRIEVAL_TOP_K)
+            max_tokens: Context token budget (defaults to CONTEXT_MAX_TOKENS)
+            mmr_lambda: MMR trade-off (defaults to MMR_LAMBDA)
+            count_tokens: Token counter (defaults to an estimate that errs high)
+        """
+        self.max_chunks = max_chunks or config.RETRIEVAL_TOP_K
+        self.max_tokens = config.CONTEXT_MAX_TOKENS if max_tokens is None else max_tokens
+        self.mmr_lambda = config.MMR_LAMBDA if mmr_lambda is None else mmr_lambda
+        self.count_tokens = count_tokens or approximate_token_count
+
+    def rerank(self, candidates: List[Dict]) -> List[Dict]:
+        """Candidates in MMR order (retrieval order when embeddings are missing)"""
+        if (
+            len(candidates) < 2
+            or self.mmr_lambda >= 1
+            or any(c.get("vector") is None for c in candidates)
+        ):
+            return list(candidates)
+
+        vectors = np.stack([c["vector"] for c in candidates]).astype(np.float32)
+        scores = np.array([c.get("score", 0.0) for c in candidates], dtype=np.float32)
+        # Dense scores are cosines, hybrid ones RRF: scale both to [0, 1]
+        relevance = scores / scores.max() if scores.max() > 0 else np.ones_like(scores)
+
+        order = mmr_order(vectors, relevance, len(candidates), self.mmr_lambda)
+        return [candidates[i] for i in order]
+
+    def _trim(self, text: str, budget: int) -> tuple[str, int]:
+        """Leading sentences of text that fit in budget tokens"""
+        kept, used = [], 0
+        for sentence in split_sentences(text):
+            tokens = self.count_tokens(sentence)
+            if used + tokens > budget:
+                break
+            kept.append(sentence)
+            used += tokens
+        return " ".join(kept), used
+
+    def _cut_words(self, text: str, budget: int) -> tuple[str, int]:
+        """Leading words of text that fit in budget tokens (at least one)"""
+        kept, used = [], 0
+        for word in text.split():
+            tokens = self.count_tokens(word)
+            if kept and used + tokens > budget:
+                break
+            kept.append(word)
+            used += tokens
+        return " ".join(kept), used
+
+    def pack(self, chunks: List[Dict]) -> tuple[List[Dict], int]:
+        """
+        Chunks (in the given order) that fit the token budget, the last one
+        possibly cut at a sentence boundary. The first chunk is always
+        included, cut at a word if not even its first sentence fits.
+
+        Returns:
+            (packed chunks without stored vectors, context tokens used)
+        """
+        packed, used = [], 0
+        for chunk in chunks:
+            if len(packed) >= self.max_chunks:
+                break
+
+            # "[Source i]" header that format_context_from_chunks adds
+            overhead = self.count_tokens(f"[Source {len(packed) + 1}]")
+            text = chunk.get("text", "").strip()
+            tokens = self.count_tokens(text)
+            chunk = {k: v for k, v in chunk.items() if k != "vector"}
+
+            if used + overhead + tokens <= self.max_tokens:
+                packed.append(chunk)
+                used += overhead + tokens
+                continue
+
+            budget = self.max_tokens - used - overhead
+            trimmed, tokens = self._trim(text, budget)
+            if not trimmed and not packed:
+                # An empty context would drop the best match entirely
+                trimmed, tokens = self._cut_words(text, budget)
+            if trimmed:
+                packed.append({**chunk, "text": trimmed, "trimmed": True})
+                used += overhead + tokens
+            break
+
+        return packed, used
+
+    def build(self, candidates: List[Dict]) -> List[Dict]:
+        """Rerank + pack; records context size per request"""
+        packed, tokens = self.pack(self.rerank(candidates))
+
+        metrics.observe("rag.context_tokens", tokens)
+        metrics.observe("rag.context_chunks", len(packed))
+        return packed
+
+
+def get_context_builder(max_chunks: int | None = None) -> ContextBuilder:
+    return ContextBuilder(max_chunks=max_chunks)
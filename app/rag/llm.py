@@ -3,9 +3,86 @@ LLM Configuration Module for Vidyamitra
 Groq + Qwen support with output cleaning and safety fallback
 """
 
+import asyncio
 import os
 import re
-from groq import Groq
+
+import httpx
+from groq import AsyncGroq, DefaultAsyncHttpxClient, Groq
+
+from app import config
+from app.translation.translator import TranslationCache, get_translation_cache
+from app.utils.metrics import metrics
+
+
+FALLBACK_ANSWER = (
+    "To address this in class, use simple examples, hands-on activities, "
+    "and regular student interaction to reinforce understanding."
+)
+
+
+class ThinkStripper:
+    """
+    Incremental version of LLMConfig._clean_response for streamed output:
+    drops Qwen <think>...</think> blocks even when tags are split across
+    chunks, and trims leading whitespace of the visible answer
+    """
+
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._in_think = False
+        self._started = False
+
+    @staticmethod
+    def _partial_tag_length(text: str, tag: str) -> int:
+        # Longest suffix of text that is a proper prefix of tag
+        for size in range(min(len(text), len(tag) - 1), 0, -1):
+            if tag.startswith(text[-size:]):
+                return size
+        return 0
+
+    def _emit(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+    def feed(self, delta: str) -> str:
+        self._buffer += delta
+        output = []
+
+        while self._buffer:
+            if self._in_think:
+                end = self._buffer.find(self.CLOSE_TAG)
+                if end == -1:
+                    # Keep only what could be the start of the closing tag
+                    keep = self._partial_tag_length(self._buffer, self.CLOSE_TAG)
+                    self._buffer = self._buffer[-keep:] if keep else ""
+                    break
+                self._buffer = self._buffer[end + len(self.CLOSE_TAG):]
+                self._in_think = False
+            else:
+                start = self._buffer.find(self.OPEN_TAG)
+                if start == -1:
+                    keep = self._partial_tag_length(self._buffer, self.OPEN_TAG)
+                    cut = len(self._buffer) - keep
+                    output.append(self._emit(self._buffer[:cut]))
+                    self._buffer = self._buffer[cut:]
+                    break
+                output.append(self._emit(self._buffer[:start]))
+                self._buffer = self._buffer[start + len(self.OPEN_TAG):]
+                self._in_think = True
+
+        return "".join(output)
+
+    def flush(self) -> str:
+        # An unterminated <think> block is reasoning, never answer text
+        remainder = "" if self._in_think else self._emit(self._buffer)
+        self._buffer = ""
+        return remainder.rstrip()
 
 
 class LLMConfig:
@@ -14,6 +91,8 @@ class LLMConfig:
         provider: str = "groq",
         api_key: str | None = None,
         model_name: str | None = None,
+        max_concurrency: int | None = None,
+        translation_cache: TranslationCache | None = None,
     ):
         self.provider = provider.lower()
 
@@ -25,13 +104,102 @@ class LLMConfig:
             raise ValueError("GROQ_API_KEY not found")
 
         self.client = Groq(api_key=api_key)
+
+        # Async client shares one pooled HTTP connection set across requests
+        self.async_client = AsyncGroq(
+            api_key=api_key,
+            timeout=config.LLM_HTTP_TIMEOUT_SECONDS,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+                ),
+            ),
+        )
         self.model_name = model_name or "qwen/qwen3-32b"
 
+        # Caps in-flight upstream calls made through the async methods
+        self._semaphore = asyncio.Semaphore(
+            max_concurrency or config.LLM_MAX_CONCURRENCY
+        )
+
+        # Repeated boilerplate (greetings, fallbacks, FAQ answers) is
+        # translated upstream only once
+        self.translation_cache = translation_cache or get_translation_cache()
+
     def _clean_response(self, text: str) -> str:
         # Remove Qwen internal reasoning if any
         cleaned = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
         return cleaned.strip()
 
+    # ---------------------------
+    # Message builders
+    # ---------------------------
+    def _generation_messages(self, prompt: str) -> list[dict]:
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "You are Vidyamitra, a digital Cluster Resource Person (CRP). "
+                    "Give clear, practical, classroom-ready guidance to teachers."
+                ),
+            },
+            {"role": "user", "content": prompt},
+        ]
+
+    def _translation_messages(self, text: str, target_language: str) -> list[dict]:
+        translation_prompt = f"""
+You are a professional educational translator.
+
+Translate the following text into {target_language}.
+
+STRICT RULES:
+- Output ONLY the translated text
+- DO NOT explain words or sentences
+- DO NOT include English words
+- DO NOT include examples or commentary
+- Use simple, natural language suitable for teachers
+- Keep the meaning accurate and complete
+
+Text:
+{text}
+
+Translated text:
+""".strip()
+
+        return [
+            {
+                "role": "system",
+                "content": "You are a strict translation engine. Do not add explanations.",
+            },
+            {
+                "role": "user",
+                "content": translation_prompt,
+            },
+        ]
+
+    @staticmethod
+    def _record_usage(kind: str, usage):
+        """Upstream token counts per call (what Groq bills and rate-limits on)"""
+        if usage is None:
+            return
+        metrics.observe(f"llm.prompt_tokens.{kind}", usage.prompt_tokens)
+        metrics.observe(f"llm.completion_tokens.{kind}", usage.completion_tokens)
+        metrics.increment("llm.prompt_tokens", usage.prompt_tokens)
+        metrics.increment("llm.completion_tokens", usage.completion_tokens)
+
+    def _finalize_generation(self, raw: str) -> str:
+        cleaned = self._clean_response(raw)
+
+        # 🛡️ Safety fallback (prevents blank / tiny answers)
+        if not cleaned or len(cleaned) < 20:
+            return FALLBACK_ANSWER
+
+        return cleaned
+
+    # ---------------------------
+    # Sync API
+    # ---------------------------
     def generate(
         self,
         prompt: str,
@@ -40,31 +208,14 @@ class LLMConfig:
     ) -> str:
         response = self.client.chat.completions.create(
             model=self.model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are Vidyamitra, a digital Cluster Resource Person (CRP). "
-                        "Give clear, practical, classroom-ready guidance to teachers."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
+            messages=self._generation_messages(prompt),
             temperature=temperature,
             max_tokens=max_tokens,
         )
 
+        self._record_usage("generate", getattr(response, "usage", None))
         raw = response.choices[0].message.content or ""
-        cleaned = self._clean_response(raw)
-
-        # 🛡️ Safety fallback (prevents blank / tiny answers)
-        if not cleaned or len(cleaned) < 20:
-            return (
-                "To address this in class, use simple examples, hands-on activities, "
-                "and regular student interaction to reinforce understanding."
-            )
-
-        return cleaned
+        return self._finalize_generation(raw)
 
     def translate(self, text: str, target_language: str) -> str:
         """
@@ -75,43 +226,166 @@ class LLMConfig:
         if target_language.lower() == "english":
             return text
 
-        translation_prompt = f"""
-You are a professional educational translator.
+        cached = self.translation_cache.get(text, target_language, self.model_name)
+        if cached is not None:
+            return cached
 
-Translate the following text into {target_language}.
+        response = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=self._translation_messages(text, target_language),
+            temperature=0.1,
+            max_tokens=500,
+        )
 
-STRICT RULES:
-- Output ONLY the translated text
-- DO NOT explain words or sentences
-- DO NOT include English words
-- DO NOT include examples or commentary
-- Use simple, natural language suitable for teachers
-- Keep the meaning accurate and complete
+        self._record_usage("translate", getattr(response, "usage", None))
+        raw = response.choices[0].message.content or ""
+        translated = self._clean_response(raw)
+        self.translation_cache.put(text, target_language, self.model_name, translated)
+        return translated
 
-Text:
-{text}
+    # ---------------------------
+    # Async API (non-blocking, bounded concurrency)
+    # ---------------------------
+    async def agenerate(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        max_tokens: int = 450,
+    ) -> str:
+        async with self._semaphore:
+            response = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=self._generation_messages(prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
 
-Translated text:
-""".strip()
+        self._record_usage("generate", getattr(response, "usage", None))
+        raw = response.choices[0].message.content or ""
+        return self._finalize_generation(raw)
 
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a strict translation engine. Do not add explanations.",
-                },
-                {
-                    "role": "user",
-                    "content": translation_prompt,
-                },
-            ],
+    async def atranslate(self, text: str, target_language: str) -> str:
+        """
+        Async variant of translate()
+        """
+
+        if target_language.lower() == "english":
+            return text
+
+        cached = await self.translation_cache.aget(text, target_language, self.model_name)
+        if cached is not None:
+            return cached
+
+        async with self._semaphore:
+            response = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=self._translation_messages(text, target_language),
+                temperature=0.1,
+                max_tokens=500,
+            )
+
+        self._record_usage("translate", getattr(response, "usage", None))
+        raw = response.choices[0].message.content or ""
+        translated = self._clean_response(raw)
+        await self.translation_cache.aput(text, target_language, self.model_name, translated)
+        return translated
+
+    # ---------------------------
+    # Streaming API
+    # ---------------------------
+    async def _astream_completion(self, messages: list[dict], kind: str, **kwargs):
+        """
+        Yield visible text deltas of a streamed completion, think blocks removed
+        """
+        stripper = ThinkStripper()
+        usage = None
+
+        async with self._semaphore:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                stream=True,
+                **kwargs,
+            )
+            async for chunk in stream:
+                # Token usage arrives with the final chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                usage = getattr(chunk, "usage", None) or getattr(x_groq, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    text = stripper.feed(delta)
+                    if text:
+                        yield text
+
+        self._record_usage(kind, usage)
+        tail = stripper.flush()
+        if tail:
+            yield tail
+
+    async def astream_generate(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        max_tokens: int = 450,
+    ):
+        """
+        Streaming generate(): output is held back only until it is long
+        enough to rule out the safety fallback, then forwarded as it arrives
+        """
+        pending = ""
+        started = False
+
+        async for text in self._astream_completion(
+            self._generation_messages(prompt),
+            "generate",
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ):
+            if started:
+                yield text
+                continue
+
+            pending += text
+            if len(pending.strip()) >= 20:
+                started = True
+                yield pending
+
+        if not started:
+            yield self._finalize_generation(pending)
+
+    async def astream_translate(self, text: str, target_language: str):
+        """
+        Streaming translate()
+        """
+
+        if target_language.lower() == "english":
+            yield text
+            return
+
+        cached = await self.translation_cache.aget(text, target_language, self.model_name)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        async for delta in self._astream_completion(
+            self._translation_messages(text, target_language),
+            "translate",
             temperature=0.1,
             max_tokens=500,
+        ):
+            parts.append(delta)
+            yield delta
+
+        await self.translation_cache.aput(
+            text, target_language, self.model_name, "".join(parts).strip()
         )
 
-        raw = response.choices[0].message.content or ""
-        return self._clean_response(raw)
+    async def aclose(self):
+        await self.async_client.close()
+        self.translation_cache.close()
 
 
 def get_llm(provider: str = "groq"):
@@ -42,6 +42,32 @@ Response:
 """.strip()
 
 
+def get_user_prompt_in_language(query: str, context: str, language: str) -> str:
+    """
+    Variant of get_user_prompt that answers directly in the target language,
+    removing the separate translation call
+    """
+    return f"""
+Context from teacher training materials:
+{context}
+
+Teacher's Question:
+{query}
+
+Instructions:
+- Give a direct, practical answer based on the context
+- Focus on classroom teaching strategies
+- Use simple language teachers can apply immediately
+- Write the ENTIRE response in {language} only
+- Do not include English sentences or a translation; keep only unavoidable technical terms in English
+- End your response with a complete sentence.
+- If the context is insufficient, say so briefly and provide general pedagogical guidance
+- Keep the response concise (4–6 sentences)
+
+Response (in {language}):
+""".strip()
+
+
 def get_rag_prompt(query: str, context: str) -> str:
     """
     Backward-compatible combined prompt (for non-chat LLMs)
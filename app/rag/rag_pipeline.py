@@ -7,14 +7,38 @@ Handles:
 - Translation
 """
 
-from typing import Dict, List
-from app.retrieval.vector_store import get_vector_store
-from app.rag.llm import get_llm
+import asyncio
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from app import config
+from app.retrieval.batcher import get_query_batcher
+from app.retrieval.metadata_filter import filters_key
+from app.retrieval.vector_store import get_embedding_executor, get_vector_store
+from app.rag.context_builder import get_context_builder
+from app.rag.semantic_cache import get_semantic_cache
 from app.rag.prompt import (
     get_system_message,
     get_user_prompt,
+    get_user_prompt_in_language,
     format_context_from_chunks,
 )
+from app.utils.helpers import normalize_query
+from app.utils.metrics import metrics
+from app.utils.singleflight import AsyncSingleFlight, SingleFlight
+from app.registry import registry
+
+
+CASUAL_ANSWER = (
+    "Hello! I am Vidyamitra. "
+    "I can help you with classroom teaching, "
+    "student learning challenges, and practical teaching strategies."
+)
+
+# Indic scripts tokenize into more tokens than the same answer in English
+DIRECT_MAX_TOKENS = 700
 
 
 def is_casual_query(query: str) -> bool:
@@ -28,77 +52,620 @@ def is_casual_query(query: str) -> bool:
 
 
 class RAGPipeline:
-    def __init__(self, llm_provider: str = "groq", top_k: int = 1):
-        self.vector_store = get_vector_store()
-        self.llm = get_llm(provider=llm_provider)
-        self.top_k = top_k
+    def __init__(self, llm_provider: str = "groq", top_k: int | None = None):
+        self.llm = registry.llm(llm_provider)
+        self.top_k = top_k or config.RETRIEVAL_TOP_K
+        # Over-retrieve, then rerank (MMR) and pack into a token budget
+        self.candidates = max(self.top_k, config.CONTEXT_CANDIDATES)
+        self._rerank = self.candidates > self.top_k
+        self.context_builder = get_context_builder(self.top_k)
+        self.semantic_cache = get_semantic_cache(self.vector_store.dimension)
+        # Given the registry lookup, not a store: a reloaded index is used
+        # from the next batch on
+        self.query_batcher = get_query_batcher(get_vector_store, with_vectors=self._rerank)
+
+        # Identical queries arriving together share one computation
+        self._single_flight = SingleFlight("rag_query")
+        self._async_single_flight = AsyncSingleFlight("rag_aquery")
+
+    @property
+    def vector_store(self):
+        """
+        The serving store, looked up on every use: an index reload swaps it
+        under a running pipeline (see Registry.reload_vector_store)
+        """
+        return get_vector_store()
+
+    # ---------------------------
+    # Shared steps
+    # ---------------------------
+    def generation_mode(self, language: str) -> str:
+        """
+        How an answer in `language` is produced:
+        - "english": single generation call
+        - "direct": single generation call prompted in the target language
+        - "translate": English generation followed by a translation call
+        """
+        lang = language.lower()
+        if lang == "english":
+            return "english"
+        if lang in config.DIRECT_GENERATION_LANGUAGES:
+            return "direct"
+        return "translate"
+
+    def _record_latency(self, mode: str, started: float):
+        metrics.observe(
+            f"rag.answer_ms.{mode}", (time.perf_counter() - started) * 1000
+        )
+
+    def _build_prompt(
+        self,
+        user_query: str,
+        retrieved_chunks: List[Dict],
+        language: str = "English",
+    ) -> str:
+        if retrieved_chunks:
+            context = format_context_from_chunks(retrieved_chunks)
+        else:
+            context = (
+                "No specific training material was found. "
+                "Answer using general classroom teaching best practices."
+            )
+
+        system_message = get_system_message()
+        if self.generation_mode(language) == "direct":
+            user_prompt = get_user_prompt_in_language(user_query, context, language)
+        else:
+            user_prompt = get_user_prompt(user_query, context)
+        return f"{system_message}\n\n{user_prompt}"
+
+    def _format_sources(self, retrieved_chunks: List[Dict]) -> List[Dict]:
+        return [
+            {
+                "text": c.get("text", "")[:200] + "...",
+                "metadata": c.get("metadata", {}),
+                "score": c.get("score", 0),
+            }
+            for c in retrieved_chunks
+        ]
+
+    def _build_response(
+        self,
+        answer: str,
+        retrieved_chunks: List[Dict],
+        return_sources: bool,
+    ) -> Dict:
+        response = {"answer": answer}
+
+        if return_sources and retrieved_chunks:
+            response["sources"] = self._format_sources(retrieved_chunks)
+
+        return response
+
+    # ---------------------------
+    # Retrieval
+    # ---------------------------
+    def _embed_and_search(self, user_query: str, filters: Optional[Dict] = None):
+        """
+        Returns (query_embedding, retrieved_chunks); goes through the
+        micro-batcher when enabled so concurrent queries share one encode.
+        retrieved_chunks is the assembled context (reranked, within budget).
+        """
+        if self.query_batcher is not None:
+            query_embedding, candidates = self.query_batcher.submit(
+                user_query, self.candidates, filters
+            ).result()
+        else:
+            # One store for both steps, even if a reload lands in between
+            vector_store = self.vector_store
+            query_embedding = vector_store.embed_queries([user_query])
+            candidates = vector_store.search_vectors(
+                query_embedding, top_k=self.candidates, queries=[user_query],
+                filters=filters, with_vectors=self._rerank,
+            )[0]
+        return query_embedding, self.context_builder.build(candidates)
+
+    async def _aembed_and_search(self, user_query: str, filters: Optional[Dict] = None):
+        if self.query_batcher is not None:
+            query_embedding, candidates = await asyncio.wrap_future(
+                self.query_batcher.submit(user_query, self.candidates, filters)
+            )
+            return query_embedding, self.context_builder.build(candidates)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_embedding_executor(), self._embed_and_search, user_query, filters
+        )
+
+    async def aretrieve(self, user_query: str, filters: Optional[Dict] = None) -> List[Dict]:
+        """Context chunks a query would be answered from (no LLM call)"""
+        _, chunks = await self._aembed_and_search(user_query, filters)
+        return chunks
+
+    # ---------------------------
+    # Semantic cache
+    # ---------------------------
+    def _cache_lookup(
+        self,
+        query_embedding,
+        language: str,
+        use_cache: bool,
+        filters: Optional[Dict] = None,
+        index_version: Optional[str] = None,
+    ):
+        """
+        index_version is the serving index's version read before retrieval;
+        if a reload lands mid-request the answer is then only kept under the
+        old version, never served for the new one
+        """
+        if not use_cache or self.semantic_cache is None or query_embedding is None:
+            return None
+        # Answers grounded in a filtered subset only serve the same filter
+        return self.semantic_cache.lookup(
+            query_embedding[0], language, index_version or self.vector_store.index_version,
+            scope=filters_key(filters),
+        )
 
+    def _cache_store(
+        self,
+        query_embedding,
+        language: str,
+        answer: str,
+        retrieved_chunks: List[Dict],
+        use_cache: bool,
+        filters: Optional[Dict] = None,
+        index_version: Optional[str] = None,
+    ):
+        if not use_cache or self.semantic_cache is None or query_embedding is None:
+            return
+        # Sources are always kept so a later hit can honour return_sources
+        self.semantic_cache.store(
+            query_embedding[0],
+            language,
+            {"answer": answer, "sources": self._format_sources(retrieved_chunks)},
+            index_version or self.vector_store.index_version,
+            scope=filters_key(filters),
+        )
+
+    def _response_from_cache(self, cached: Dict, return_sources: bool) -> Dict:
+        response = {"answer": cached["answer"]}
+        if return_sources and cached["sources"]:
+            # Callers own their response; the cache entry stays untouched
+            response["sources"] = copy.deepcopy(cached["sources"])
+        return response
+
+    def _flight_key(
+        self,
+        user_query: str,
+        language: str,
+        return_sources: bool,
+        use_cache: bool,
+        filters: Optional[Dict] = None,
+    ):
+        return (
+            normalize_query(user_query), language.lower(), return_sources, use_cache,
+            filters_key(filters),
+        )
+
+    # ---------------------------
+    # Sync API
+    # ---------------------------
     def query(
         self,
         user_query: str,
         language: str = "English",
         return_sources: bool = False,
+        use_cache: bool = True,
+        filters: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Answer a teacher query; concurrent duplicates are coalesced.
+        filters restrict retrieval by chunk metadata, e.g. {"grade": 6}
+        """
+        response = self._single_flight.do(
+            self._flight_key(user_query, language, return_sources, use_cache, filters),
+            lambda: self._query(user_query, language, return_sources, use_cache, filters),
+        )
+        # Waiters share one result object (nested sources included); hand
+        # each caller its own copy
+        return copy.deepcopy(response)
+
+    def _query(
+        self,
+        user_query: str,
+        language: str,
+        return_sources: bool,
+        use_cache: bool,
+        filters: Optional[Dict] = None,
     ) -> Dict:
 
         # 1️⃣ Casual conversation
         if is_casual_query(user_query):
-            answer = (
-                "Hello! I am Vidyamitra. "
-                "I can help you with classroom teaching, "
-                "student learning challenges, and practical teaching strategies."
-            )
             return {
-                "answer": self.llm.translate(answer, language),
+                "answer": self.llm.translate(CASUAL_ANSWER, language),
                 "sources": None,
             }
 
-        # 2️⃣ Retrieval (SAFE)
+        # 2️⃣ Query embedding → semantic cache → retrieval (SAFE)
+        index_version = self.vector_store.index_version
+        query_embedding = None
         retrieved_chunks = []
         try:
-            retrieved_chunks = self.vector_store.search(
-                user_query, top_k=self.top_k
+            query_embedding, retrieved_chunks = self._embed_and_search(user_query, filters)
+
+            cached = self._cache_lookup(
+                query_embedding, language, use_cache, filters, index_version
             )
+            if cached is not None:
+                return self._response_from_cache(cached, return_sources)
         except Exception:
             retrieved_chunks = []
 
-        # 3️⃣ Context handling
-        if retrieved_chunks:
-            context = format_context_from_chunks(retrieved_chunks)
-        else:
-            context = (
-                "No specific training material was found. "
-                "Answer using general classroom teaching best practices."
-            )
+        return self._answer(
+            user_query, language, return_sources, use_cache,
+            query_embedding, retrieved_chunks, filters, index_version,
+        )
 
-        # 4️⃣ Prompt
-        system_message = get_system_message()
-        user_prompt = get_user_prompt(user_query, context)
-        final_prompt = f"{system_message}\n\n{user_prompt}"
+    def _answer(
+        self,
+        user_query: str,
+        language: str,
+        return_sources: bool,
+        use_cache: bool,
+        query_embedding,
+        retrieved_chunks: List[Dict],
+        filters: Optional[Dict] = None,
+        index_version: Optional[str] = None,
+    ) -> Dict:
+        """
+        Generation half of the pipeline, given retrieval results
+        """
+
+        # 3️⃣ Context + 4️⃣ Prompt
+        mode = self.generation_mode(language)
+        final_prompt = self._build_prompt(user_query, retrieved_chunks, language)
+        started = time.perf_counter()
 
         # 5️⃣ LLM generation
         answer = self.llm.generate(
             final_prompt,
             temperature=0.3,
-            max_tokens=450,
+            max_tokens=DIRECT_MAX_TOKENS if mode == "direct" else 450,
         )
 
-        # 6️⃣ Translation
-        answer = self.llm.translate(answer, language)
+        # 6️⃣ Translation (only when not answered directly)
+        if mode == "translate":
+            answer = self.llm.translate(answer, language)
 
-        response = {"answer": answer}
+        self._record_latency(mode, started)
+        self._cache_store(
+            query_embedding, language, answer, retrieved_chunks, use_cache, filters,
+            index_version,
+        )
+
+        return self._build_response(answer, retrieved_chunks, return_sources)
+
+    # ---------------------------
+    # Async API
+    # ---------------------------
+    async def aquery(
+        self,
+        user_query: str,
+        language: str = "English",
+        return_sources: bool = False,
+        use_cache: bool = True,
+        filters: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Non-blocking query(): LLM calls go through the pooled async client,
+        embedding + FAISS search run on the dedicated embedding executor.
+        Concurrent duplicates are coalesced.
+        """
+        response = await self._async_single_flight.do(
+            self._flight_key(user_query, language, return_sources, use_cache, filters),
+            lambda: self._aquery(user_query, language, return_sources, use_cache, filters),
+        )
+        return copy.deepcopy(response)
+
+    async def _aquery(
+        self,
+        user_query: str,
+        language: str,
+        return_sources: bool,
+        use_cache: bool,
+        filters: Optional[Dict] = None,
+    ) -> Dict:
+
+        if is_casual_query(user_query):
+            return {
+                "answer": await self.llm.atranslate(CASUAL_ANSWER, language),
+                "sources": None,
+            }
+
+        index_version = self.vector_store.index_version
+        query_embedding = None
+        retrieved_chunks = []
+        try:
+            query_embedding, retrieved_chunks = await self._aembed_and_search(
+                user_query, filters
+            )
+
+            cached = self._cache_lookup(
+                query_embedding, language, use_cache, filters, index_version
+            )
+            if cached is not None:
+                return self._response_from_cache(cached, return_sources)
+        except Exception:
+            retrieved_chunks = []
+
+        return await self._aanswer(
+            user_query, language, return_sources, use_cache,
+            query_embedding, retrieved_chunks, filters, index_version,
+        )
+
+    async def _aanswer(
+        self,
+        user_query: str,
+        language: str,
+        return_sources: bool,
+        use_cache: bool,
+        query_embedding,
+        retrieved_chunks: List[Dict],
+        filters: Optional[Dict] = None,
+        index_version: Optional[str] = None,
+    ) -> Dict:
+        mode = self.generation_mode(language)
+        final_prompt = self._build_prompt(user_query, retrieved_chunks, language)
+        started = time.perf_counter()
+
+        answer = await self.llm.agenerate(
+            final_prompt,
+            temperature=0.3,
+            max_tokens=DIRECT_MAX_TOKENS if mode == "direct" else 450,
+        )
+
+        if mode == "translate":
+            answer = await self.llm.atranslate(answer, language)
+
+        self._record_latency(mode, started)
+        self._cache_store(
+            query_embedding, language, answer, retrieved_chunks, use_cache, filters,
+            index_version,
+        )
+
+        return self._build_response(answer, retrieved_chunks, return_sources)
+
+    # ---------------------------
+    # Batch API
+    # ---------------------------
+    def _retrieve_batch(self, queries: List[str], filters: Optional[Dict] = None):
+        """
+        One encode + one FAISS search for every non-casual query in the batch
+
+        Returns:
+            {position: (query_embedding, retrieved_chunks)}
+        """
+        positions = [i for i, q in enumerate(queries) if not is_casual_query(q)]
+        if not positions:
+            return {}
+
+        try:
+            embeddings, results = self.vector_store.search_batch_with_embeddings(
+                [queries[i] for i in positions], top_k=self.candidates,
+                filters=filters, with_vectors=self._rerank,
+            )
+        except Exception:
+            return {i: (None, []) for i in positions}
+
+        return {
+            i: (embeddings[row:row + 1], self.context_builder.build(results[row]))
+            for row, i in enumerate(positions)
+        }
+
+    def _answer_one(
+        self,
+        user_query: str,
+        retrieved,
+        language: str,
+        return_sources: bool,
+        use_cache: bool,
+        filters: Optional[Dict] = None,
+        index_version: Optional[str] = None,
+    ) -> Dict:
+        if retrieved is None:
+            return self._query(user_query, language, return_sources, use_cache, filters)
+
+        query_embedding, retrieved_chunks = retrieved
+        cached = self._cache_lookup(
+            query_embedding, language, use_cache, filters, index_version
+        )
+        if cached is not None:
+            return self._response_from_cache(cached, return_sources)
+
+        return self._answer(
+            user_query, language, return_sources, use_cache,
+            query_embedding, retrieved_chunks, filters, index_version,
+        )
+
+    async def _aanswer_one(
+        self,
+        user_query: str,
+        retrieved,
+        language: str,
+        return_sources: bool,
+        use_cache: bool,
+        filters: Optional[Dict] = None,
+        index_version: Optional[str] = None,
+    ) -> Dict:
+        if retrieved is None:
+            return await self._aquery(user_query, language, return_sources, use_cache, filters)
+
+        query_embedding, retrieved_chunks = retrieved
+        cached = self._cache_lookup(
+            query_embedding, language, use_cache, filters, index_version
+        )
+        if cached is not None:
+            return self._response_from_cache(cached, return_sources)
+
+        return await self._aanswer(
+            user_query, language, return_sources, use_cache,
+            query_embedding, retrieved_chunks, filters, index_version,
+        )
+
+    def query_batch(
+        self,
+        queries: List[str],
+        language: str = "English",
+        return_sources: bool = False,
+        use_cache: bool = True,
+        concurrency: int = 8,
+        filters: Optional[Dict] = None,
+    ):
+        """
+        Answer many queries: retrieval runs as one batch, LLM calls run on at
+        most `concurrency` threads. Yields (position, response) as each
+        answer finishes; a failed query yields {"error": ...} instead.
+        """
+        index_version = self.vector_store.index_version
+        retrieved = self._retrieve_batch(queries, filters)
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = {
+                pool.submit(
+                    self._answer_one, q, retrieved.get(i),
+                    language, return_sources, use_cache, filters, index_version,
+                ): i
+                for i, q in enumerate(queries)
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], {"error": str(e)}
+
+    async def aquery_batch(
+        self,
+        queries: List[str],
+        language: str = "English",
+        return_sources: bool = False,
+        use_cache: bool = True,
+        concurrency: int = 8,
+        filters: Optional[Dict] = None,
+    ):
+        """
+        Async query_batch(): at most `concurrency` queries of this batch are
+        in the LLM stage at once (the global LLM cap still applies)
+        """
+        loop = asyncio.get_running_loop()
+        index_version = self.vector_store.index_version
+        retrieved = await loop.run_in_executor(
+            get_embedding_executor(), self._retrieve_batch, queries, filters
+        )
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(i: int, q: str):
+            async with semaphore:
+                try:
+                    return i, await self._aanswer_one(
+                        q, retrieved.get(i), language, return_sources, use_cache,
+                        filters, index_version,
+                    )
+                except Exception as e:
+                    return i, {"error": str(e)}
+
+        tasks = [asyncio.ensure_future(run(i, q)) for i, q in enumerate(queries)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client went away: do not keep spending upstream calls
+            for task in tasks:
+                task.cancel()
+
+    # ---------------------------
+    # Streaming API
+    # ---------------------------
+    async def astream(
+        self,
+        user_query: str,
+        language: str = "English",
+        return_sources: bool = False,
+        use_cache: bool = True,
+        filters: Optional[Dict] = None,
+    ):
+        """
+        Stream the answer as (event, data) pairs:
+        - ("token", {"text": ...}) for each visible text delta
+        - ("sources", {"sources": [...]}) once, when requested and available
+        - ("done", {}) at the end
+
+        English and "direct" languages stream straight from generation;
+        "translate" languages are generated in English first, then the
+        translation is streamed.
+        """
+
+        if is_casual_query(user_query):
+            async for text in self.llm.astream_translate(CASUAL_ANSWER, language):
+                yield "token", {"text": text}
+            yield "done", {}
+            return
+
+        index_version = self.vector_store.index_version
+        query_embedding = None
+        retrieved_chunks = []
+        cached = None
+        try:
+            query_embedding, retrieved_chunks = await self._aembed_and_search(
+                user_query, filters
+            )
+            cached = self._cache_lookup(
+                query_embedding, language, use_cache, filters, index_version
+            )
+        except Exception:
+            retrieved_chunks = []
+
+        if cached is not None:
+            response = self._response_from_cache(cached, return_sources)
+            yield "token", {"text": response["answer"]}
+            if response.get("sources"):
+                yield "sources", {"sources": response["sources"]}
+            yield "done", {}
+            return
+
+        mode = self.generation_mode(language)
+        final_prompt = self._build_prompt(user_query, retrieved_chunks, language)
+        started = time.perf_counter()
+        parts = []
+
+        if mode != "translate":
+            async for text in self.llm.astream_generate(
+                final_prompt,
+                temperature=0.3,
+                max_tokens=DIRECT_MAX_TOKENS if mode == "direct" else 450,
+            ):
+                parts.append(text)
+                yield "token", {"text": text}
+        else:
+            answer = await self.llm.agenerate(
+                final_prompt,
+                temperature=0.3,
+                max_tokens=450,
+            )
+            async for text in self.llm.astream_translate(answer, language):
+                parts.append(text)
+                yield "token", {"text": text}
+
+        self._record_latency(f"stream.{mode}", started)
+        self._cache_store(
+            query_embedding, language, "".join(parts).strip(), retrieved_chunks,
+            use_cache, filters, index_version,
+        )
 
         if return_sources and retrieved_chunks:
-            response["sources"] = [
-                {
-                    "text": c.get("text", "")[:200] + "...",
-                    "metadata": c.get("metadata", {}),
-                    "score": c.get("score", 0),
-                }
-                for c in retrieved_chunks
-            ]
+            yield "sources", {"sources": self._format_sources(retrieved_chunks)}
 
-        return response
+        yield "done", {}
 
 
-def get_rag_pipeline(llm_provider: str = "groq", top_k: int = 1):
+def get_rag_pipeline(llm_provider: str = "groq", top_k: int | None = None):
     return RAGPipeline(llm_provider=llm_provider, top_k=top_k)
@@ -0,0 +1,169 @@
+"""
+Semantic Answer Cache Module for Vidyamitra
+Reuses answers for queries whose embeddings are near-identical to a
+recently answered query in the same language and retrieval scope
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import faiss
+
+from app import config
+from app.utils.metrics import metrics
+
+
+@dataclass
+class _CacheEntry:
+    language: str
+    response: Dict
+    created_at: float
+    # Retrieval restriction the answer was grounded in (metadata filters)
+    scope: str = ""
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        dimension: int,
+        threshold: float = 0.92,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400.0,
+        candidates: int = 8,
+    ):
+        """
+        Args:
+            dimension: Query embedding dimension
+            threshold: Minimum cosine similarity for a hit
+            max_entries: LRU size bound
+            ttl_seconds: Entries older than this are never returned
+            candidates: Neighbours inspected per lookup (language / TTL checks)
+        """
+        self.dimension = dimension
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.candidates = candidates
+
+        self._lock = threading.Lock()
+        self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._next_id = 0
+        self._index_version: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_ids):
+        for entry_id in entry_ids:
+            self._entries.pop(entry_id, None)
+        self._index.remove_ids(np.asarray(entry_ids, dtype="int64"))
+
+    def _check_version(self, index_version: Optional[str]):
+        # Answers were grounded in the old index; drop them all on rebuild
+        if index_version != self._index_version:
+            if self._entries:
+                metrics.increment("semantic_cache.invalidations")
+            self._entries.clear()
+            self._index.reset()
+            self._index_version = index_version
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._index.reset()
+
+    def lookup(
+        self,
+        query_embedding: np.ndarray,
+        language: str,
+        index_version: Optional[str] = None,
+        scope: str = "",
+    ) -> Optional[Dict]:
+        """
+        Return the cached response for a similar query, or None
+
+        Args:
+            query_embedding: L2-normalized query vector
+            language: Requested answer language (must match exactly)
+            index_version: Version of the main index the answer must come from
+            scope: Retrieval scope (e.g. a filters key); must match exactly
+        """
+        with self._lock:
+            self._check_version(index_version)
+
+            if not self._entries:
+                metrics.increment("semantic_cache.misses")
+                return None
+
+            scores, ids = self._index.search(
+                query_embedding.reshape(1, -1).astype("float32"),
+                min(self.candidates, len(self._entries)),
+            )
+
+            now = time.time()
+            expired = []
+            hit = None
+
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id < 0 or score < self.threshold:
+                    break
+                entry = self._entries.get(int(entry_id))
+                if entry is None:
+                    continue
+                if now - entry.created_at > self.ttl_seconds:
+                    expired.append(int(entry_id))
+                    continue
+                if entry.language.lower() == language.lower() and entry.scope == scope:
+                    self._entries.move_to_end(int(entry_id))
+                    hit = entry.response
+                    break
+
+            if expired:
+                self._remove(expired)
+
+        metrics.increment("semantic_cache.hits" if hit else "semantic_cache.misses")
+        return hit
+
+    def store(
+        self,
+        query_embedding: np.ndarray,
+        language: str,
+        response: Dict,
+        index_version: Optional[str] = None,
+        scope: str = "",
+    ):
+        with self._lock:
+            self._check_version(index_version)
+
+            entry_id = self._next_id
+            self._next_id += 1
+
+            self._index.add_with_ids(
+                query_embedding.reshape(1, -1).astype("float32"),
+                np.array([entry_id], dtype="int64"),
+            )
+            self._entries[entry_id] = _CacheEntry(language, response, time.time(), scope)
+
+            if len(self._entries) > self.max_entries:
+                overflow = len(self._entries) - self.max_entries
+                self._remove(list(self._entries.keys())[:overflow])
+
+
+def get_semantic_cache(dimension: int) -> Optional[SemanticCache]:
+    """
+    Factory using configured threshold / size / TTL (None when disabled)
+    """
+    if not config.SEMANTIC_CACHE_ENABLED:
+        return None
+
+    return SemanticCache(
+        dimension=dimension,
+        threshold=config.SEMANTIC_CACHE_THRESHOLD,
+        max_entries=config.SEMANTIC_CACHE_SIZE,
+        ttl_seconds=config.SEMANTIC_CACHE_TTL_SECONDS,
+    )
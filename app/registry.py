@@ -0,0 +1,342 @@
+"""
+Model & Index Registry Module for Vidyamitra
+One process-wide home for the expensive objects: the embedding model, the
+vector store (FAISS index + chunk store), the LLM client and the RAG
+pipeline built on them.
+
+- Each component is created once, on first use, by whichever thread asks
+  first; concurrent callers wait for that load instead of starting their own
+- Heavy libraries (sentence_transformers and torch, or onnxruntime) are
+  only imported when the embedding model is actually loaded, so importing
+  the app stays cheap
+- Loading state and timings per component are exposed for health and
+  readiness checks
+- The vector store can be replaced while serving: a newly published index
+  version is loaded on the side and swapped in with one reference
+  assignment; searches already running finish on the store they started with
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from app import config
+
+
+class _Component:
+    def __init__(self, name: str, factory: Callable):
+        self.name = name
+        self.factory = factory
+        self.state = "idle"  # idle -> loading -> ready | failed
+        self.value = None
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self.state == "ready":
+            return self.value
+
+        # The first caller loads; later ones block here until it is done
+        with self._lock:
+            if self.state == "ready":
+                return self.value
+
+            self.state = "loading"
+            started = time.perf_counter()
+            try:
+                value = self.factory()
+            except Exception as e:
+                self.state, self.error = "failed", str(e)
+                raise
+            self.value, self.error = value, None
+            self.seconds = round(time.perf_counter() - started, 3)
+            self.state = "ready"
+            return value
+
+    def swap(self, value):
+        """Replace a ready value; callers holding the old one keep using it"""
+        with self._lock:
+            self.value, self.error = value, None
+            self.state = "ready"
+
+    def status(self) -> Dict:
+        status = {"state": self.state}
+        if self.seconds is not None:
+            status["load_seconds"] = self.seconds
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+def _embedding_model_key(model_name: str, backend: str) -> str:
+    return f"embedding_model:{model_name}@{backend}"
+
+
+def _load_embedding_model(model_name: str, backend: str):
+    # The torch backend only imports torch here, when it is first needed
+    from app.retrieval.embedding_backend import load_embedding_backend
+
+    return load_embedding_backend(model_name, backend)
+
+
+def _open_vector_store(index_dir: str | None = None):
+    from app.retrieval.vector_store import VectorStore
+
+    store = VectorStore(index_dir=index_dir)
+    store.load_index(mmap=config.INDEX_MMAP)
+    return store
+
+
+def _load_vector_store():
+    from app.retrieval.vector_store import VectorStore
+
+    try:
+        return _open_vector_store()
+    except FileNotFoundError:
+        print("⚠️ Vector index not found. Run embedding creation first.")
+        return VectorStore()
+
+
+def _load_llm(provider: str):
+    from app.rag.llm import get_llm
+
+    return get_llm(provider=provider)
+
+
+def _load_rag_pipeline():
+    from app.rag.rag_pipeline import RAGPipeline
+
+    return RAGPipeline()
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[str, _Component] = {}
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self._warmed_up = threading.Event()
+        # torch intra-op threads to restore in forked workers
+        self._torch_threads: Optional[int] = None
+        # One index reload at a time; the watcher and /admin/reload share it
+        self._reload_lock = threading.Lock()
+        self._last_reload: Optional[Dict] = None
+        self._watcher_thread: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+
+    def _component(self, name: str, factory: Callable) -> _Component:
+        with self._lock:
+            component = self._components.get(name)
+            if component is None:
+                component = self._components[name] = _Component(name, factory)
+            return component
+
+    # ---------------------------
+    # Components
+    # ---------------------------
+    def embedding_model(self, model_name: str | None = None, backend: str | None = None):
+        """EmbeddingBackend for the model (defaults: EMBEDDING_MODEL / EMBEDDING_BACKEND)"""
+        model_name = model_name or config.EMBEDDING_MODEL
+        backend = backend or config.EMBEDDING_BACKEND
+        return self._component(
+            _embedding_model_key(model_name, backend),
+            lambda: _load_embedding_model(model_name, backend),
+        ).get()
+
+    def vector_store(self):
+        """The serving vector store (index loaded from the default location)"""
+        return self._component("vector_store", _load_vector_store).get()
+
+    def llm(self, provider: str = "groq"):
+        return self._component(f"llm:{provider}", lambda: _load_llm(provider)).get()
+
+    def rag_pipeline(self):
+        return self._component("rag_pipeline", _load_rag_pipeline).get()
+
+    async def arag_pipeline(self):
+        """rag_pipeline() without blocking the event loop while it loads"""
+        component = self._component("rag_pipeline", _load_rag_pipeline)
+        if component.state == "ready":
+            return component.value
+        return await asyncio.get_running_loop().run_in_executor(None, component.get)
+
+    # ---------------------------
+    # Index hot-reload
+    # ---------------------------
+    def reload_vector_store(self, force: bool = False) -> Dict:
+        """
+        Swap in the index version the manifest currently points at.
+
+        The new store is loaded and warmed with one search while the old one
+        keeps serving; only then is the registry's reference replaced.
+        Requests that already hold the old store finish on it, and it is
+        freed once the last of them lets go. If loading fails the old store
+        stays in place and the error is raised.
+
+        Args:
+            force: Reload even if the current version is already served
+        """
+        from app.retrieval.index_versions import current_index_dir
+
+        component = self._component("vector_store", _load_vector_store)
+        with self._reload_lock:
+            index_dir = current_index_dir()
+            old = component.value if component.state == "ready" else None
+            if not force and old is not None and old.index_dir == index_dir:
+                return {"reloaded": False, "index_dir": index_dir,
+                        "index_version": old.index_version}
+
+            started = time.perf_counter()
+            store = _open_vector_store(index_dir)
+            if old is not None and old.index is not None and store.dimension != old.dimension:
+                raise ValueError(
+                    f"Index dimension {store.dimension} does not match the "
+                    f"serving index ({old.dimension}); restart with the new model"
+                )
+            # Pages in the index and allocates search buffers off the swap
+            store.search("warm up", top_k=1)
+            load_seconds = time.perf_counter() - started
+
+            component.swap(store)
+            self._last_reload = {
+                "index_dir": index_dir,
+                "index_version": store.index_version,
+                "chunks": len(store.chunks),
+                "load_seconds": round(load_seconds, 3),
+                "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            print(f"🔁 Swapped in index {index_dir} ({len(store.chunks)} chunks, "
+                  f"{load_seconds:.2f}s to load)")
+            return {"reloaded": True, **self._last_reload}
+
+    def start_index_watcher(self, interval: float | None = None) -> Optional[threading.Thread]:
+        """
+        Poll the index manifest in the background and reload when it names a
+        new version. Every process runs its own watcher (each worker holds
+        its own store). Returns None when watching is disabled.
+        """
+        interval = config.INDEX_RELOAD_INTERVAL_SECONDS if interval is None else interval
+        if interval <= 0:
+            return None
+
+        def run():
+            while not self._watcher_stop.wait(interval):
+                component = self._components.get("vector_store")
+                # Nothing loaded yet: the first use loads the current version
+                if component is None or component.state != "ready":
+                    continue
+                try:
+                    self.reload_vector_store()
+                except Exception as e:
+                    print(f"❌ Index reload failed, still serving the old index: {e}")
+
+        with self._lock:
+            if self._watcher_thread is None:
+                self._watcher_stop.clear()
+                self._watcher_thread = threading.Thread(
+                    target=run, name="index-watcher", daemon=True
+                )
+                self._watcher_thread.start()
+            return self._watcher_thread
+
+    # ---------------------------
+    # Multi-worker serving
+    # ---------------------------
+    def preload_for_fork(self):
+        """
+        Load, in the server's master process, what forked workers can share
+        copy-on-write: the vector store (lexical and filter indexes, ID map;
+        the FAISS index and chunk texts are file mappings shared anyway) and,
+        with the torch backend, the model weights.
+
+        Nothing here may start threads, which do not survive fork: no
+        encode or search runs, torch loads with a single intra-op thread,
+        and ONNX Runtime sessions (thread pools created with the session)
+        are left to each worker.
+        """
+        if config.EMBEDDING_BACKEND == "torch":
+            import torch
+
+            self._torch_threads = torch.get_num_threads()
+            torch.set_num_threads(1)
+            self.embedding_model()
+
+        self.vector_store()
+
+    def after_fork(self):
+        """Per-worker setup after preload_for_fork()"""
+        if self._torch_threads:
+            import torch
+
+            torch.set_num_threads(self._torch_threads)
+
+    # ---------------------------
+    # Warm-up & status
+    # ---------------------------
+    def warm_up(self):
+        """Load everything serving needs and run one query encode"""
+        pipeline = self.rag_pipeline()
+        # Loads the model (a loaded index alone does not need it) and runs
+        # the first forward pass, which allocates buffers; keep both off a
+        # request
+        pipeline.vector_store.embed_queries(["warm up"])
+        self._warmed_up.set()
+
+    def start_warm_up(self) -> threading.Thread:
+        """warm_up() on a background thread; the server answers meanwhile"""
+        def run():
+            try:
+                self.warm_up()
+                print("✅ Warm-up complete")
+            except Exception as e:
+                print(f"❌ Warm-up failed: {e}")
+
+        with self._lock:
+            if self._warm_up_thread is None:
+                self._warm_up_thread = threading.Thread(
+                    target=run, name="registry-warm-up", daemon=True
+                )
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+
+    def is_ready(self) -> bool:
+        """
+        Serving will not block on a load: after warm-up when one was
+        started, else once the pipeline and the embedding model are loaded
+        """
+        if self._warm_up_thread is not None:
+            return self._warmed_up.is_set()
+
+        names = (
+            "rag_pipeline",
+            _embedding_model_key(config.EMBEDDING_MODEL, config.EMBEDDING_BACKEND),
+        )
+        components = [self._components.get(name) for name in names]
+        return all(c is not None and c.state == "ready" for c in components)
+
+    def status(self) -> Dict:
+        with self._lock:
+            components = dict(self._components)
+        status = {
+            "ready": self.is_ready(),
+            "components": {name: c.status() for name, c in sorted(components.items())},
+        }
+        if self._last_reload:
+            status["last_index_reload"] = self._last_reload
+        return status
+
+    async def aclose(self):
+        self._watcher_stop.set()
+
+        pipeline = self._components.get("rag_pipeline")
+        if pipeline is not None and pipeline.state == "ready" and pipeline.value.query_batcher:
+            pipeline.value.query_batcher.close()
+
+        for name, component in list(self._components.items()):
+            if name.startswith("llm:") and component.state == "ready":
+                await component.value.aclose()
+
+
+# Process-wide instance
+registry = Registry()
@@ -0,0 +1,160 @@
+"""
+Query Micro-batching Module for Vidyamitra
+Collects queries from concurrent requests for a short window, encodes them
+in one forward pass and runs one batched FAISS search, then fans the
+results back out to each caller
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, List, Optional, Tuple
+
+from app import config
+from app.retrieval.metadata_filter import filters_key
+from app.utils.metrics import metrics
+
+
+class QueryBatcher:
+    def __init__(
+        self,
+        vector_store,
+        window_ms: float = 5.0,
+        max_batch_size: int = 32,
+        with_vectors: bool = False,
+    ):
+        """
+        Args:
+            vector_store: VectorStore used for embedding + search, or a
+                function returning it (called once per batch, so a reloaded
+                store is picked up by the next batch)
+            window_ms: How long the first query of a batch waits for company
+            max_batch_size: Upper bound on queries encoded together
+            with_vectors: Return each hit's stored embedding (for reranking)
+        """
+        self._vector_store = vector_store if callable(vector_store) else (lambda: vector_store)
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.with_vectors = with_vectors
+
+        self._queue: "queue.Queue[Tuple[str, int, Optional[Dict], Future]]" = queue.Queue()
+        self._closed = threading.Event()
+        self._worker = threading.Thread(
+            target=self._run, name="query-batcher", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, query: str, top_k: int, filters: Optional[Dict] = None) -> Future:
+        """
+        Queue a query; the future resolves to (query_embedding, results) where
+        query_embedding is a (1, dim) array and results the top-k chunks
+        (restricted by the metadata filters, if any)
+        """
+        if self._closed.is_set():
+            raise RuntimeError("QueryBatcher is closed")
+
+        future: Future = Future()
+        self._queue.put((query, top_k, filters, future))
+        return future
+
+    def close(self):
+        self._closed.set()
+        self._queue.put(None)
+        self._worker.join(timeout=1.0)
+
+    # ---------------------------
+    # Worker
+    # ---------------------------
+    def _collect(self, first) -> List:
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._closed.set()
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        while not self._closed.is_set():
+            first = self._queue.get()
+            if first is None:
+                break
+            # The worker must outlive any one batch: if it died, every later
+            # submit would wait forever
+            try:
+                self._process(self._collect(first))
+            except Exception as e:
+                print(f"❌ Query batch failed: {e}")
+
+    @staticmethod
+    def _resolve(future: Future, result=None, error: Exception | None = None):
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            # Resolved elsewhere in the meantime; nobody is waiting on it
+            pass
+
+    def _process(self, batch: List):
+        # Callers that gave up (client disconnect, timeout, task cancelled)
+        # are dropped; the rest can no longer be cancelled from here on
+        batch = [item for item in batch if item[3].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        queries = [query for query, _, _, _ in batch]
+        max_k = max(top_k for _, top_k, _, _ in batch)
+
+        # One encode for the whole batch; one search per distinct filter
+        groups: Dict[str, List[int]] = {}
+        for row, (_, _, filters, _) in enumerate(batch):
+            groups.setdefault(filters_key(filters), []).append(row)
+
+        results: List = [None] * len(batch)
+        try:
+            vector_store = self._vector_store()
+            embeddings = vector_store.embed_queries(queries)
+            for rows in groups.values():
+                group_results = vector_store.search_vectors(
+                    embeddings[rows], max_k, [queries[r] for r in rows], batch[rows[0]][2],
+                    with_vectors=self.with_vectors,
+                )
+                for row, result in zip(rows, group_results):
+                    results[row] = result
+        except Exception as e:
+            for _, _, _, future in batch:
+                self._resolve(future, error=e)
+            return
+
+        metrics.observe("retrieval.batch_size", len(batch))
+
+        for row, (_, top_k, _, future) in enumerate(batch):
+            self._resolve(future, (embeddings[row:row + 1], results[row][:top_k]))
+
+
+def get_query_batcher(vector_store, with_vectors: bool = False) -> Optional[QueryBatcher]:
+    """
+    Factory using configured window / batch size (None when disabled)
+    """
+    if config.EMBED_BATCH_WINDOW_MS <= 0 or config.EMBED_BATCH_MAX_SIZE <= 1:
+        return None
+
+    return QueryBatcher(
+        vector_store,
+        window_ms=config.EMBED_BATCH_WINDOW_MS,
+        max_batch_size=config.EMBED_BATCH_MAX_SIZE,
+        with_vectors=with_vectors,
+    )
@@ -0,0 +1,212 @@
+"""
+Chunk Store Module for Vidyamitra
+Compact, memory-mapped on-disk storage for indexed chunks:
+- chunks.text.bin    UTF-8 text of all chunks, back to back
+- chunks.offsets.npy int64 byte offsets (n + 1) into the text blob
+- chunks.meta.json   interned table of distinct metadata dicts
+- chunks.meta_ids.npy int32 metadata table row per chunk
+- chunks.ids.npy     int64 stable chunk ID (content hash) per chunk
+
+Opening the store maps the files instead of reading them, so startup cost
+and resident memory do not grow with corpus size, and workers share the
+same page-cache pages. Only chunks that are actually accessed get decoded.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+
+TEXT_FILE = "chunks.text.bin"
+OFFSETS_FILE = "chunks.offsets.npy"
+META_FILE = "chunks.meta.json"
+META_IDS_FILE = "chunks.meta_ids.npy"
+IDS_FILE = "chunks.ids.npy"
+STORE_FILES = (TEXT_FILE, OFFSETS_FILE, META_FILE, META_IDS_FILE, IDS_FILE)
+
+
+def chunk_text_of(chunk: Dict) -> str:
+    """Text of a chunk dict (older ingestion output used the 'content' key)"""
+    return chunk.get("text") or chunk.get("content", "")
+
+
+def chunk_id_of(chunk: Dict) -> int:
+    """
+    Stable chunk ID derived from the chunk text: identical text always maps
+    to the same ID, so unchanged chunks are recognised across ingestions
+    """
+    digest = hashlib.blake2b(chunk_text_of(chunk).encode("utf-8"), digest_size=8).digest()
+    # FAISS IDs are signed 64-bit and -1 means "no result"; keep them positive
+    return int.from_bytes(digest, "little") & 0x7FFF_FFFF_FFFF_FFFF
+
+
+class IdRowMap:
+    """Maps chunk IDs to store rows with a sorted array (no per-ID dict)"""
+
+    def __init__(self, ids: np.ndarray):
+        self._order = np.argsort(ids, kind="stable")
+        self._sorted = np.asarray(ids)[self._order]
+
+    def rows(self, ids: np.ndarray) -> np.ndarray:
+        """Row for each ID, -1 where the ID is unknown"""
+        ids = np.asarray(ids, dtype="int64")
+        if not len(self._sorted):
+            return np.full(ids.shape, -1, dtype="int64")
+        pos = np.searchsorted(self._sorted, ids).clip(0, len(self._sorted) - 1)
+        found = self._sorted[pos] == ids
+        return np.where(found, self._order[pos], -1)
+
+
+class ChunkStoreWriter:
+    """Streams chunks to disk; files are moved into place on close()"""
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+
+        self._text_tmp = os.path.join(store_dir, TEXT_FILE + ".tmp")
+        self._text_file = open(self._text_tmp, "wb")
+        self._offsets: List[int] = [0]
+        self._ids: List[int] = []
+        self._meta_ids: List[int] = []
+        self._meta_table: List[Dict] = []
+        self._meta_lookup: Dict[str, int] = {}
+
+    def add(self, chunk: Dict, chunk_id: Optional[int] = None):
+        encoded = chunk_text_of(chunk).encode("utf-8")
+        self._text_file.write(encoded)
+        self._offsets.append(self._offsets[-1] + len(encoded))
+        self._ids.append(chunk_id_of(chunk) if chunk_id is None else chunk_id)
+
+        metadata = chunk.get("metadata", {}) or {}
+        key = json.dumps(metadata, sort_keys=True, ensure_ascii=False)
+        meta_id = self._meta_lookup.get(key)
+        if meta_id is None:
+            meta_id = len(self._meta_table)
+            self._meta_lookup[key] = meta_id
+            self._meta_table.append(metadata)
+        self._meta_ids.append(meta_id)
+
+    def add_many(self, chunks: Iterable[Dict]):
+        for chunk in chunks:
+            self.add(chunk)
+
+    def close(self):
+        self._text_file.close()
+
+        def _replace(name: str, write):
+            tmp = os.path.join(self.store_dir, name + ".tmp")
+            write(tmp)
+            os.replace(tmp, os.path.join(self.store_dir, name))
+
+        def _save_npy(array):
+            def write(path):
+                with open(path, "wb") as f:
+                    np.save(f, array)
+            return write
+
+        def _save_meta(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self._meta_table, f, ensure_ascii=False)
+
+        _replace(OFFSETS_FILE, _save_npy(np.asarray(self._offsets, dtype="int64")))
+        _replace(META_IDS_FILE, _save_npy(np.asarray(self._meta_ids, dtype="int32")))
+        _replace(IDS_FILE, _save_npy(np.asarray(self._ids, dtype="int64")))
+        _replace(META_FILE, _save_meta)
+        os.replace(self._text_tmp, os.path.join(self.store_dir, TEXT_FILE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._text_file.close()
+
+
+class ChunkStore:
+    """Read-only, list-like view over a chunk store directory"""
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+
+        self._offsets = np.load(os.path.join(store_dir, OFFSETS_FILE), mmap_mode="r")
+        self._meta_ids = np.load(os.path.join(store_dir, META_IDS_FILE), mmap_mode="r")
+        with open(os.path.join(store_dir, META_FILE), "r", encoding="utf-8") as f:
+            self._meta_table: List[Dict] = json.load(f)
+
+        ids_path = os.path.join(store_dir, IDS_FILE)
+        self.ids: Optional[np.ndarray] = (
+            np.load(ids_path, mmap_mode="r") if os.path.exists(ids_path) else None
+        )
+        self._id_map: Optional[IdRowMap] = None
+
+        self._text_fd = open(os.path.join(store_dir, TEXT_FILE), "rb")
+        size = os.fstat(self._text_fd.fileno()).st_size
+        # mmap cannot map an empty file
+        self._text = (
+            mmap.mmap(self._text_fd.fileno(), 0, access=mmap.ACCESS_READ)
+            if size else b""
+        )
+
+    @staticmethod
+    def exists(store_dir: str) -> bool:
+        return all(
+            os.path.exists(os.path.join(store_dir, name))
+            for name in (TEXT_FILE, OFFSETS_FILE, META_FILE, META_IDS_FILE)
+        )
+
+    def __len__(self) -> int:
+        return len(self._meta_ids)
+
+    def text(self, i: int) -> str:
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._text[start:end].decode("utf-8")
+
+    def metadata(self, i: int) -> Dict:
+        return dict(self._meta_table[int(self._meta_ids[i])])
+
+    def metadata_groups(self) -> Iterator[tuple[Dict, np.ndarray]]:
+        """(metadata, rows) per distinct metadata dict; rows are sorted"""
+        meta_ids = np.asarray(self._meta_ids)
+        order = np.argsort(meta_ids, kind="stable")
+        bounds = np.searchsorted(meta_ids[order], np.arange(len(self._meta_table) + 1))
+        for meta_id, metadata in enumerate(self._meta_table):
+            rows = order[bounds[meta_id]:bounds[meta_id + 1]]
+            if len(rows):
+                yield metadata, rows
+
+    def __getitem__(self, i: int) -> Dict:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return {"text": self.text(i), "metadata": self.metadata(i)}
+
+    @property
+    def id_map(self) -> IdRowMap:
+        if self._id_map is None:
+            ids = self.ids if self.ids is not None else np.array(
+                [chunk_id_of(c) for c in self], dtype="int64"
+            )
+            self._id_map = IdRowMap(ids)
+        return self._id_map
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        if isinstance(self._text, mmap.mmap):
+            self._text.close()
+        self._text_fd.close()
+
+
+def write_chunk_store(chunks: Iterable[Dict], store_dir: str):
+    with ChunkStoreWriter(store_dir) as writer:
+        writer.add_many(chunks)
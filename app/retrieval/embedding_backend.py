@@ -0,0 +1,183 @@
+"""
+Embedding Backend Module for Vidyamitra
+Interchangeable sentence encoders behind one small interface:
+- torch: sentence-transformers (what indexes have been built with so far)
+- onnx / onnx-int8: the same transformer exported to ONNX (optionally with
+  dynamically quantized int8 weights), run by ONNX Runtime with the
+  tokenizers library; no torch needed at serving time
+
+Every backend returns un-normalized float32 sentence vectors (mean pooled
+over real tokens, as the sentence-transformers model does); callers
+normalize. ONNX models are produced by scripts/export_onnx.py, which checks
+them against the torch vectors (MIN_COSINE) before they are used.
+
+Export layout (one directory per embedding model under ONNX_MODEL_DIR):
+- model.onnx / model.int8.onnx  transformer, last_hidden_state output
+- tokenizer.json                 fast tokenizer of the model
+- manifest.json                  dimension, max length, pooling, files
+"""
+
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+import numpy as np
+
+from app import config
+
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+MANIFEST_FILE = "manifest.json"
+TOKENIZER_FILE = "tokenizer.json"
+
+# Lowest acceptable cosine similarity between a backend's vector and the
+# torch vector for the same text. Above these, existing indexes keep
+# returning the same neighbours.
+MIN_COSINE = {"onnx": 0.9999, "onnx-int8": 0.98}
+
+
+def onnx_model_dir(model_name: str | None = None) -> str:
+    model_name = model_name or config.EMBEDDING_MODEL
+    return os.path.join(config.ONNX_MODEL_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+
+
+def mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Average of token vectors, padding excluded: (b, s, d) -> (b, d)"""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (hidden * mask).sum(axis=1)
+    return summed / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+class EmbeddingBackend(ABC):
+    """Interface: dimension, variant, cache_key and encode()"""
+
+    model_name: str
+    variant: str
+    dimension: int
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Identity for cached corpus vectors; variants whose vectors differ
+        never share a cache (torch keeps the bare model name, so caches
+        built before backends existed stay valid)
+        """
+        if self.variant == "torch":
+            return self.model_name
+        return f"{self.model_name}@{self.variant}"
+
+    @abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """(len(texts), dimension) float32 sentence vectors, input order"""
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    variant = "torch"
+
+    def __init__(self, model_name: str):
+        # Deferred: pulls in torch, which dominates import time and memory
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return self.model.encode(
+            texts, batch_size=batch_size, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+class OnnxBackend(EmbeddingBackend):
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int | None = None):
+        """
+        Args:
+            model_dir: Export directory (see module docstring)
+            quantized: Run the int8 model instead of the float32 one
+            threads: ONNX Runtime intra-op threads (defaults to ONNX_THREADS,
+                0 = one per core)
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            self.manifest: Dict = json.load(f)
+        if self.manifest.get("pooling", "mean") != "mean":
+            raise ValueError(f"Unsupported pooling: {self.manifest['pooling']}")
+
+        model_file = self.manifest["int8_file" if quantized else "model_file"]
+        if not model_file:
+            raise FileNotFoundError(f"No int8 model exported in {model_dir}")
+
+        self.model_name = self.manifest["model_name"]
+        self.variant = "onnx-int8" if quantized else "onnx"
+        self.dimension = int(self.manifest["dimension"])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = config.ONNX_THREADS if threads is None else threads
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        # Same truncation as the torch model; padding only to the longest
+        # text of each batch
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(int(self.manifest["max_seq_length"]))
+        pad_token = self.manifest.get("pad_token", "[PAD]")
+        self.tokenizer.enable_padding(
+            pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token
+        )
+
+    def _run(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": mask,
+        }
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        hidden = self.session.run(None, feeds)[0]
+        return mean_pool(hidden, mask)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        # Similar lengths share a batch, which keeps padding low
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._run([texts[i] for i in rows])
+        return embeddings
+
+
+def load_embedding_backend(
+    model_name: str | None = None, backend: str | None = None
+) -> EmbeddingBackend:
+    """
+    Args:
+        model_name: Embedding model (defaults to EMBEDDING_MODEL)
+        backend: torch | onnx | onnx-int8 (defaults to EMBEDDING_BACKEND)
+    """
+    model_name = model_name or config.EMBEDDING_MODEL
+    backend = backend or config.EMBEDDING_BACKEND
+
+    if backend == "torch":
+        return SentenceTransformerBackend(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        model_dir = onnx_model_dir(model_name)
+        if not os.path.exists(os.path.join(model_dir, MANIFEST_FILE)):
+            raise FileNotFoundError(
+                f"No ONNX export of {model_name} in {model_dir}; "
+                "run scripts/export_onnx.py first"
+            )
+        return OnnxBackend(model_dir, quantized=backend == "onnx-int8")
+
+    raise ValueError(f"Unknown embedding backend: {backend} (expected one of {BACKENDS})")
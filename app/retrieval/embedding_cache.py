@@ -0,0 +1,190 @@
+"""
+Embedding Cache Module for Vidyamitra
+Content-addressed, on-disk cache of chunk embeddings for index builds
+
+Layout (one directory per embedding model, with one subdirectory per
+storage dtype, float16 / float32, so switching precision never mixes rows):
+- vectors.f16 / vectors.f32  raw row-major matrix, appended to, memory-mapped
+- keys.bin                   16-byte text digest per row, same order
+- meta.json                  dimension, dtype, measured encode cost
+
+Rows are only ever appended (vectors first, then keys), so an interrupted
+build leaves a consistent prefix that the next run reuses.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app import config
+
+
+DIGEST_SIZE = 16
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, cache_dir: str, model_key: str, dimension: int, dtype: str = "float16"):
+        """
+        Args:
+            cache_dir: Root directory of the cache
+            model_key: Embedding model identity; vectors never mix across models
+            dimension: Embedding dimension
+            dtype: Storage precision, "float16" (half the disk) or "float32"
+        """
+        if dtype not in ("float16", "float32"):
+            raise ValueError("dtype must be float16 or float32")
+
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.dir = os.path.join(
+            cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_key), dtype
+        )
+        os.makedirs(self.dir, exist_ok=True)
+
+        self.vectors_path = os.path.join(self.dir, "vectors." + ("f16" if dtype == "float16" else "f32"))
+        self.keys_path = os.path.join(self.dir, "keys.bin")
+        self.meta_path = os.path.join(self.dir, "meta.json")
+
+        self.meta = {"dimension": dimension, "dtype": dtype, "seconds_per_item": None}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.meta.update(json.load(f))
+        if self.meta["dimension"] != dimension:
+            raise ValueError(
+                f"Cached dimension {self.meta['dimension']} != model dimension {dimension}"
+            )
+
+        self._rows: Dict[bytes, int] = {}
+        self._load_keys()
+
+        self.hits = 0
+        self.misses = 0
+        self.encode_seconds = 0.0
+
+    # ---------------------------
+    # Storage
+    # ---------------------------
+    def _row_bytes(self) -> int:
+        return self.dimension * self.dtype.itemsize
+
+    def _load_keys(self):
+        vector_rows = (
+            os.path.getsize(self.vectors_path) // self._row_bytes()
+            if os.path.exists(self.vectors_path) else 0
+        )
+        keys = b""
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "rb") as f:
+                keys = f.read()
+
+        # Both files only grow; trust the shorter one after a crash
+        rows = min(vector_rows, len(keys) // DIGEST_SIZE)
+        self._rows = {
+            keys[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]: i for i in range(rows)
+        }
+        self._truncate(rows)
+
+    def _truncate(self, rows: int):
+        for path, row_size in ((self.vectors_path, self._row_bytes()), (self.keys_path, DIGEST_SIZE)):
+            if os.path.exists(path) and os.path.getsize(path) != rows * row_size:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * row_size)
+
+    def _matrix(self) -> np.ndarray:
+        rows = len(self._rows)
+        if not rows:
+            return np.empty((0, self.dimension), dtype=self.dtype)
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dimension))
+
+    def _append(self, digests: List[bytes], vectors: np.ndarray):
+        start = len(self._rows)
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=self.dtype).tobytes())
+        with open(self.keys_path, "ab") as f:
+            f.write(b"".join(digests))
+        for offset, digest in enumerate(digests):
+            self._rows[digest] = start + offset
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    def encode(
+        self,
+        texts: List[str],
+        encode_fn: Callable[[List[str]], np.ndarray],
+        batch_size: int = 256,
+    ) -> np.ndarray:
+        """
+        Embeddings for texts, calling encode_fn only for texts not cached yet
+
+        Misses are encoded longest-first in large batches, which keeps padding
+        per batch low. Returns a float32 matrix in input order.
+        """
+        digests = [text_digest(t) for t in texts]
+
+        pending: Dict[bytes, str] = {}
+        for digest, text in zip(digests, texts):
+            if digest not in self._rows and digest not in pending:
+                pending[digest] = text
+
+        self.hits += len(texts) - len(pending)
+        self.misses += len(pending)
+
+        if pending:
+            order = sorted(pending, key=lambda d: len(pending[d]), reverse=True)
+            started = time.perf_counter()
+
+            for i in range(0, len(order), batch_size):
+                batch = order[i:i + batch_size]
+                vectors = encode_fn([pending[d] for d in batch])
+                self._append(batch, vectors)
+                print(f"   🧮 Encoded {min(i + batch_size, len(order))}/{len(order)} new chunks")
+
+            elapsed = time.perf_counter() - started
+            self.encode_seconds += elapsed
+            self.meta["seconds_per_item"] = elapsed / len(order)
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump(self.meta, f)
+
+        matrix = self._matrix()
+        rows = np.fromiter((self._rows[d] for d in digests), dtype="int64", count=len(digests))
+        return np.asarray(matrix[rows], dtype="float32")
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        per_item = self.meta.get("seconds_per_item")
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "encode_seconds": self.encode_seconds,
+            # Encoding cost the hits would have had at the measured rate
+            "seconds_saved": self.hits * per_item if per_item else None,
+        }
+
+
+def get_embedding_cache(model_key: str, dimension: int):
+    """
+    Factory using the configured directory / precision (None when disabled)
+    """
+    if not config.EMBEDDING_CACHE_DIR:
+        return None
+
+    return EmbeddingCache(
+        config.EMBEDDING_CACHE_DIR,
+        model_key,
+        dimension,
+        dtype=config.EMBEDDING_CACHE_DTYPE,
+    )
@@ -0,0 +1,308 @@
+"""
+FAISS Index Factory Module for Vidyamitra
+Builds the configured index type over L2-normalized vectors (inner product
+== cosine similarity) and applies its search-time parameters
+
+Supported types:
+- flat      exact brute force (IndexFlatIP)
+- ivf_flat  inverted lists over a coarse quantizer, full vectors stored
+- ivf_pq    inverted lists with product-quantized vectors (smallest)
+- hnsw      graph-based search, no training needed
+
+Vectors of flat / ivf_flat / hnsw indexes can be stored as float32,
+float16 or int8 (FAISS scalar quantizer) to shrink the resident index;
+rescore_candidates() restores exact ranking from full-precision vectors.
+"""
+
+import math
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import faiss
+
+from app import config
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+QUANTIZATIONS = {
+    "float32": None,
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# FAISS wants roughly this many training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+
+def default_index_params() -> Dict:
+    """Build + search parameters from configuration"""
+    return {
+        "nlist": config.IVF_NLIST,
+        "nprobe": config.IVF_NPROBE,
+        "pq_m": config.PQ_M,
+        "pq_nbits": config.PQ_NBITS,
+        "hnsw_m": config.HNSW_M,
+        "ef_construction": config.HNSW_EF_CONSTRUCTION,
+        "ef_search": config.HNSW_EF_SEARCH,
+        "quantization": config.VECTOR_QUANTIZATION,
+    }
+
+
+def _resolve_nlist(requested: int, ntotal: int) -> int:
+    # 0 means auto (~4 * sqrt(n)); never more centroids than the data can train
+    nlist = requested or int(4 * math.sqrt(ntotal))
+    return max(1, min(nlist, ntotal // MIN_POINTS_PER_CENTROID))
+
+
+def _resolve_pq(dimension: int, m: int, nbits: int, ntotal: int):
+    # m must divide the dimension; 2**nbits codewords need enough points
+    while m > 1 and dimension % m:
+        m -= 1
+    max_nbits = int(math.log2(max(2, ntotal // MIN_POINTS_PER_CENTROID)))
+    return m, max(1, min(nbits, max_nbits))
+
+
+def build_index(
+    vectors: np.ndarray,
+    index_type: str = "flat",
+    params: Optional[Dict] = None,
+    ids: Optional[np.ndarray] = None,
+):
+    """
+    Build (train + add) an index over normalized float32 vectors. When ids
+    are given, vectors can later be removed / added by stable chunk ID: IVF
+    indexes store the IDs natively (plus a hashtable for reconstruct), other
+    types are wrapped in an IndexIDMap2
+
+    Returns:
+        (index, resolved_params) – resolved_params are what was actually used
+        after clamping to the corpus size, to be stored with the index
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    params = {**default_index_params(), **(params or {})}
+    ntotal, dimension = vectors.shape
+    metric = faiss.METRIC_INNER_PRODUCT
+    resolved: Dict = {}
+
+    quantization = params["quantization"]
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(
+            f"Unknown quantization '{quantization}', expected one of {tuple(QUANTIZATIONS)}"
+        )
+    # PQ codes are already compressed; scalar quantization does not apply
+    if index_type == "ivf_pq":
+        quantization = "pq"
+    qtype = QUANTIZATIONS.get(quantization)
+    resolved["quantization"] = quantization
+
+    if index_type == "flat":
+        if qtype is None:
+            index = faiss.IndexFlatIP(dimension)
+        else:
+            index = faiss.IndexScalarQuantizer(dimension, qtype, metric)
+            index.train(vectors)
+
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        nlist = _resolve_nlist(params["nlist"], ntotal)
+        quantizer = faiss.IndexFlatIP(dimension)
+        resolved.update(nlist=nlist, nprobe=params["nprobe"])
+
+        if index_type == "ivf_flat" and qtype is None:
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, metric)
+        elif index_type == "ivf_flat":
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dimension, nlist, qtype, metric)
+        else:
+            m, nbits = _resolve_pq(dimension, params["pq_m"], params["pq_nbits"], ntotal)
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, m, nbits, metric)
+            resolved.update(pq_m=m, pq_nbits=nbits)
+
+        index.train(vectors)
+
+    else:  # hnsw
+        if qtype is None:
+            index = faiss.IndexHNSWFlat(dimension, params["hnsw_m"], metric)
+        else:
+            index = faiss.IndexHNSWSQ(dimension, qtype, params["hnsw_m"], metric)
+            index.train(vectors)
+        index.hnsw.efConstruction = params["ef_construction"]
+        resolved.update(
+            hnsw_m=params["hnsw_m"],
+            ef_construction=params["ef_construction"],
+            ef_search=params["ef_search"],
+        )
+
+    if ids is None:
+        index.add(vectors)
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        # IVF keeps external IDs in its lists; an ID map on top would go out
+        # of sync on removal because IVF does not renumber internal IDs
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+    else:
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+
+    apply_search_params(index, resolved)
+    return index, resolved
+
+
+def remove_ids(
+    index,
+    ids: np.ndarray,
+    vectors_of: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+):
+    """
+    Remove vectors by ID from an ID-aware index (see build_index). Index
+    types that cannot delete in place (HNSW) are rebuilt from the surviving
+    vectors instead.
+
+    Args:
+        vectors_of: Optional callable mapping surviving IDs to their
+            full-precision vectors for a rebuild. Without it the vectors are
+            reconstructed from the index, which is lossy for SQ8 / fp16.
+
+    Returns:
+        The index to use from now on (same object unless rebuilt)
+    """
+    ids = np.asarray(ids, dtype="int64")
+    if not len(ids):
+        return index
+
+    try:
+        index.remove_ids(ids)
+        return index
+    except RuntimeError:
+        pass
+
+    doomed = set(ids.tolist())
+    all_ids = faiss.vector_to_array(index.id_map)
+    keep = np.array([i for i in all_ids if i not in doomed], dtype="int64")
+    if not len(keep):
+        vectors = None
+    elif vectors_of is not None:
+        vectors = np.ascontiguousarray(vectors_of(keep), dtype="float32")
+    else:
+        vectors = np.vstack([index.reconstruct(int(i)) for i in keep])
+
+    # Fresh copy of the base index (the old wrapper owns the original);
+    # reset keeps graph parameters and drops all vectors
+    base = faiss.clone_index(faiss.downcast_index(index.index))
+    base.reset()
+    rebuilt = faiss.IndexIDMap2(base)
+    if vectors is not None:
+        rebuilt.add_with_ids(vectors, keep)
+    return rebuilt
+
+
+def read_index(path: str, index_type: str = "flat", mmap: bool = False):
+    """
+    Load a saved index. With mmap, vectors / inverted lists stay in the file
+    and are mapped read-only instead of copied into the process, so every
+    process serving the file shares one copy through the page cache. A
+    mapped index cannot be modified; the file must be replaced (renamed
+    over), never rewritten in place, while it is mapped.
+    """
+    if not mmap:
+        return faiss.read_index(path)
+
+    # IVF lists map through on-disk inverted lists; flat / SQ / HNSW
+    # storage through the flat-codes flag (FAISS >= 1.10). The two flags
+    # cannot be combined.
+    flag = (
+        faiss.IO_FLAG_MMAP if index_type.startswith("ivf")
+        else getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    )
+    if not flag:
+        return faiss.read_index(path)
+    return faiss.read_index(path, flag | faiss.IO_FLAG_READ_ONLY)
+
+
+def apply_search_params(index, params: Dict):
+    """
+    Set search-time knobs (nprobe for IVF, efSearch for HNSW) on an index,
+    looking through ID-map wrappers
+    """
+    inner = _unwrap_id_map(index)
+
+    ivf = faiss.try_extract_index_ivf(inner)
+    if ivf is not None and params.get("nprobe"):
+        ivf.nprobe = min(int(params["nprobe"]), ivf.nlist)
+
+    if isinstance(inner, faiss.IndexHNSW) and params.get("ef_search"):
+        inner.hnsw.efSearch = int(params["ef_search"])
+
+
+def _unwrap_id_map(index):
+    inner = index
+    while hasattr(inner, "index") and isinstance(inner, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        inner = faiss.downcast_index(inner.index)
+    return inner
+
+
+def selector_search_params(index, selector):
+    """
+    Per-call SearchParameters restricting a search to the selector's labels.
+    Explicit parameters replace the index's own nprobe / efSearch, so the
+    current values are carried over. Build a fresh object for every search:
+    ID-map wrappers patch the selector in place while they run.
+    """
+    inner = _unwrap_id_map(index)
+
+    ivf = faiss.try_extract_index_ivf(inner)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    if isinstance(inner, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def rescore_candidates(
+    queries: np.ndarray, rows: np.ndarray, vectors: np.ndarray, top_k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Re-rank candidate rows by exact inner product against full-precision
+    vectors (e.g. a memory-mapped float32 file); only candidate rows are read
+
+    Args:
+        queries: (nq, d) float32 queries
+        rows: (nq, k') candidate rows, -1 for missing
+        vectors: (n, d) full-precision vectors indexed by row
+        top_k: results to keep per query
+
+    Returns:
+        (scores, rows), each (nq, top_k), padded with -inf / -1
+    """
+    valid = rows >= 0
+    candidates = np.asarray(vectors[np.where(valid, rows, 0).ravel()], dtype="float32")
+    scores = np.einsum(
+        "qkd,qd->qk", candidates.reshape(*rows.shape, -1), queries
+    )
+    scores[~valid] = -np.inf
+
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+    top_rows = np.take_along_axis(np.where(valid, rows, -1), order, axis=1)
+    return np.take_along_axis(scores, order, axis=1), top_rows
+
+
+def exact_subset_search(
+    queries: np.ndarray, rows: np.ndarray, vectors: np.ndarray, top_k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k over a subset of rows (shared by all queries), reading only
+    those rows of the full-precision vectors
+
+    Returns:
+        (scores, rows), each (nq, min(top_k, len(rows)))
+    """
+    candidates = np.asarray(vectors[rows], dtype="float32")
+    scores = queries @ candidates.T
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+    return np.take_along_axis(scores, order, axis=1), np.asarray(rows)[order]
+
+
+def index_memory_bytes(index) -> int:
+    """Serialized size of an index, a close proxy for its resident memory"""
+    return int(faiss.serialize_index(index).nbytes)
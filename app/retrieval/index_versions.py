@@ -0,0 +1,118 @@
+"""
+Index Versions Module for Vidyamitra
+Versioned index directories and the manifest naming the one to serve
+
+Layout (under INDEX_ROOT):
+- manifest.json        {"current": <version>, "versions": [{"version", "created_at", ...}]}
+- versions/<version>/  one complete index directory (FAISS index, chunk store, ...)
+
+Builds write a fresh version directory and then publish it by atomically
+replacing manifest.json; serving processes notice the new "current" and
+swap the index in (see Registry.reload_vector_store). A version directory
+is never written to after it is published. Without a manifest the legacy
+INDEX_ROOT/index directory is served.
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from app import config
+
+
+MANIFEST_FILE = "manifest.json"
+VERSIONS_DIR = "versions"
+LEGACY_INDEX_DIR = "index"
+
+
+def _root(root: str | None) -> str:
+    return root or config.INDEX_ROOT
+
+
+def read_manifest(root: str | None = None) -> Optional[Dict]:
+    """The manifest, or None when no version has been published yet"""
+    path = os.path.join(_root(root), MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def version_dir(version: str, root: str | None = None) -> str:
+    return os.path.join(_root(root), VERSIONS_DIR, version)
+
+
+def current_version(root: str | None = None) -> Optional[str]:
+    manifest = read_manifest(root)
+    return manifest["current"] if manifest else None
+
+
+def current_index_dir(root: str | None = None) -> str:
+    """Directory of the version to serve (the legacy directory if unversioned)"""
+    version = current_version(root)
+    if version is None:
+        return os.path.join(_root(root), LEGACY_INDEX_DIR)
+    return version_dir(version, root)
+
+
+def new_version() -> str:
+    """
+    A fresh version name; sorts by creation time, the suffix keeps two
+    builds started in the same second apart
+    """
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def list_versions(root: str | None = None) -> List[Dict]:
+    manifest = read_manifest(root)
+    return list(manifest["versions"]) if manifest else []
+
+
+def publish_version(
+    version: str,
+    info: Dict | None = None,
+    root: str | None = None,
+    keep: int | None = None,
+) -> Dict:
+    """
+    Make a saved version the one to serve. Also rolls back: publishing an
+    older, still-kept version makes it current again.
+
+    Args:
+        version: Version whose directory holds a complete, saved index
+        info: Extra fields recorded for the version (chunk count, ...)
+        root: Index root (defaults to INDEX_ROOT)
+        keep: Versions kept on disk, the current one included (defaults to
+            INDEX_KEEP_VERSIONS), by when they were last published; older
+            directories are deleted. Processes still serving a deleted
+            version keep reading their open, mapped files until they swap.
+    """
+    root = _root(root)
+    keep = max(1, keep or config.INDEX_KEEP_VERSIONS)
+    if not os.path.isdir(version_dir(version, root)):
+        raise FileNotFoundError(f"Index version not found: {version}")
+
+    manifest = read_manifest(root) or {"current": None, "versions": []}
+    versions = [v for v in manifest["versions"] if v["version"] != version]
+    existing = next((v for v in manifest["versions"] if v["version"] == version), None)
+    entry = existing or {"version": version, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    entry = {**entry, **(info or {})}
+    versions.append(entry)
+
+    pruned = versions[:-keep]
+    manifest = {"current": version, "versions": versions[-keep:]}
+
+    # Written aside and renamed over: readers see the old or the new
+    # manifest, never a partial one
+    path = os.path.join(root, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+    for old in pruned:
+        shutil.rmtree(version_dir(old["version"], root), ignore_errors=True)
+
+    return manifest
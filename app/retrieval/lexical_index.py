@@ -0,0 +1,198 @@
+"""
+Lexical Index Module for Vidyamitra
+Compact in-process BM25 inverted index, built next to the FAISS index and
+row-aligned with the chunk store, for exact-term queries (chapter names,
+activity titles, transliterations) that a small embedding model misses.
+
+Postings are CSR arrays: the documents of term t are
+doc_ids[indptr[t]:indptr[t + 1]] with term frequencies in tfs. Everything
+is persisted in one .npz file.
+"""
+
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from app import config
+from app.retrieval.metadata_filter import filter_sorted
+
+
+LEXICAL_FILE = "lexical.npz"
+
+# Word characters plus the Devanagari / Kannada blocks, whose vowel signs
+# are not \w and would otherwise split words
+_TOKEN = re.compile(r"[\w\u0900-\u097F\u0C80-\u0CFF]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class LexicalIndex:
+    def __init__(
+        self,
+        terms: List[str],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_lens: np.ndarray,
+        k1: float | None = None,
+        b: float | None = None,
+    ):
+        self.terms = {term: i for i, term in enumerate(terms)}
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lens = doc_lens
+        self.k1 = config.BM25_K1 if k1 is None else k1
+        self.b = config.BM25_B if b is None else b
+
+        # BM25 contribution of every posting, computed once at load, so a
+        # query only gathers posting slices and sums them per document
+        n = len(doc_lens)
+        df = np.diff(indptr).astype(np.float32)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(doc_lens.mean()) if n else 1.0
+        norm = self.k1 * (1 - self.b + self.b * doc_lens / max(avgdl, 1e-9))
+        tf = tfs.astype(np.float32)
+        self._impacts = (
+            np.repeat(idf, np.diff(indptr)) * tf * (self.k1 + 1) / (tf + norm[doc_ids])
+        ).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.doc_lens)
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "LexicalIndex":
+        """Build from texts in chunk-store row order (streamed once)"""
+        vocabulary: Dict[str, int] = {}
+        term_ids, rows, counts = array("i"), array("i"), array("i")
+        doc_lens = array("f")
+
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lens.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                rows.append(row)
+                counts.append(tf)
+
+        term_ids = np.frombuffer(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")  # rows stay ascending per term
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=indptr[1:])
+
+        return cls(
+            terms=list(vocabulary),
+            indptr=indptr,
+            doc_ids=np.frombuffer(rows, dtype=np.int32)[order],
+            tfs=np.minimum(np.frombuffer(counts, dtype=np.int32)[order], 65535).astype(np.uint16),
+            doc_lens=np.frombuffer(doc_lens, dtype=np.float32).copy(),
+        )
+
+    def save(self, path: str):
+        terms = "\n".join(self.terms).encode("utf-8")
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                terms=np.frombuffer(terms, dtype=np.uint8),
+                indptr=self.indptr,
+                doc_ids=self.doc_ids,
+                tfs=self.tfs,
+                doc_lens=self.doc_lens,
+                params=np.array([self.k1, self.b], dtype=np.float64),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "LexicalIndex":
+        with np.load(path) as data:
+            blob = data["terms"].tobytes().decode("utf-8")
+            k1, b = data["params"]
+            return cls(
+                terms=blob.split("\n") if blob else [],
+                indptr=data["indptr"],
+                doc_ids=data["doc_ids"],
+                tfs=data["tfs"],
+                doc_lens=data["doc_lens"],
+                k1=float(k1),
+                b=float(b),
+            )
+
+    def search(
+        self, query: str, top_k: int, allowed: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 top-k for a query. Terms found in more than half of all
+        documents (idf < ln 2, stopword-like) are skipped when the query
+        has rarer terms: they barely move the ranking but dominate the
+        postings to scan.
+
+        Args:
+            allowed: Sorted rows the results are restricted to (metadata
+                filter), applied before the top-k cut
+
+        Returns:
+            (rows, scores), best first; fewer than top_k if fewer documents
+            contain a query term
+        """
+        term_ids = {self.terms[t] for t in tokenize(query) if t in self.terms}
+        if not term_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        slices = [slice(self.indptr[t], self.indptr[t + 1]) for t in term_ids]
+        rare = [s for s in slices if s.stop - s.start <= len(self) // 2]
+        slices = rare or slices
+        rows = np.concatenate([self.doc_ids[s] for s in slices])
+        impacts = np.concatenate([self._impacts[s] for s in slices])
+
+        if len(rows) * 8 >= len(self):
+            # Common terms: accumulate into a dense per-document array
+            # (linear, no sort), then drop documents without a match
+            scores = np.bincount(rows, weights=impacts, minlength=len(self))
+            unique = np.flatnonzero(scores)
+            scores = scores[unique]
+        else:
+            unique, inverse = np.unique(rows, return_inverse=True)
+            scores = np.bincount(inverse, weights=impacts)
+
+        if allowed is not None:
+            keep = filter_sorted(unique, allowed)
+            unique, scores = unique[keep], scores[keep]
+            if not len(unique):
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        k = min(top_k, len(unique))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return unique[best].astype(np.int64), scores[best].astype(np.float32)
+
+    def nbytes(self) -> int:
+        return int(
+            self.indptr.nbytes + self.doc_ids.nbytes + self.tfs.nbytes
+            + self.doc_lens.nbytes + self._impacts.nbytes
+        )
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[int]], top_k: int, k: int | None = None
+) -> tuple[List[int], List[float]]:
+    """
+    Fuse ranked row lists: score(row) = sum over lists of 1 / (k + rank).
+    Negative rows (padding) are ignored.
+
+    Returns:
+        (rows, fused scores), best first
+    """
+    k = config.RRF_K if k is None else k
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking):
+            row = int(row)
+            if row >= 0:
+                fused[row] = fused.get(row, 0.0) + 1.0 / (k + rank + 1)
+
+    best = sorted(fused.items(), key=lambda item: -item[1])[:top_k]
+    return [row for row, _ in best], [score for _, score in best]
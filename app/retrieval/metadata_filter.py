@@ -0,0 +1,194 @@
+"""
+Metadata Filter Module for Vidyamitra
+Restricts retrieval to chunks whose metadata matches a filter such as
+{"language": "Hindi", "grade": [6, 7]}: every listed field must match, and
+a field matches when any of its values does. Values compare
+case-insensitively as strings, so grade 6 and "6" are the same.
+
+The ID set of every (field, value) pair is computed once when the index is
+loaded, as sorted store rows plus a FAISS IDSelectorBatch over the index
+labels. A query only combines the precomputed sets (IDSelectorOr within a
+field, IDSelectorAnd across fields), and FAISS skips non-matching vectors
+while it searches, instead of post-filtering a top-k that may hold no
+match at all.
+"""
+
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from functools import reduce
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import faiss
+
+from app import config
+
+
+# Filters resolved per index; repeated combinations reuse the merged sets
+_MATCH_CACHE_SIZE = 256
+
+Filters = Dict[str, Any]
+
+
+def normalize_value(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+def normalize_filters(filters: Optional[Filters]) -> Optional[Dict[str, Tuple[str, ...]]]:
+    """{field: sorted normalized values}, or None when nothing is filtered"""
+    if not filters:
+        return None
+
+    normalized = {}
+    for name, values in filters.items():
+        if values is None:
+            continue
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        values = tuple(sorted({normalize_value(v) for v in values}))
+        if values:
+            normalized[name] = values
+    return normalized or None
+
+
+def filters_key(filters: Optional[Filters]) -> str:
+    """Stable string for a filter ("" when unfiltered), for cache keys"""
+    normalized = normalize_filters(filters)
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False) if normalized else ""
+
+
+def _field_values(metadata: Dict, fields: Iterable[str]) -> set:
+    """(field, value) pairs a chunk with this metadata can be found under"""
+    pairs = set()
+    # Near-duplicates merged at ingestion belong to every copy's document
+    for source in [metadata] + list(metadata.get("also_in") or []):
+        for name in fields:
+            values = source.get(name)
+            if values is None or isinstance(values, dict):
+                continue
+            if not isinstance(values, (list, tuple)):
+                values = [values]
+            pairs.update((name, normalize_value(v)) for v in values)
+    return pairs
+
+
+@dataclass
+class FilterMatch:
+    # Sorted store rows matching the filter
+    rows: np.ndarray
+    # Restricts a FAISS search to the matching labels (None: nothing matches)
+    selector: Optional[faiss.IDSelector]
+    # Composite selectors only hold pointers to their parts; keep them alive
+    _parts: List = field(default_factory=list, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class MetadataFilterIndex:
+    def __init__(self, postings: Dict[Tuple[str, str], np.ndarray], labels: Optional[np.ndarray] = None):
+        """
+        Args:
+            postings: Sorted store rows per (field, normalized value)
+            labels: FAISS label per store row (chunk IDs); None when labels
+                are the rows themselves (legacy indexes)
+        """
+        self._rows = postings
+        self.fields = sorted({name for name, _ in postings})
+        self._selectors = {
+            pair: faiss.IDSelectorBatch(
+                np.ascontiguousarray(labels[rows] if labels is not None else rows, dtype="int64")
+            )
+            for pair, rows in postings.items()
+        }
+
+        self._lock = threading.Lock()
+        self._matches: OrderedDict[str, FilterMatch] = OrderedDict()
+
+    @classmethod
+    def build(
+        cls,
+        groups: Iterable[Tuple[Dict, np.ndarray]],
+        labels: Optional[np.ndarray] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> "MetadataFilterIndex":
+        """
+        Args:
+            groups: (metadata, rows) pairs covering the store, e.g.
+                ChunkStore.metadata_groups()
+            labels: See __init__
+            fields: Filterable metadata fields (defaults to FILTER_FIELDS)
+        """
+        fields = list(config.FILTER_FIELDS if fields is None else fields)
+        parts: Dict[Tuple[str, str], List[np.ndarray]] = defaultdict(list)
+        for metadata, rows in groups:
+            for pair in _field_values(metadata, fields):
+                parts[pair].append(rows)
+
+        postings = {
+            pair: np.unique(np.concatenate(row_lists)).astype("int64")
+            for pair, row_lists in parts.items()
+        }
+        return cls(postings, labels)
+
+    def values(self, name: str) -> List[str]:
+        return sorted(value for field_name, value in self._rows if field_name == name)
+
+    def match(self, filters: Optional[Filters]) -> Optional[FilterMatch]:
+        """Rows + FAISS selector for a filter; None when nothing is filtered"""
+        key = filters_key(filters)
+        if not key:
+            return None
+
+        with self._lock:
+            cached = self._matches.get(key)
+            if cached is not None:
+                self._matches.move_to_end(key)
+                return cached
+
+        match = self._resolve(normalize_filters(filters))
+
+        with self._lock:
+            self._matches[key] = match
+            if len(self._matches) > _MATCH_CACHE_SIZE:
+                self._matches.popitem(last=False)
+        return match
+
+    def _resolve(self, normalized: Dict[str, Tuple[str, ...]]) -> FilterMatch:
+        row_sets, selectors, keep = [], [], []
+
+        for name, values in normalized.items():
+            pairs = [(name, v) for v in values if (name, v) in self._rows]
+            if not pairs:
+                # Unknown field or value: nothing can match
+                return FilterMatch(np.empty(0, dtype="int64"), None)
+
+            rows = [self._rows[p] for p in pairs]
+            row_sets.append(rows[0] if len(rows) == 1 else np.unique(np.concatenate(rows)))
+
+            selector = self._selectors[pairs[0]]
+            for pair in pairs[1:]:
+                keep.append(selector)
+                selector = faiss.IDSelectorOr(selector, self._selectors[pair])
+            selectors.append(selector)
+
+        rows = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), row_sets)
+        selector = selectors[0]
+        for other in selectors[1:]:
+            keep.extend([selector, other])
+            selector = faiss.IDSelectorAnd(selector, other)
+        return FilterMatch(rows, selector, keep + selectors)
+
+    def nbytes(self) -> int:
+        """Row sets only; FAISS selectors hold about as much again"""
+        return int(sum(rows.nbytes for rows in self._rows.values()))
+
+
+def filter_sorted(rows: np.ndarray, allowed: np.ndarray) -> np.ndarray:
+    """Boolean mask of `rows` that are in the sorted array `allowed`"""
+    if not len(allowed):
+        return np.zeros(len(rows), dtype=bool)
+    pos = np.searchsorted(allowed, rows).clip(max=len(allowed) - 1)
+    return allowed[pos] == rows
@@ -3,146 +3,800 @@ Vector Store Module for Vidyamitra
 Handles embedding generation and vector database operations using FAISS
 """
 
+import asyncio
 import json
 import os
 import pickle
-from typing import List, Dict
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List
 
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
+
+from app import config
+from app.ingestion.pipeline import ChunkFile
+from app.retrieval.chunk_store import (
+    STORE_FILES,
+    ChunkStore,
+    ChunkStoreWriter,
+    IdRowMap,
+    chunk_id_of,
+    chunk_text_of,
+)
+from app.retrieval.embedding_cache import get_embedding_cache
+from app.retrieval.index_factory import (
+    apply_search_params,
+    build_index,
+    exact_subset_search,
+    read_index,
+    remove_ids,
+    rescore_candidates,
+    selector_search_params,
+)
+from app.retrieval.index_versions import current_index_dir
+from app.retrieval.lexical_index import LEXICAL_FILE, LexicalIndex, reciprocal_rank_fusion
+from app.retrieval.metadata_filter import FilterMatch, Filters, MetadataFilterIndex
+from app.registry import registry
+
+
+# Full-precision float32 vectors, one row per chunk store row
+VECTORS_FILE = "vectors.f32"
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_embedding_executor() -> ThreadPoolExecutor:
+    """
+    Dedicated pool for CPU-bound embedding / FAISS work, kept separate from
+    the event loop's default threadpool so retrieval cannot starve request I/O
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=config.EMBEDDING_EXECUTOR_WORKERS,
+                    thread_name_prefix="embedding",
+                )
+    return _executor
 
 
 class VectorStore:
     def __init__(
         self,
-        embedding_model_name: str =  "paraphrase-MiniLM-L3-v2",
-        chunks_file: str = "data/processed/cleaned_chunks.json",
-        index_dir: str = "data/vector_db/index",
+        embedding_model_name: str | None = None,
+        embedding_backend: str | None = None,
+        chunks_file: str | None = None,
+        index_dir: str | None = None,
+        index_type: str | None = None,
+        index_params: Dict | None = None,
     ):
         """
         Initialize vector store
 
         Args:
-            embedding_model_name: SentenceTransformer model
-            chunks_file: Path to cleaned chunks JSON
-            index_dir: Directory to store FAISS index and metadata
+            embedding_model_name: SentenceTransformer model (defaults to EMBEDDING_MODEL)
+            embedding_backend: torch | onnx | onnx-int8 (defaults to EMBEDDING_BACKEND)
+            chunks_file: Path to cleaned chunks JSONL (defaults to CHUNKS_FILE)
+            index_dir: Directory to store FAISS index and metadata (defaults
+                to the current published version, see index_versions)
+            index_type: FAISS index type to build (defaults to INDEX_TYPE)
+            index_params: Build/search parameter overrides for the index type
         """
-        self.embedding_model = SentenceTransformer(embedding_model_name)
-        self.dimension = self.embedding_model.get_sentence_embedding_dimension()
-
-        self.chunks_file = chunks_file
-        self.index_dir = index_dir
-        self.index_path = os.path.join(index_dir, "faiss.index")
-        self.chunks_path = os.path.join(index_dir, "chunks.pkl")
+        self.embedding_model_name = embedding_model_name or config.EMBEDDING_MODEL
+        self.embedding_backend = embedding_backend
+        # Fetched on first use (see embedding_model)
+        self._embedding_model = None
+
+        self.chunks_file = chunks_file or config.CHUNKS_FILE
+        # Created lazily: serving never embeds the corpus
+        self._embedding_cache = None
+        self.index_dir = index_dir or current_index_dir()
+        # Builds stream chunks into a chunk store here; save_index moves it
+        # next to the index
+        self.staging_dir = self.index_dir.rstrip(os.sep) + ".staging"
 
         self.index = None
-        self.chunks: List[Dict] = []
+        self.index_type = index_type or config.INDEX_TYPE
+        self.index_params = index_params or {}
+        # Everything recorded next to the saved index (type, params, ...)
+        self.index_meta: Dict = {}
+
+        # Chunks to index (a lazy ChunkFile, or any iterable of chunk dicts)
+        # before building; a memory-mapped ChunkStore once built or loaded
+        self.chunks: Iterable[Dict] | ChunkStore = []
+        # Stable chunk ID per row, and FAISS label -> row lookup for
+        # ID-mapped indexes (None: labels are row positions, legacy indexes)
+        self.chunk_ids: List[int] = []
+        self._id_map: IdRowMap | None = None
+        # Memory-mapped full-precision vectors (None when not saved), used
+        # to re-score candidates from quantized indexes
+        self.full_vectors: np.ndarray | None = None
+        # BM25 index over the same rows, for hybrid retrieval
+        self.lexical_index: LexicalIndex | None = None
+        # Precomputed ID sets per filterable metadata value
+        self.filter_index: MetadataFilterIndex | None = None
+
+        # Changes whenever a different index is built or loaded; caches
+        # derived from search results use it to detect staleness
+        self.index_version: str | None = None
+        # Loaded with load_index(mmap=True): read-only, shared between processes
+        self.index_mmapped = False
+
+    @property
+    def embedding_model(self):
+        """
+        Shared with every other store using the same model. Fetched lazily so
+        a store loaded before the server forks workers holds no model
+        session (see Registry.preload_for_fork)
+        """
+        if self._embedding_model is None:
+            self._embedding_model = registry.embedding_model(
+                self.embedding_model_name, self.embedding_backend
+            )
+        return self._embedding_model
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.index_dir, "faiss.index")
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.index_dir, "index_meta.json")
+
+    @property
+    def chunks_path(self) -> str:
+        # Legacy pickled chunks; read only when no chunk store exists yet
+        return os.path.join(self.index_dir, "chunks.pkl")
+
+    @property
+    def dimension(self) -> int:
+        if self.index is not None:
+            return self.index.d
+        return self.embedding_model.dimension
 
     # ---------------------------
     # Loading & Index Creation
     # ---------------------------
-    def load_chunks(self):
-        """Load text chunks from JSON file"""
+    def read_chunks(self) -> ChunkFile:
+        """
+        Lazy view over the ingestion output; chunks are read one at a time
+        on each iteration, without touching the index
+        """
         if not os.path.exists(self.chunks_file):
             raise FileNotFoundError(
                 f"Chunks file not found: {self.chunks_file}"
             )
 
-        with open(self.chunks_file, "r", encoding="utf-8") as f:
-            self.chunks = json.load(f)
+        return ChunkFile(self.chunks_file)
+
+    def load_chunks(self):
+        """Point the store at the chunks file (streamed during create_embeddings)"""
+        self.chunks = self.read_chunks()
+
+        print(f"✅ Streaming chunks from {self.chunks_file}")
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        embeddings = self.embedding_model.encode(
+            texts, batch_size=config.EMBEDDING_BATCH_SIZE
+        )
+
+        # Normalize vectors for cosine similarity
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed corpus texts into L2-normalized float32 vectors, reusing cached
+        embeddings so only never-seen texts reach the model
+        """
+        if self.embedding_cache is None:
+            return self._encode_batch(texts)
+
+        embeddings = self.embedding_cache.encode(
+            texts, self._encode_batch, batch_size=config.EMBEDDING_BATCH_SIZE
+        )
+        # float16 storage drifts slightly off unit length
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    @property
+    def embedding_cache(self):
+        if self._embedding_cache is None:
+            self._embedding_cache = get_embedding_cache(
+                self.embedding_model.cache_key, self.dimension
+            )
+        return self._embedding_cache
 
-        print(f"✅ Loaded {len(self.chunks)} chunks")
+    @staticmethod
+    def _unique_batches(
+        chunks: Iterable[Dict], seen: set, batch_size: int
+    ) -> Iterator[tuple[List[Dict], List[int]]]:
+        """
+        Group a chunk stream into batches, dropping chunks whose text is an
+        exact repeat (same content-hash ID); the first occurrence wins.
+        Only the 8-byte IDs are remembered across batches.
+        """
+        batch, ids = [], []
+        for chunk in chunks:
+            cid = chunk_id_of(chunk)
+            if cid in seen:
+                continue
+            seen.add(cid)
+            batch.append(chunk)
+            ids.append(cid)
+            if len(batch) >= batch_size:
+                yield batch, ids
+                batch, ids = [], []
+        if batch:
+            yield batch, ids
+
+    def _stream_batches(self, chunks: Iterable[Dict], seen: set):
+        """
+        Stream chunks into a fresh chunk store in the staging directory,
+        yielding each deduplicated batch to the caller for embedding
+        """
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        with ChunkStoreWriter(self.staging_dir) as writer:
+            for batch, ids in self._unique_batches(
+                chunks, seen, config.EMBEDDING_STREAM_BATCH
+            ):
+                yield batch, ids
+                for chunk, cid in zip(batch, ids):
+                    writer.add(chunk, cid)
+
+    def _set_index(self, index, resolved_params: Dict | None = None):
+        self.index = index
+        self.index_mmapped = False
+        self._id_map = IdRowMap(np.asarray(self.chunk_ids, dtype="int64"))
+        self.index_version = f"built-{time.time_ns()}"
+
+        if resolved_params is not None:
+            self.index_meta = {
+                "index_type": self.index_type,
+                "quantization": resolved_params.get("quantization", "float32"),
+                "params": resolved_params,
+                "id_mapped": True,
+                "dimension": self.dimension,
+                "embedding_model": self.embedding_model_name,
+                "embedding_backend": self.embedding_model.variant,
+                "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+        self.index_meta["ntotal"] = int(index.ntotal)
+        self._build_filter_index()
+
+    def _build_filter_index(self):
+        if isinstance(self.chunks, ChunkStore):
+            groups = self.chunks.metadata_groups()
+        else:
+            groups = (
+                (chunk.get("metadata", {}) or {}, np.array([row]))
+                for row, chunk in enumerate(self.chunks)
+            )
+        labels = (
+            np.asarray(self.chunk_ids, dtype="int64")
+            if self.index_meta.get("id_mapped") else None
+        )
+        self.filter_index = MetadataFilterIndex.build(groups, labels)
 
     def create_embeddings(self):
         """
         Generate embeddings and build FAISS cosine-similarity index
+
+        Chunks are streamed in batches: each batch is embedded and spooled
+        to a float32 file that FAISS reads through a memory map, so memory
+        does not grow with the size of the chunks file
         """
-        if not self.chunks:
+        seen: set = set()
+        vectors_path = os.path.join(self.staging_dir, VECTORS_FILE)
+        read = 0
+
+        print("🔄 Generating embeddings...")
+        vectors_file = None
+        try:
+            for batch, _ in self._stream_batches(self.chunks, seen):
+                if vectors_file is None:
+                    vectors_file = open(vectors_path, "wb")
+                vectors_file.write(
+                    self._encode_texts([chunk_text_of(c) for c in batch]).tobytes()
+                )
+                read += len(batch)
+                print(f"   ...embedded {read} chunks")
+        finally:
+            if vectors_file is not None:
+                vectors_file.close()
+
+        if not read:
             raise ValueError("No chunks loaded. Call load_chunks() first.")
 
-        texts = [chunk.get("text", "") for chunk in self.chunks]
+        store = ChunkStore(self.staging_dir)
+        self.chunk_ids = np.asarray(store.ids)
+        vectors = np.memmap(
+            vectors_path, dtype="float32", mode="r", shape=(read, self.dimension)
+        )
 
-        print("🔄 Generating embeddings...")
-        embeddings = self.embedding_model.encode(
-            texts,
-            show_progress_bar=True,
-            convert_to_numpy=True,
-        ).astype("float32")
+        print(f"🔄 Building {self.index_type} index...")
+        index, resolved_params = build_index(
+            vectors, self.index_type, self.index_params, ids=self.chunk_ids
+        )
+        self.full_vectors = vectors
+        self.chunks = store
+        self._set_index(index, resolved_params)
 
-        # Normalize vectors for cosine similarity
-        faiss.normalize_L2(embeddings)
+        print(f"✅ FAISS {self.index_type} index created with {self.index.ntotal} vectors")
 
-        self.index = faiss.IndexFlatIP(self.dimension)
-        self.index.add(embeddings)
+    def apply_updates(self, new_chunks: Iterable[Dict]) -> Dict:
+        """
+        Bring a loaded index in line with a new ingestion output, embedding
+        only chunks whose text is not indexed yet
 
-        print(f"✅ FAISS index created with {self.index.ntotal} vectors")
+        - new text           -> embedded and added
+        - text no longer there -> removed from the index
+        - unchanged text     -> kept as is (metadata refreshed)
 
-    def save_index(self):
-        """Persist FAISS index and chunks"""
+        The new chunks are streamed, so only chunk IDs are held in memory.
+
+        Returns:
+            Counts of added / removed / unchanged chunks
+        """
+        if self.index is None:
+            raise ValueError("Index not loaded. Call load_index() first.")
+        if self.index_mmapped:
+            raise ValueError("Index is memory-mapped read-only; load it with mmap=False to update")
+        if not self.index_meta.get("id_mapped"):
+            raise ValueError(
+                "Index predates stable chunk IDs; run a full rebuild once "
+                "before applying incremental updates"
+            )
+
+        current_ids = set(int(i) for i in self.chunk_ids)
+        wanted: set = set()
+        index = self.index
+        added = 0
+
+        # Full-precision vectors follow the new row order: kept rows are
+        # copied from the old file, new rows come from the encoder
+        old_vectors, old_rows = self.full_vectors, self._id_map
+        vectors_path = os.path.join(self.staging_dir, VECTORS_FILE)
+        vectors_file = None
+        rows_written = 0
+
+        try:
+            for batch, ids in self._stream_batches(new_chunks, wanted):
+                is_new = np.array([i not in current_ids for i in ids])
+                batch_vectors = None
+                if old_vectors is not None:
+                    rows = old_rows.rows(np.array(ids, dtype="int64"))
+                    batch_vectors = np.zeros((len(ids), self.dimension), dtype="float32")
+                    batch_vectors[~is_new] = old_vectors[rows[~is_new]]
+
+                if is_new.any():
+                    new = [(c, i) for c, i, n in zip(batch, ids, is_new) if n]
+                    vectors = self._encode_texts([chunk_text_of(c) for c, _ in new])
+                    index.add_with_ids(vectors, np.array([i for _, i in new], dtype="int64"))
+                    added += len(new)
+                    if batch_vectors is not None:
+                        batch_vectors[is_new] = vectors
+
+                if batch_vectors is not None:
+                    if vectors_file is None:
+                        vectors_file = open(vectors_path, "wb")
+                    vectors_file.write(batch_vectors.tobytes())
+                    rows_written += len(ids)
+        finally:
+            if vectors_file is not None:
+                vectors_file.close()
+
+        self.chunks = ChunkStore(self.staging_dir)
+        self.chunk_ids = np.asarray(self.chunks.ids)
+        self.full_vectors = (
+            np.memmap(vectors_path, dtype="float32", mode="r",
+                      shape=(rows_written, self.dimension))
+            if rows_written else None
+        )
+
+        # An index that has to be rebuilt to drop rows (HNSW) is rebuilt
+        # from the full-precision rows, not from its own lossy codes
+        vectors_of = None
+        if self.full_vectors is not None:
+            new_rows = IdRowMap(np.asarray(self.chunk_ids, dtype="int64"))
+
+            def vectors_of(ids):
+                return self.full_vectors[new_rows.rows(ids)]
+        removed = np.array(sorted(current_ids - wanted), dtype="int64")
+        index = remove_ids(index, removed, vectors_of=vectors_of)
+        self._set_index(index)
+
+        stats = {
+            "added": added,
+            "removed": len(removed),
+            "unchanged": len(wanted) - added,
+        }
+        print(f"✅ Applied update: {stats}")
+        return stats
+
+    def save_index(self, index_dir: str | None = None):
+        """
+        Persist FAISS index and chunks (memory-mapped chunk store)
+
+        Args:
+            index_dir: Save into this directory instead (a new index
+                version); the store reads from it afterwards
+        """
         if self.index is None:
             raise ValueError("Index not created yet")
+        target = os.path.abspath(index_dir or self.index_dir)
+        if self.index_mmapped and target == os.path.abspath(self.index_dir):
+            raise ValueError(
+                "Index is memory-mapped from this directory; save it to a new "
+                "index version instead"
+            )
 
-        os.makedirs(self.index_dir, exist_ok=True)
+        if index_dir:
+            self.index_dir = index_dir
 
-        faiss.write_index(self.index, self.index_path)
+        os.makedirs(self.index_dir, exist_ok=True)
 
-        with open(self.chunks_path, "wb") as f:
-            pickle.dump(self.chunks, f)
+        # Written aside and renamed over: processes that memory-mapped the
+        # old file keep reading it until they reload
+        faiss.write_index(self.index, self.index_path + ".tmp")
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+        vectors_path = os.path.join(self.index_dir, VECTORS_FILE)
+        if isinstance(self.chunks, ChunkStore) and self.chunks.store_dir == self.staging_dir:
+            # Freshly built store: move it into place instead of rewriting
+            staged_vectors = os.path.join(self.staging_dir, VECTORS_FILE)
+            names = STORE_FILES + ((VECTORS_FILE,) if os.path.exists(staged_vectors) else ())
+            for name in names:
+                os.replace(
+                    os.path.join(self.staging_dir, name),
+                    os.path.join(self.index_dir, name),
+                )
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+            self.chunks.close()
+            self.chunks = ChunkStore(self.index_dir)
+        elif isinstance(self.chunks, ChunkStore) and (
+            os.path.abspath(self.chunks.store_dir) == os.path.abspath(self.index_dir)
+        ):
+            # Saved in place: the chunk store and vectors file already there
+            # are the ones being read, and still match the rows
+            pass
+        else:
+            ids = self.chunk_ids if len(self.chunk_ids) else [chunk_id_of(c) for c in self.chunks]
+            with ChunkStoreWriter(self.index_dir) as writer:
+                for chunk, chunk_id in zip(self.chunks, ids):
+                    writer.add(chunk, int(chunk_id))
+            # Carried along (same row order) so quantized indexes keep
+            # re-scoring against full precision after the move
+            if self.full_vectors is not None and len(self.full_vectors) == len(ids):
+                self._write_vectors(vectors_path)
+            else:
+                self.full_vectors = None
+
+        # A vectors file is only valid for the rows it was written with
+        if self.full_vectors is None and os.path.exists(vectors_path):
+            os.remove(vectors_path)
+        self.index_meta["vectors_file"] = VECTORS_FILE if self.full_vectors is not None else None
+
+        # Lexical index is rebuilt from the final rows so it never drifts
+        # from the chunk store (cheap next to embedding)
+        self.lexical_index = LexicalIndex.build(chunk_text_of(c) for c in self.chunks)
+        self.lexical_index.save(os.path.join(self.index_dir, LEXICAL_FILE))
+        self.index_meta["lexical_file"] = LEXICAL_FILE
+
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(self.index_meta, f, indent=2)
 
         print(f"✅ Vector store saved at {self.index_dir}")
 
-    def load_index(self):
-        """Load FAISS index and chunks from disk"""
-        if not os.path.exists(self.index_path) or not os.path.exists(self.chunks_path):
+    def _write_vectors(self, vectors_path: str, rows_per_write: int = 65536):
+        """Copy full_vectors to vectors_path and map the copy instead"""
+        with open(vectors_path + ".tmp", "wb") as f:
+            for start in range(0, len(self.full_vectors), rows_per_write):
+                rows = self.full_vectors[start:start + rows_per_write]
+                f.write(np.ascontiguousarray(rows, dtype="float32").tobytes())
+        os.replace(vectors_path + ".tmp", vectors_path)
+        self.full_vectors = np.memmap(
+            vectors_path, dtype="float32", mode="r", shape=self.full_vectors.shape
+        )
+
+    def load_index(self, mmap: bool = False):
+        """
+        Load FAISS index and chunks from disk
+
+        Args:
+            mmap: Map the index read-only instead of reading it into memory
+                (serving; processes share one copy). Such an index cannot
+                take incremental updates.
+        """
+        has_store = ChunkStore.exists(self.index_dir)
+        if not os.path.exists(self.index_path) or not (
+            has_store or os.path.exists(self.chunks_path)
+        ):
             raise FileNotFoundError("Vector index or chunks not found")
 
-        self.index = faiss.read_index(self.index_path)
+        # Indexes saved before index_meta.json existed are flat
+        self.index_meta = {"index_type": "flat", "params": {}}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.index_meta = json.load(f)
+        self.index_type = self.index_meta["index_type"]
+
+        self.index = read_index(self.index_path, self.index_type, mmap=mmap)
+        self.index_mmapped = mmap
+        stat = os.stat(self.index_path)
+        self.index_version = f"{stat.st_mtime_ns}-{stat.st_size}"
+
+        # Search-time knobs are tunable at serving time without a rebuild
+        apply_search_params(
+            self.index,
+            {
+                **self.index_meta.get("params", {}),
+                "nprobe": config.IVF_NPROBE,
+                "ef_search": config.HNSW_EF_SEARCH,
+                **self.index_params,
+            },
+        )
+
+        if has_store:
+            self.chunks = ChunkStore(self.index_dir)
+            if self.index_meta.get("id_mapped"):
+                self.chunk_ids = self.chunks.ids
+                self._id_map = self.chunks.id_map
+        else:
+            with open(self.chunks_path, "rb") as f:
+                self.chunks = pickle.load(f)
+            print("⚠️ Loaded legacy chunks.pkl; run scripts/migrate_chunks.py "
+                  "to switch to the memory-mapped chunk store")
+
+        # Mapped, not read: only rows of re-scored candidates are paged in
+        self.full_vectors = None
+        vectors_file = self.index_meta.get("vectors_file")
+        if vectors_file and os.path.exists(os.path.join(self.index_dir, vectors_file)):
+            self.full_vectors = np.memmap(
+                os.path.join(self.index_dir, vectors_file),
+                dtype="float32",
+                mode="r",
+                shape=(len(self.chunks), self.index.d),
+            )
+
+        self.lexical_index = None
+        lexical_file = self.index_meta.get("lexical_file")
+        if lexical_file and os.path.exists(os.path.join(self.index_dir, lexical_file)):
+            lexical_index = LexicalIndex.load(os.path.join(self.index_dir, lexical_file))
+            if len(lexical_index) == len(self.chunks):
+                self.lexical_index = lexical_index
+            else:
+                print("⚠️ Lexical index does not match the chunk store; hybrid search disabled")
 
-        with open(self.chunks_path, "rb") as f:
-            self.chunks = pickle.load(f)
+        self._build_filter_index()
 
         print(f"✅ Loaded vector store with {len(self.chunks)} chunks")
 
     # ---------------------------
     # Retrieval
     # ---------------------------
-    def search(self, query: str, top_k: int = 3) -> List[Dict]:
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Encode queries into L2-normalized float32 vectors (one row per query)
+        """
+        embeddings = self.embedding_model.encode(queries)
+
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def _dense_search(
+        self, query_embeddings: np.ndarray, top_k: int, match: FilterMatch | None = None
+    ):
+        """
+        (scores, rows) of the top-k chunk store rows per query, -1 padded;
+        restricted to the rows of `match` when given
+        """
+        if match is not None and not len(match):
+            n = len(query_embeddings)
+            return np.full((n, top_k), -np.inf, dtype="float32"), np.full((n, top_k), -1)
+
+        if (
+            match is not None
+            and self.full_vectors is not None
+            and len(match) <= config.FILTER_EXACT_MAX_ROWS
+        ):
+            # Few matching chunks: scoring just those rows is cheaper than a
+            # filtered index search, and exact
+            return exact_subset_search(query_embeddings, match.rows, self.full_vectors, top_k)
+
+        # Quantized scores only pick candidates; exact scores rank them
+        rescore = (
+            self.full_vectors is not None
+            and self.index_meta.get("quantization", "float32") != "float32"
+            and config.RESCORE_FACTOR > 1
+        )
+        fetch_k = top_k * config.RESCORE_FACTOR if rescore else top_k
+
+        params = selector_search_params(self.index, match.selector) if match is not None else None
+        scores, labels = self.index.search(query_embeddings, fetch_k, params=params)
+
+        # ID-mapped indexes return chunk IDs; translate them to store rows
+        indices = self._id_map.rows(labels) if self._id_map is not None else labels
+
+        if rescore:
+            scores, indices = rescore_candidates(
+                query_embeddings, indices, self.full_vectors, top_k
+            )
+        return scores, indices
+
+    def _hybrid_search(
+        self,
+        queries: List[str],
+        query_embeddings: np.ndarray,
+        top_k: int,
+        match: FilterMatch | None = None,
+    ):
+        """
+        Fuse dense and BM25 rankings with reciprocal rank fusion; each side
+        contributes its top HYBRID_CANDIDATES rows
+        """
+        fetch_k = max(top_k, config.HYBRID_CANDIDATES)
+        _, dense_rows = self._dense_search(query_embeddings, fetch_k, match)
+        allowed = match.rows if match is not None else None
+
+        scores, indices = [], []
+        for query, dense in zip(queries, dense_rows):
+            lexical, _ = self.lexical_index.search(query, fetch_k, allowed)
+            rows, fused = reciprocal_rank_fusion([dense, lexical], top_k)
+            indices.append(rows)
+            scores.append(fused)
+        return scores, indices
+
+    def search_vectors(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int = 3,
+        queries: List[str] | None = None,
+        filters: Filters | None = None,
+        with_vectors: bool = False,
+    ) -> List[List[Dict]]:
+        """
+        Retrieve top-k chunks for already-embedded queries. With the query
+        texts, RETRIEVAL_MODE=hybrid and a lexical index, dense and BM25
+        results are fused (scores are then RRF scores, not cosine)
+
+        filters (e.g. {"language": "Hindi", "grade": [6, 7]}) restrict the
+        search itself to matching chunks; see app.retrieval.metadata_filter
+
+        with_vectors adds each hit's stored embedding under "vector" (for
+        reranking without re-encoding the chunks)
+
+        Returns:
+            One result list per query row
+        """
+        # ✅ FIX: DO NOT crash if index is missing (Render-safe)
+        if self.index is None:
+            print("⚠️ Vector index not loaded. Returning empty results.")
+            return [[] for _ in range(len(query_embeddings))]
+
+        match = self.filter_index.match(filters) if self.filter_index is not None else None
+
+        if (
+            queries is not None
+            and config.RETRIEVAL_MODE == "hybrid"
+            and self.lexical_index is not None
+        ):
+            scores, indices = self._hybrid_search(queries, query_embeddings, top_k, match)
+        else:
+            scores, indices = self._dense_search(query_embeddings, top_k, match)
+
+        all_results = []
+        for row_scores, row_indices in zip(scores, indices):
+            hits = [
+                (score, int(idx))
+                for score, idx in zip(row_scores, row_indices)
+                if 0 <= idx < len(self.chunks)
+            ]
+            vectors = (
+                self._row_vectors(np.array([idx for _, idx in hits], dtype="int64"))
+                if with_vectors else None
+            )
+
+            results = []
+            for i, (score, idx) in enumerate(hits):
+                # Only the hits are decoded from the chunk store
+                chunk = self.chunks[idx]
+                result = {
+                    "text": chunk_text_of(chunk),
+                    "metadata": chunk.get("metadata", {}),
+                    "score": float(score),  # cosine similarity (dense)
+                }
+                if vectors is not None:
+                    result["vector"] = vectors[i]
+                results.append(result)
+            all_results.append(results)
+
+        return all_results
+
+    def _row_vectors(self, rows: np.ndarray) -> np.ndarray | None:
+        """
+        Stored embeddings of store rows: read from the full-precision vectors
+        file, else reconstructed from the index (approximate for quantized
+        indexes). None when the index cannot reconstruct vectors.
+        """
+        if self.full_vectors is not None:
+            return np.asarray(self.full_vectors[rows], dtype="float32")
+        if not len(rows):
+            return np.empty((0, self.index.d), dtype="float32")
+
+        labels = (
+            np.asarray(self.chunk_ids)[rows] if self.index_meta.get("id_mapped") else rows
+        )
+        try:
+            return np.vstack([self.index.reconstruct(int(label)) for label in labels])
+        except RuntimeError:
+            return None
+
+    def search(self, query: str, top_k: int = 3, filters: Filters | None = None) -> List[Dict]:
         """
         Retrieve top-k relevant chunks
 
         Args:
             query: Teacher query
             top_k: Number of chunks to return
+            filters: Metadata filter, e.g. {"grade": 6, "subject": "science"}
 
         Returns:
             List of chunks with similarity scores
         """
-        # ✅ FIX: DO NOT crash if index is missing (Render-safe)
         if self.index is None:
             print("⚠️ Vector index not loaded. Returning empty results.")
             return []
 
-        query_embedding = self.embedding_model.encode(
-            [query], convert_to_numpy=True
-        ).astype("float32")
+        return self.search_vectors(self.embed_queries([query]), top_k, [query], filters)[0]
 
-        faiss.normalize_L2(query_embedding)
+    def search_batch_with_embeddings(
+        self,
+        queries: List[str],
+        top_k: int = 3,
+        filters: Filters | None = None,
+        with_vectors: bool = False,
+    ):
+        """
+        search_batch() that also returns the (n, dim) query embedding matrix
+        """
+        query_embeddings = self.embed_queries(queries)
+        return query_embeddings, self.search_vectors(
+            query_embeddings, top_k, queries, filters, with_vectors
+        )
+
+    def search_batch(
+        self, queries: List[str], top_k: int = 3, filters: Filters | None = None
+    ) -> List[List[Dict]]:
+        """
+        Retrieve top-k chunks for many queries with a single encode call and
+        a single FAISS search over the query matrix
 
-        scores, indices = self.index.search(query_embedding, top_k)
+        Returns:
+            One result list per query, in input order
+        """
+        return self.search_batch_with_embeddings(queries, top_k, filters)[1]
 
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.chunks):
-                results.append(
-                    {
-                        "text": self.chunks[idx].get("text", ""),
-                        "metadata": self.chunks[idx].get("metadata", {}),
-                        "score": float(score),  # cosine similarity
-                    }
-                )
+    # ---------------------------
+    # Async wrappers
+    # ---------------------------
+    async def _run_in_executor(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_embedding_executor(), fn, *args)
 
-        return results
+    async def asearch(
+        self, query: str, top_k: int = 3, filters: Filters | None = None
+    ) -> List[Dict]:
+        """
+        Non-blocking search(): runs on the dedicated embedding executor
+        """
+        return await self._run_in_executor(self.search, query, top_k, filters)
 
 
 # ---------------------------
@@ -150,13 +804,6 @@ class VectorStore:
 # ---------------------------
 def get_vector_store() -> VectorStore:
     """
-    Factory method used by RAG pipeline
+    The process-wide serving store (loaded once, see app.registry)
     """
-    store = VectorStore()
-
-    try:
-        store.load_index()
-    except FileNotFoundError:
-        print("⚠️ Vector index not found. Run embedding creation first.")
-
-    return store
+    return registry.vector_store()
@@ -0,0 +1,238 @@
+"""
+Translation Cache Module for Vidyamitra
+Two-tier cache for LLM translations:
+- In-memory LRU (per process)
+- Optional SQLite file (survives restarts, shared by workers)
+The async API answers memory hits inline and runs the disk tier on a thread
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+from app import config
+from app.utils.metrics import metrics
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace so trivial variants share a key"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TranslationCache:
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        db_path: Optional[str] = None,
+        disk_max_entries: int = 100_000,
+        touch_interval_seconds: float = 3600.0,
+    ):
+        """
+        Args:
+            max_entries: Size bound of the in-memory LRU tier
+            db_path: SQLite file for the on-disk tier (None disables it)
+            disk_max_entries: Size bound of the on-disk tier
+            touch_interval_seconds: A disk hit only refreshes the entry's
+                recency (a write) when it is older than this
+        """
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.disk_max_entries = disk_max_entries
+        self.touch_interval_seconds = touch_interval_seconds
+
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        # Memory tier and counters; never held across disk I/O
+        self._lock = threading.Lock()
+        # The SQLite connection is shared, so disk access is serialized
+        self._disk_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_trim = 0
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, target_language: str, model_name: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{digest}:{target_language.lower()}:{model_name}"
+
+    # ---------------------------
+    # Disk tier
+    # ---------------------------
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        # Opened lazily so constructing the cache never touches the disk
+        if self.db_path is None:
+            return None
+
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(
+                self.db_path, check_same_thread=False, timeout=5.0
+            )
+            # WAL lets several worker processes read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT PRIMARY KEY,"
+                " translation TEXT NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        conn = self._connection()
+        if conn is None:
+            return None
+
+        row = conn.execute(
+            "SELECT translation, last_used FROM translations WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        # Recency only decides what trimming evicts; coarse is enough, and
+        # keeps hits from being one write each
+        now = time.time()
+        if now - row[1] > self.touch_interval_seconds:
+            conn.execute(
+                "UPDATE translations SET last_used = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+        return row[0]
+
+    def _disk_put(self, key: str, translation: str):
+        conn = self._connection()
+        if conn is None:
+            return
+
+        conn.execute(
+            "INSERT OR REPLACE INTO translations (key, translation, last_used)"
+            " VALUES (?, ?, ?)",
+            (key, translation, time.time()),
+        )
+
+        # Trim in batches; counting rows on every write is wasteful
+        self._writes_since_trim += 1
+        if self._writes_since_trim >= 100:
+            self._writes_since_trim = 0
+            conn.execute(
+                "DELETE FROM translations WHERE key IN ("
+                " SELECT key FROM translations ORDER BY last_used DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,),
+            )
+
+        conn.commit()
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    def _remember(self, key: str, translation: str):
+        with self._lock:
+            self._memory[key] = translation
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key not in self._memory:
+                return None
+            self._memory.move_to_end(key)
+            self.hits_memory += 1
+            metrics.increment("translation_cache.hits.memory")
+            return self._memory[key]
+
+    def _disk_lookup(self, key: str) -> Optional[str]:
+        with self._disk_lock:
+            translation = self._disk_get(key)
+
+        if translation is not None:
+            self._remember(key, translation)
+            with self._lock:
+                self.hits_disk += 1
+            metrics.increment("translation_cache.hits.disk")
+            return translation
+
+        with self._lock:
+            self.misses += 1
+        metrics.increment("translation_cache.misses")
+        return None
+
+    def _disk_store(self, key: str, translation: str):
+        with self._disk_lock:
+            self._disk_put(key, translation)
+
+    def get(self, text: str, target_language: str, model_name: str) -> Optional[str]:
+        key = self.make_key(text, target_language, model_name)
+        translation = self._memory_get(key)
+        if translation is not None:
+            return translation
+        return self._disk_lookup(key)
+
+    def put(self, text: str, target_language: str, model_name: str, translation: str):
+        if not translation:
+            return
+
+        key = self.make_key(text, target_language, model_name)
+        self._remember(key, translation)
+        self._disk_store(key, translation)
+
+    async def aget(self, text: str, target_language: str, model_name: str) -> Optional[str]:
+        """
+        get() for the event loop: a memory hit is answered inline, the disk
+        tier runs on a worker thread
+        """
+        key = self.make_key(text, target_language, model_name)
+        translation = self._memory_get(key)
+        if translation is not None:
+            return translation
+        if self.db_path is None:
+            # No disk tier: only the miss to count, no I/O
+            return self._disk_lookup(key)
+        return await asyncio.to_thread(self._disk_lookup, key)
+
+    async def aput(self, text: str, target_language: str, model_name: str, translation: str):
+        """put() for the event loop; the disk write runs on a worker thread"""
+        if not translation:
+            return
+
+        key = self.make_key(text, target_language, model_name)
+        self._remember(key, translation)
+        if self.db_path is not None:
+            await asyncio.to_thread(self._disk_store, key, translation)
+
+    def stats(self) -> dict:
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self):
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def get_translation_cache() -> TranslationCache:
+    """
+    Factory using the configured size bounds and SQLite location
+    """
+    return TranslationCache(
+        max_entries=config.TRANSLATION_CACHE_SIZE,
+        db_path=config.TRANSLATION_CACHE_DB or None,
+        disk_max_entries=config.TRANSLATION_CACHE_DISK_MAX_ENTRIES,
+    )
@@ -0,0 +1,11 @@
+"""
+Shared helper functions for Vidyamitra
+"""
+
+
+def normalize_query(query: str) -> str:
+    """
+    Case- and whitespace-insensitive form of a teacher query, used as a
+    dedup key (e.g. "How to teach  Fractions?" == "how to teach fractions?")
+    """
+    return " ".join(query.lower().split())
@@ -0,0 +1,66 @@
+"""
+In-process Metrics Module for Vidyamitra
+Lightweight counters and latency summaries exposed via /metrics
+"""
+
+import threading
+from collections import defaultdict, deque
+from typing import Dict
+
+
+class Metrics:
+    def __init__(self, window: int = 1000):
+        """
+        Args:
+            window: Number of most recent observations kept per latency series
+        """
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._observations: Dict[str, deque] = defaultdict(
+            lambda: deque(maxlen=window)
+        )
+        self._totals: Dict[str, int] = defaultdict(int)
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self._observations[name].append(value)
+            self._totals[name] += 1
+
+    @staticmethod
+    def _percentile(values, q: float) -> float:
+        index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+        return values[index]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            series = {name: sorted(values) for name, values in self._observations.items()}
+            totals = dict(self._totals)
+
+        summaries = {}
+        for name, values in series.items():
+            if not values:
+                continue
+            summaries[name] = {
+                "count": totals[name],
+                "mean": round(sum(values) / len(values), 2),
+                "p50": round(self._percentile(values, 0.50), 2),
+                "p95": round(self._percentile(values, 0.95), 2),
+                "p99": round(self._percentile(values, 0.99), 2),
+            }
+
+        return {"counters": counters, "latency": summaries}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._observations.clear()
+            self._totals.clear()
+
+
+# Process-wide instance
+metrics = Metrics()
@@ -0,0 +1,67 @@
+"""
+Single-flight Module for Vidyamitra
+Collapses concurrent identical calls into one execution: the first caller
+for a key runs the work, callers arriving while it is in flight wait for
+and share its result (or its exception)
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from app.utils.metrics import metrics
+
+
+class SingleFlight:
+    """Thread-based single-flight for synchronous callers"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            metrics.increment(f"singleflight.{self.name}.coalesced")
+            return future.result()
+
+        metrics.increment(f"singleflight.{self.name}.executed")
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+        return future.result()
+
+
+class AsyncSingleFlight:
+    """asyncio single-flight for coroutine callers (one event loop)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+
+        if task is None:
+            metrics.increment(f"singleflight.{self.name}.executed")
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            metrics.increment(f"singleflight.{self.name}.coalesced")
+
+        # Shielded so one waiter disconnecting does not cancel the shared work
+        return await asyncio.shield(task)
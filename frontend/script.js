@@ -5,7 +5,7 @@ const userInput = document.getElementById("userInput");
 const languageSelect = document.getElementById("languageSelect");
 
 // ✅ FIX: explicit origin (Render-safe)
-const API_URL = window.location.origin + "/chat";
+const STREAM_URL = window.location.origin + "/chat/stream";
 
 function addMessage(text, sender) {
   const messageDiv = document.createElement("div");
@@ -13,6 +13,78 @@ function addMessage(text, sender) {
   messageDiv.textContent = text;
   chatContainer.appendChild(messageDiv);
   chatContainer.scrollTop = chatContainer.scrollHeight;
+  return messageDiv;
+}
+
+function appendToMessage(messageDiv, text) {
+  messageDiv.textContent += text;
+  chatContainer.scrollTop = chatContainer.scrollHeight;
+}
+
+// Parse one SSE block ("event: x\ndata: {...}") into { event, data }
+function parseSSEBlock(block) {
+  let event = "message";
+  let data = "";
+
+  for (const line of block.split("\n")) {
+    if (line.startsWith("event:")) {
+      event = line.slice(6).trim();
+    } else if (line.startsWith("data:")) {
+      data += line.slice(5).trim();
+    }
+  }
+
+  return { event, data: data ? JSON.parse(data) : {} };
+}
+
+// Render the answer token-by-token as the server streams it
+async function streamAnswer(payload) {
+  const response = await fetch(STREAM_URL, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload)
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error("HTTP " + response.status);
+  }
+
+  const botMessage = addMessage("", "bot");
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  try {
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        const { event, data } = parseSSEBlock(block);
+        if (event === "token") {
+          appendToMessage(botMessage, data.text);
+        } else if (event === "error") {
+          throw new Error(data.detail || "Stream error");
+        }
+      }
+    }
+
+    if (!botMessage.textContent) {
+      throw new Error("Empty stream");
+    }
+  } catch (error) {
+    // Drop the placeholder bubble if nothing was rendered into it
+    if (!botMessage.textContent) {
+      botMessage.remove();
+    }
+    throw error;
+  }
 }
 
 async function sendMessage() {
@@ -29,18 +101,7 @@ async function sendMessage() {
   };
 
   try {
-    const response = await fetch(API_URL, {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify(payload)
-    });
-
-    if (!response.ok) {
-      throw new Error("HTTP " + response.status);
-    }
-
-    const data = await response.json();
-    addMessage(data.answer, "bot");
+    await streamAnswer(payload);
 
   } catch (error) {
     console.error("Frontend → Backend error:", error);
@@ -0,0 +1,47 @@
+"""
+Gunicorn configuration for Vidyamitra (multi-worker serving)
+
+The app is imported and the vector store (plus torch model weights) loaded
+once in the master process, then workers are forked and share that memory
+copy-on-write. The FAISS index and chunk texts are memory-mapped files,
+shared through the page cache. See README "Multi-worker deployment".
+
+Usage:
+    WEB_WORKERS=4 gunicorn -c gunicorn.conf.py app.main:app
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_WORKERS", "2"))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Import app.main in the master so preloaded state is inherited by workers
+preload_app = True
+
+# Workers may still be loading the model when the first requests arrive
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+graceful_timeout = 30
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported, before any worker forks
+    from app.registry import registry
+
+    try:
+        registry.preload_for_fork()
+    except Exception as e:
+        # Workers load what they need themselves; only sharing is lost
+        server.log.warning(f"Preload failed, workers will load separately: {e}")
+        return
+
+    # Keep the cyclic GC from touching (and so un-sharing) preloaded objects
+    gc.freeze()
+    server.log.info("Vector store preloaded; forking workers")
+
+
+def post_fork(server, worker):
+    from app.registry import registry
+
+    registry.after_fork()
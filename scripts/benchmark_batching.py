@@ -0,0 +1,105 @@
+"""
+Query Micro-batching Benchmark
+Compares retrieval throughput of the per-request path (one encode + one
+FAISS search per query) against QueryBatcher under concurrent load
+
+Usage:
+    python scripts/benchmark_batching.py --concurrency 32 --requests 2000
+"""
+
+import sys
+import os
+
+# Ensure project root is on PYTHONPATH
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.retrieval.batcher import QueryBatcher
+from app.retrieval.vector_store import get_vector_store
+
+
+SAMPLE_QUERIES = [
+    "How can I help students who are struggling with reading?",
+    "What are some effective classroom management techniques?",
+    "How do I make my lessons more engaging?",
+    "How to teach fractions using hands-on activities?",
+    "Ways to build foundational numeracy in early grades",
+    "How should I assess learning without exams?",
+    "Activities for multilingual classrooms",
+    "How can I involve parents in student learning?",
+]
+
+
+def run_load(search_fn, concurrency: int, total: int):
+    latencies = []
+
+    def one(i):
+        query = f"{SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]} ({i})"
+        started = time.perf_counter()
+        search_fn(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "qps": total / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("⏱️  QUERY MICRO-BATCHING BENCHMARK")
+    print("=" * 70)
+
+    store = get_vector_store()
+    # Warm the model so the first timed call is not a cold start
+    store.search(SAMPLE_QUERIES[0], top_k=args.top_k)
+
+    per_request = run_load(
+        lambda q: store.search(q, top_k=args.top_k),
+        args.concurrency,
+        args.requests,
+    )
+
+    batcher = QueryBatcher(
+        store, window_ms=args.window_ms, max_batch_size=args.max_batch_size
+    )
+    batched = run_load(
+        lambda q: batcher.submit(q, args.top_k).result(),
+        args.concurrency,
+        args.requests,
+    )
+    batcher.close()
+
+    print(f"\nconcurrency={args.concurrency} requests={args.requests} "
+          f"window={args.window_ms}ms max_batch={args.max_batch_size}\n")
+    print(f"{'path':<14}{'QPS':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, result in (("per-request", per_request), ("micro-batch", batched)):
+        print(f"{name:<14}{result['qps']:>10.1f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+    print(f"\n📈 Throughput gain: {batched['qps'] / per_request['qps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
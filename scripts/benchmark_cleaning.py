@@ -0,0 +1,86 @@
+"""
+Text Cleaning Microbenchmark
+Compares the single-pass TextCleaner against the previous multi-pass
+clean_text (whitespace regex, number regex, one str.replace per word) on a
+synthetic corpus, both on one big string and page by page
+
+Usage:
+    python scripts/benchmark_cleaning.py --mb 50
+"""
+
+import sys
+import os
+
+# Ensure project root is on PYTHONPATH
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import argparse
+import random
+import re
+import time
+
+from app.ingestion.text_cleaner import DEFAULT_RULES, TextCleaner
+
+
+VOCABULARY = (
+    "teacher students classroom learning NEP policy policymaker framework "
+    "assessment reading activity guidelines for implementation pedagogy "
+    "Policy 57 112 2020 inclusive group discussion\n\n  chapter"
+).split(" ")
+
+
+def legacy_clean_text(text):
+    """clean_text as it was before the cleaning engine"""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\b\d{2,3}\b', '', text)
+    for word in DEFAULT_RULES["stopwords"]:
+        text = text.replace(word, "")
+    return text.strip()
+
+
+def synthetic_pages(mb: float, page_chars: int = 4000, seed: int = 0):
+    rng = random.Random(seed)
+    pages, size = [], 0
+    while size < mb * 1e6:
+        words, length = [], 0
+        while length < page_chars:
+            word = rng.choice(VOCABULARY)
+            words.append(word)
+            length += len(word) + 1
+        page = " ".join(words)
+        pages.append(page)
+        size += len(page)
+    return pages
+
+
+def timed(label: str, fn, mb: float) -> float:
+    started = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - started
+    print(f"{label:<28}{seconds:>10.2f}s{mb / seconds:>12.1f} MB/s")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=float, default=50.0)
+    args = parser.parse_args()
+
+    pages = synthetic_pages(args.mb)
+    corpus = "\n".join(pages)
+    mb = len(corpus) / 1e6
+    cleaner = TextCleaner.from_rules(DEFAULT_RULES)
+
+    print(f"📚 Synthetic corpus: {mb:.1f} MB in {len(pages)} pages\n")
+    legacy = timed("legacy, whole text", lambda: legacy_clean_text(corpus), mb)
+    engine = timed("engine, whole text", lambda: cleaner.clean(corpus), mb)
+    timed("legacy, per page", lambda: [legacy_clean_text(p) for p in pages], mb)
+    timed("engine, per page", lambda: [cleaner.clean(p) for p in pages], mb)
+
+    print(f"\n⚡ Speedup on whole text: {legacy / engine:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
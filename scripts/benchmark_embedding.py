@@ -0,0 +1,153 @@
+"""
+Embedding Backend Benchmark
+Compares the torch, onnx and onnx-int8 embedding backends: library import
+time, model load time, single-query latency, batch throughput, peak memory
+and agreement with the torch vectors.
+
+Each backend runs in a fresh Python process, so import time and RSS are
+those of a server using only that backend. Backends that are not installed
+or not exported are reported and skipped.
+
+Usage:
+    python scripts/benchmark_embedding.py --queries 200 --batch-texts 1024
+"""
+
+import sys
+import os
+
+# Ensure project root is on PYTHONPATH
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import argparse
+import json
+import subprocess
+import tempfile
+
+import numpy as np
+
+from app.retrieval.embedding_backend import BACKENDS
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process: argv = backend, queries, batch texts, batch
+# size, vectors output path; prints one JSON line
+PROBE = r"""
+import json, resource, sys, time
+import numpy as np
+
+backend, queries, batch_texts, batch_size, vectors_path = sys.argv[1:]
+queries, batch_texts, batch_size = int(queries), int(batch_texts), int(batch_size)
+
+started = time.perf_counter()
+if backend == "torch":
+    import sentence_transformers
+else:
+    import onnxruntime, tokenizers
+import_s = time.perf_counter() - started
+
+from app.retrieval.embedding_backend import load_embedding_backend
+started = time.perf_counter()
+model = load_embedding_backend(backend=backend)
+load_s = time.perf_counter() - started
+
+phrases = [
+    "How can I help students who are struggling with reading?",
+    "What are some effective classroom management techniques?",
+    "Ways to build foundational numeracy in early grades",
+    "How should I assess learning without exams?",
+    "Activities for multilingual classrooms that involve parents",
+]
+model.encode(phrases)  # warm-up
+
+latencies = []
+for i in range(queries):
+    text = f"{phrases[i % len(phrases)]} ({i})"
+    started = time.perf_counter()
+    model.encode([text])
+    latencies.append((time.perf_counter() - started) * 1000)
+
+# Chunk-sized passages of varied length
+texts = [" ".join(phrases[j % len(phrases)] for j in range(i % 7 + 1)) for i in range(batch_texts)]
+started = time.perf_counter()
+vectors = model.encode(texts, batch_size=batch_size)
+batch_s = time.perf_counter() - started
+np.save(vectors_path, vectors[:256])
+
+print(json.dumps({
+    "import_s": import_s,
+    "load_s": load_s,
+    "p50_ms": float(np.percentile(latencies, 50)),
+    "p95_ms": float(np.percentile(latencies, 95)),
+    "texts_per_s": batch_texts / batch_s,
+    "torch_loaded": "torch" in sys.modules,
+    # ru_maxrss is KiB on Linux
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def run_backend(backend: str, args, vectors_path: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, backend, str(args.queries),
+         str(args.batch_texts), str(args.batch_size), vectors_path],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else "probe failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def min_cosine(a: np.ndarray, b: np.ndarray) -> float:
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return float((a * b).sum(axis=1).min())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-texts", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("⏱️  EMBEDDING BACKEND BENCHMARK")
+    print("=" * 70)
+
+    results, vectors = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            print(f"   running {backend}...")
+            path = os.path.join(tmp, f"{backend}.npy")
+            results[backend] = run_backend(backend, args, path)
+            if "error" not in results[backend]:
+                vectors[backend] = np.load(path)
+
+    print(f"\n{'backend':<11}{'import s':>9}{'load s':>8}{'p50 ms':>8}{'p95 ms':>8}"
+          f"{'texts/s':>9}{'RSS MB':>8}{'min cos':>9}")
+    for backend, r in results.items():
+        if "error" in r:
+            print(f"{backend:<11}skipped: {r['error']}")
+            continue
+        agreement = (
+            f"{min_cosine(vectors[backend], vectors['torch']):>9.5f}"
+            if "torch" in vectors and backend != "torch"
+            and vectors[backend].shape == vectors["torch"].shape else f"{'-':>9}"
+        )
+        print(f"{backend:<11}{r['import_s']:>9.2f}{r['load_s']:>8.2f}{r['p50_ms']:>8.2f}"
+              f"{r['p95_ms']:>8.2f}{r['texts_per_s']:>9.0f}{r['peak_rss_mb']:>8.0f}{agreement}")
+
+    torch_free = [b for b, r in results.items() if "error" not in r and not r["torch_loaded"]]
+    if torch_free:
+        print(f"\n📦 Ran without importing torch: {', '.join(torch_free)}")
+
+
+if __name__ == "__main__":
+    main()
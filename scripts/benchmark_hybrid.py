@@ -0,0 +1,70 @@
+"""
+Hybrid Retrieval Latency Benchmark
+Compares per-query latency of dense-only retrieval against dense + BM25
+fusion on the saved index (query embedding time excluded, it is shared)
+
+Usage:
+    python scripts/benchmark_hybrid.py --k 3 --rounds 20
+"""
+
+import sys
+import os
+
+# Ensure project root is on PYTHONPATH
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import argparse
+import time
+
+import numpy as np
+
+from app import config
+from app.retrieval.vector_store import get_vector_store
+
+
+SAMPLE_QUERIES = [
+    "How can I help students who are struggling with reading?",
+    "What are some effective classroom management techniques?",
+    "Activities for teaching fractions with everyday objects",
+    "How do I assess group work fairly?",
+    "Ways to include children with special needs in class discussions",
+    "Storytelling as a pedagogy for early grades",
+]
+
+
+def timed_search(store, embeddings, queries, k, mode: str):
+    config.RETRIEVAL_MODE = mode
+    latencies = []
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        store.search_vectors(embeddings[i:i + 1], k, [query])
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=config.RETRIEVAL_TOP_K)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    store = get_vector_store()
+    if store.index is None:
+        raise SystemExit("❌ No index found. Run scripts/rebuild_index.py first.")
+    if store.lexical_index is None:
+        raise SystemExit("❌ Index has no lexical part. Rebuild it with scripts/rebuild_index.py.")
+
+    queries = SAMPLE_QUERIES * args.rounds
+    embeddings = store.embed_queries(queries)
+
+    print(f"chunks={len(store.chunks)} queries={len(queries)} k={args.k}\n")
+    print(f"{'mode':<10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode in ("dense", "hybrid"):
+        p50, p99 = timed_search(store, embeddings, queries, args.k, mode)
+        print(f"{mode:<10}{p50:>10.3f}{p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+FAISS Index Type Benchmark
+Builds every supported index type over the same vectors and reports
+recall@k against the exact flat baseline, p50/p99 query latency, build
+time and index memory. With several quantizations, also reports memory per
+million vectors, the recall delta against the float32 build of the same
+type, and recall after re-scoring candidates with full-precision vectors
+
+Usage:
+    python scripts/benchmark_index.py                      # current corpus
+    python scripts/benchmark_index.py --synthetic 200000   # random vectors at scale
+    python scripts/benchmark_index.py --synthetic 200000 --quantization float32 float16 int8
+"""
+
+import sys
+import os
+
+# Ensure project root is on PYTHONPATH
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import argparse
+import time
+
+import numpy as np
+import faiss
+
+from app.retrieval.index_factory import (
+    INDEX_TYPES,
+    QUANTIZATIONS,
+    build_index,
+    index_memory_bytes,
+    rescore_candidates,
+)
+
+
+def corpus_vectors(num_queries: int, seed: int):
+    """
+    Embed the indexed chunks; queries are the opening words of random chunks
+    (a realistic paraphrase-style lookup rather than an exact self-match)
+    """
+    from app.retrieval.vector_store import get_vector_store
+
+    store = get_vector_store()
+    if not len(store.chunks):
+        raise SystemExit("❌ No indexed chunks found. Run scripts/rebuild_index.py first.")
+
+    texts = [chunk["text"] for chunk in store.chunks]
+    vectors = store.embed_queries(texts)
+
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(texts), size=min(num_queries, len(texts)), replace=False)
+    queries = store.embed_queries([" ".join(texts[i].split()[:12]) for i in picks])
+    return vectors, queries
+
+
+def synthetic_vectors(n: int, dimension: int, num_queries: int, seed: int):
+    rng = np.random.default_rng(seed)
+    # Clustered data behaves more like real embeddings than uniform noise
+    centers = rng.standard_normal((max(1, n // 500), dimension)).astype("float32")
+    labels = rng.integers(0, len(centers), size=n + num_queries)
+    data = centers[labels] + 0.3 * rng.standard_normal((n + num_queries, dimension)).astype("float32")
+    faiss.normalize_L2(data)
+    return data[:n], data[n:]
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def measure(index, queries: np.ndarray, k: int, fetch_k: int | None = None):
+    """Search one query at a time; returns (nq, fetch_k) labels and p50/p99 ms"""
+    latencies = []
+    found = []
+    for q in queries:
+        started = time.perf_counter()
+        _, ids = index.search(q.reshape(1, -1), fetch_k or k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found.append(ids[0])
+    return np.array(found), np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Benchmark N random clustered vectors instead of the corpus")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=None)
+    parser.add_argument("--ef-search", type=int, default=None)
+    parser.add_argument("--quantization", nargs="+", default=["float32"],
+                        choices=list(QUANTIZATIONS))
+    parser.add_argument("--rescore-factor", type=int, default=4,
+                        help="Candidates fetched per result when re-scoring quantized indexes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("📊 FAISS INDEX BENCHMARK")
+    print("=" * 70)
+
+    if args.synthetic:
+        vectors, queries = synthetic_vectors(args.synthetic, args.dimension, args.queries, args.seed)
+    else:
+        vectors, queries = corpus_vectors(args.queries, args.seed)
+
+    k = min(args.k, len(vectors))
+    overrides = {}
+    if args.nprobe:
+        overrides["nprobe"] = args.nprobe
+    if args.ef_search:
+        overrides["ef_search"] = args.ef_search
+
+    print(f"\nvectors={len(vectors)} dim={vectors.shape[1]} queries={len(queries)} k={k}\n")
+    print(f"{'type':<10}{'quant':<9}{'recall@k':>10}{'Δ f32':>8}{'rescored':>10}"
+          f"{'p50 ms':>9}{'p99 ms':>9}{'build s':>9}{'memory MB':>11}{'MB/1M':>9}  params")
+
+    # Exact top-k (flat float32) is the ground truth for every row
+    truth = measure(build_index(vectors, "flat", {"quantization": "float32"})[0], queries, k)[0]
+    fetch_k = min(k * args.rescore_factor, len(vectors))
+
+    for index_type in INDEX_TYPES:
+        # PQ is its own compression; scalar quantization does not apply
+        quantizations = ["float32"] if index_type == "ivf_pq" else args.quantization
+        baseline = None
+
+        for quantization in quantizations:
+            started = time.perf_counter()
+            index, params = build_index(
+                vectors, index_type, {**overrides, "quantization": quantization}
+            )
+            build_seconds = time.perf_counter() - started
+
+            found, p50, p99 = measure(index, queries, k)
+            recall = recall_at_k(found, truth)
+            if baseline is None:
+                baseline = recall
+
+            rescored = "-"
+            if params["quantization"] != "float32":
+                candidates = measure(index, queries, k, fetch_k)[0]
+                rows = rescore_candidates(queries, candidates, vectors, k)[1]
+                rescored = f"{recall_at_k(rows, truth):.3f}"
+
+            memory = index_memory_bytes(index)
+            print(
+                f"{index_type:<10}{params['quantization']:<9}{recall:>10.3f}"
+                f"{recall - baseline:>+8.3f}{rescored:>10}{p50:>9.3f}{p99:>9.3f}"
+                f"{build_seconds:>9.2f}{memory / 1e6:>11.2f}"
+                # bytes per vector == MB per million vectors
+                f"{memory / len(vectors):>9.0f}  {params}"
+            )
+
+
+if __name__ == "__main__":
+    main()
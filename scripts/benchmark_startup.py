@@ -0,0 +1,93 @@
+"""
+Startup Benchmark
+Measures cold start of the API process: time until the app is importable
+(the port can open and /health answers), time until every registry
+component is loaded (/ready), per-component load times and peak memory.
+
+Every run is a fresh Python process, so nothing is cached between runs
+except the OS page cache.
+
+Usage:
+    python scripts/benchmark_startup.py --runs 5
+"""
+
+import sys
+import os
+
+# Ensure project root is on PYTHONPATH
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import argparse
+import json
+import statistics
+import subprocess
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process; prints one JSON line
+PROBE = r"""
+import json, resource, sys, time
+
+started = time.perf_counter()
+import app.main
+from app.registry import registry
+imported = time.perf_counter() - started
+heavy = sorted(m for m in ("torch", "sentence_transformers", "onnxruntime") if m in sys.modules)
+
+registry.warm_up()
+ready = time.perf_counter() - started
+
+print(json.dumps({
+    "import_s": imported,
+    "ready_s": ready,
+    "heavy_at_import": heavy,
+    "components": {
+        name: c.get("load_seconds") for name, c in registry.status()["components"].items()
+    },
+    # ru_maxrss is KiB on Linux
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "WARM_UP_ON_STARTUP": "0"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        runs.append(run_once())
+        print(f"   run {i + 1}/{args.runs}: ready in {runs[-1]['ready_s']:.2f}s")
+
+    print(f"\n{'phase':<50}{'median s':>10}")
+    print(f"{'import app (port opens, /health)':<50}{statistics.median([r['import_s'] for r in runs]):>10.3f}")
+    # Nested loads count towards their parent too (rag_pipeline includes all)
+    for name in sorted(runs[0]["components"]):
+        seconds = [r["components"].get(name) or 0.0 for r in runs]
+        print(f"{'  load ' + name:<50}{statistics.median(seconds):>10.3f}")
+    print(f"{'ready (/ready = 200)':<50}{statistics.median([r['ready_s'] for r in runs]):>10.3f}")
+
+    print(f"\n🧠 Peak RSS: {statistics.median([r['peak_rss_mb'] for r in runs]):.0f} MB (median)")
+    heavy = runs[0]["heavy_at_import"]
+    print(f"📦 Heavy modules imported with the app: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
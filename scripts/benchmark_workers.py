@@ -0,0 +1,225 @@
+"""
+Multi-worker Memory Scaling Benchmark
+Starts the server with 1..N workers and reports, per worker count:
+- RSS per worker (what `top` shows; counts shared pages in every process)
+- private memory per worker (USS: pages only that worker uses)
+- PSS of the whole server (shared pages split between the processes
+  mapping them; the memory the server actually costs the node)
+- aggregate /search throughput and latency under concurrent clients
+
+Modes:
+- shared: gunicorn.conf.py (state preloaded before fork, index mmapped)
+- naive:  uvicorn --workers N with INDEX_MMAP=0 (every worker loads its own copy)
+
+Linux only (reads /proc).
+
+Usage:
+    python scripts/benchmark_workers.py --workers 1 2 4 8 --mode shared naive
+"""
+
+import sys
+import os
+
+# Ensure project root is on PYTHONPATH
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import argparse
+import asyncio
+import signal
+import socket
+import subprocess
+import time
+
+import httpx
+import numpy as np
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_QUERIES = [
+    "How can I help students who are struggling with reading?",
+    "What are some effective classroom management techniques?",
+    "How do I make my lessons more engaging?",
+    "How to teach fractions using hands-on activities?",
+    "Ways to build foundational numeracy in early grades",
+    "How should I assess learning without exams?",
+    "Activities for multilingual classrooms",
+    "How can I involve parents in student learning?",
+]
+
+
+# ---------------------------
+# Process memory (/proc)
+# ---------------------------
+def children(pid: int) -> list:
+    pids = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    return pids
+
+
+def memory_mb(pid: int) -> dict:
+    """rss / pss / uss of one process, in MB"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "uss": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+# ---------------------------
+# Server lifecycle
+# ---------------------------
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode: str, workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "PORT": str(port), "WEB_WORKERS": str(workers)}
+    if mode == "shared":
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"]
+    else:
+        env["INDEX_MMAP"] = "0"
+        command = [sys.executable, "-m", "uvicorn", "app.main:app",
+                   "--port", str(port), "--workers", str(workers)]
+
+    return subprocess.Popen(
+        command, cwd=ROOT, env=env, start_new_session=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(url: str, workers: int, timeout: float) -> bool:
+    """
+    /ready is answered by whichever worker accepts the connection; require
+    a run of 200s long enough that every worker has almost surely answered
+    """
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while time.monotonic() < deadline:
+        try:
+            ok = httpx.get(f"{url}/ready", timeout=5).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        streak = streak + 1 if ok else 0
+        if streak >= 4 * workers:
+            return True
+        time.sleep(0.05 if ok else 0.5)
+    return False
+
+
+def stop_server(process: subprocess.Popen):
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+# ---------------------------
+# Load
+# ---------------------------
+async def run_load(url: str, clients: int, seconds: float) -> dict:
+    latencies, errors = [], 0
+    deadline = time.monotonic() + seconds
+
+    async def client(i: int, http: httpx.AsyncClient):
+        nonlocal errors
+        n = 0
+        while time.monotonic() < deadline:
+            query = f"{SAMPLE_QUERIES[(i + n) % len(SAMPLE_QUERIES)]} ({i}-{n})"
+            started = time.perf_counter()
+            try:
+                response = await http.post(f"{url}/search", json={"query": query})
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+            except httpx.HTTPError:
+                errors += 1
+            n += 1
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as http:
+        started = time.monotonic()
+        await asyncio.gather(*(client(i, http) for i in range(clients)))
+        elapsed = time.monotonic() - started
+
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)) if latencies else float("nan"),
+        "p99_ms": float(np.percentile(latencies, 99)) if latencies else float("nan"),
+        "errors": errors,
+    }
+
+
+def measure(mode: str, workers: int, args) -> dict | None:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    process = start_server(mode, workers, port)
+    try:
+        if not wait_ready(url, workers, args.startup_timeout):
+            print(f"   ⚠️ {mode} x{workers}: not ready within {args.startup_timeout:.0f}s")
+            return None
+
+        load = asyncio.run(run_load(url, args.clients, args.seconds))
+
+        # Memory after load: every worker has touched the pages it serves from
+        # (uvicorn serves a single worker in its own process, no children)
+        worker_pids = children(process.pid) or [process.pid]
+        processes = [memory_mb(pid) for pid in worker_pids]
+        master = memory_mb(process.pid) if worker_pids != [process.pid] else {"pss": 0.0}
+        return {
+            **load,
+            "rss": float(np.mean([p["rss"] for p in processes])),
+            "uss": float(np.mean([p["uss"] for p in processes])),
+            "pss_total": master["pss"] + sum(p["pss"] for p in processes),
+        }
+    finally:
+        stop_server(process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--mode", nargs="+", default=["shared", "naive"],
+                        choices=["shared", "naive"])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--startup-timeout", type=float, default=180.0)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("⏱️  MULTI-WORKER MEMORY SCALING BENCHMARK")
+    print("=" * 70)
+
+    rows = []
+    for mode in args.mode:
+        for workers in args.workers:
+            print(f"   running {mode} x{workers}...")
+            result = measure(mode, workers, args)
+            if result:
+                rows.append((mode, workers, result))
+
+    print(f"\n{'mode':<8}{'workers':>8}{'RSS/w MB':>10}{'USS/w MB':>10}{'PSS MB':>9}"
+          f"{'req/s':>8}{'p50 ms':>8}{'p99 ms':>8}{'errors':>8}")
+    for mode, workers, r in rows:
+        print(f"{mode:<8}{workers:>8}{r['rss']:>10.0f}{r['uss']:>10.0f}{r['pss_total']:>9.0f}"
+              f"{r['rps']:>8.0f}{r['p50_ms']:>8.1f}{r['p99_ms']:>8.1f}{r['errors']:>8}")
+
+    print("\n📈 PSS is what the node pays: with sharing it should grow by roughly "
+          "one worker's USS per added worker")
+
+
+if __name__ == "__main__":
+    main()
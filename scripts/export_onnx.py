@@ -0,0 +1,188 @@
+"""
+ONNX Export Script
+Exports the sentence-transformers embedding model to ONNX (plus an int8
+variant with dynamically quantized weights) so serving can run with
+EMBEDDING_BACKEND=onnx / onnx-int8 and no torch.
+
+Needs the full build environment (torch, sentence-transformers) plus
+onnx and onnxruntime. Every exported variant is checked against the torch
+vectors; the export fails if any text falls below MIN_COSINE.
+
+Usage:
+    python scripts/export_onnx.py               # float32 + int8
+    python scripts/export_onnx.py --no-int8
+"""
+
+import sys
+import os
+
+# Ensure project root is on PYTHONPATH
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import argparse
+import itertools
+import json
+import time
+
+import numpy as np
+
+from app import config
+from app.ingestion.pipeline import ChunkFile
+from app.retrieval.chunk_store import chunk_text_of
+from app.retrieval.embedding_backend import (
+    MANIFEST_FILE,
+    MIN_COSINE,
+    TOKENIZER_FILE,
+    OnnxBackend,
+    SentenceTransformerBackend,
+    onnx_model_dir,
+)
+
+
+MODEL_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+
+CHECK_TEXTS = [
+    "How can I help students who are struggling with reading?",
+    "What are some effective classroom management techniques?",
+    "Ways to build foundational numeracy in early grades",
+    "ಮಕ್ಕಳಿಗೆ ಓದುವುದನ್ನು ಹೇಗೆ ಕಲಿಸುವುದು?",
+    "बच्चों को गणित कैसे पढ़ाएं?",
+    "",
+]
+
+
+def check_texts(limit: int) -> list:
+    """Fixed probes plus the first chunks of the corpus, when there is one"""
+    texts = list(CHECK_TEXTS)
+    if os.path.exists(config.CHUNKS_FILE):
+        texts += [chunk_text_of(c) for c in itertools.islice(ChunkFile(config.CHUNKS_FILE), limit)]
+    return texts
+
+
+def export_model(reference: SentenceTransformerBackend, out_dir: str, opset: int) -> int:
+    """Writes model.onnx and tokenizer.json; returns the max sequence length"""
+    import torch
+
+    transformer, pooling = reference.model[0], reference.model[1]
+    if not pooling.pooling_mode_mean_tokens or pooling.pooling_mode_cls_token:
+        raise ValueError("Only mean-pooled models can be exported")
+
+    class Encoder(torch.nn.Module):
+        """Transformer only; pooling runs in numpy on the serving side"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids,
+                return_dict=False,
+            )[0]
+
+    tokenizer = transformer.tokenizer
+    dummy = tokenizer(["export", "a longer export input"], padding=True, return_tensors="pt")
+    axes = {0: "batch", 1: "sequence"}
+
+    torch.onnx.export(
+        Encoder(transformer.auto_model).eval(),
+        (dummy["input_ids"], dummy["attention_mask"], dummy["token_type_ids"]),
+        os.path.join(out_dir, MODEL_FILE),
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": axes,
+            "attention_mask": axes,
+            "token_type_ids": axes,
+            "last_hidden_state": axes,
+        },
+        opset_version=opset,
+    )
+
+    fast_tokenizer = tokenizer.backend_tokenizer
+    fast_tokenizer.no_truncation()
+    fast_tokenizer.no_padding()
+    fast_tokenizer.save(os.path.join(out_dir, TOKENIZER_FILE))
+
+    return transformer.max_seq_length
+
+
+def quantize_model(out_dir: str):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        os.path.join(out_dir, MODEL_FILE),
+        os.path.join(out_dir, INT8_FILE),
+        weight_type=QuantType.QInt8,
+    )
+
+
+def min_cosine(a: np.ndarray, b: np.ndarray) -> float:
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return float((a * b).sum(axis=1).min())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL)
+    parser.add_argument("--no-int8", action="store_true", help="Skip the int8 variant")
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument("--check-chunks", type=int, default=256,
+                        help="Corpus chunks compared against the torch vectors")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"📦 EXPORTING {args.model} TO ONNX")
+    print("=" * 70)
+
+    out_dir = onnx_model_dir(args.model)
+    os.makedirs(out_dir, exist_ok=True)
+
+    reference = SentenceTransformerBackend(args.model)
+    max_seq_length = export_model(reference, out_dir, args.opset)
+    print(f"✅ Wrote {MODEL_FILE} and {TOKENIZER_FILE} to {out_dir}")
+
+    if not args.no_int8:
+        quantize_model(out_dir)
+        print(f"✅ Wrote {INT8_FILE}")
+
+    manifest = {
+        "model_name": args.model,
+        "dimension": reference.dimension,
+        "max_seq_length": max_seq_length,
+        "pooling": "mean",
+        "pad_token": reference.model.tokenizer.pad_token,
+        "model_file": MODEL_FILE,
+        "int8_file": None if args.no_int8 else INT8_FILE,
+        "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    texts = check_texts(args.check_chunks)
+    expected = reference.encode(texts)
+    print(f"\n🔎 Comparing against torch vectors on {len(texts)} texts")
+
+    failed = False
+    for quantized in ([False] if args.no_int8 else [False, True]):
+        backend = OnnxBackend(out_dir, quantized=quantized)
+        cosine = min_cosine(backend.encode(texts), expected)
+        ok = cosine >= MIN_COSINE[backend.variant]
+        failed |= not ok
+        print(f"   {'✅' if ok else '❌'} {backend.variant:<10} min cosine {cosine:.6f} "
+              f"(required {MIN_COSINE[backend.variant]})")
+
+    if failed:
+        sys.exit("❌ Exported model does not match the torch vectors closely enough")
+
+    print(f"\n✅ Done. Serve with EMBEDDING_BACKEND=onnx (or onnx-int8)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,74 @@
+"""
+Ingestion Script
+Turns source documents (PDFs, scanned or not, and text dumps) into the
+chunks file consumed by scripts/rebuild_index.py
+
+Usage:
+    python scripts/ingest_pdf.py                          # everything in data/raw
+    python scripts/ingest_pdf.py books/ extra.pdf --workers 8
+"""
+
 import sys
 import os
+import argparse
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import json
-from app.ingestion.pdf_loader import load_pdf_text
-from app.ingestion.text_cleaner import clean_text
-from app.ingestion.chunker import chunk_text
+from app import config
+from app.ingestion.batch_ingest import WorkerStats, find_documents, iter_document_pages
+from app.ingestion.text_cleaner import clean_pages
+from app.ingestion.chunker import iter_chunks
+from app.ingestion.dedup import dedup_jsonl
+from app.ingestion.pipeline import StageMeter, write_jsonl
+
+RAW_DIR = "data/raw"
+
+def run(inputs, output_path, workers, checkpoint_dir, dedup=True):
+    paths = find_documents(inputs)
+    if not paths:
+        print(f"❌ No .pdf / .txt documents found in {inputs}")
+        return
 
-PDF_PATH = "data/raw/ncert_training_resource.txt"
+    print(f"📚 Ingesting {len(paths)} documents with {workers} workers...")
 
-# PDF_PATH = "data/raw/ncert_training_resource.pdf"
-OUTPUT_PATH = "data/processed/cleaned_chunks.json"
+    # Each stage is a generator, so only a bounded number of pages / chunks
+    # is in flight; finished pages are checkpointed for resuming
+    meter = StageMeter()
+    worker_stats = WorkerStats()
+    pages = meter.wrap("load", iter_document_pages(
+        paths, workers=workers, checkpoint_dir=checkpoint_dir, stats=worker_stats
+    ))
+    cleaned = meter.wrap("clean", clean_pages(pages))
+    chunks = meter.wrap("chunk", iter_chunks(cleaned))
 
-def run():
-    raw_text = load_pdf_text(PDF_PATH)
-    cleaned_text = clean_text(raw_text)
-    chunks = chunk_text(cleaned_text)
+    # Near-duplicates can only be found once every chunk has a signature,
+    # so chunks are spooled first and deduplicated into the output
+    raw_path = output_path + ".raw" if dedup else output_path
+    total = write_jsonl(chunks, raw_path)
 
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(chunks, f, indent=2)
+    report = None
+    if dedup:
+        report = dedup_jsonl(raw_path, output_path)
+        os.remove(raw_path)
+        total = report.chunks_out
 
     print("✅ Ingestion complete")
-    print(f"Total chunks: {len(chunks)}")
+    print(f"Total chunks: {total}")
+    worker_stats.print_report()
+    meter.print_report()
+    if report is not None:
+        report.print_report()
 
 if __name__ == "__main__":
-    run()
+    parser = argparse.ArgumentParser(description="Ingest documents into chunks")
+    parser.add_argument("inputs", nargs="*", default=[RAW_DIR],
+                        help="Files or directories to ingest (default: data/raw)")
+    parser.add_argument("--output", default=config.CHUNKS_FILE)
+    parser.add_argument("--workers", type=int, default=config.INGEST_WORKERS)
+    parser.add_argument("--checkpoint-dir", default=config.INGEST_CHECKPOINT_DIR)
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Keep near-duplicate chunks")
+    args = parser.parse_args()
 
+    run(args.inputs, args.output, args.workers, args.checkpoint_dir,
+        dedup=config.DEDUP_ENABLED and not args.no_dedup)
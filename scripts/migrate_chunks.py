@@ -0,0 +1,97 @@
+"""
+Chunk Store Migration Script
+Converts the legacy pickled chunks (data/vector_db/index/chunks.pkl) into
+the memory-mapped chunk store and compares load time / RSS of both formats
+
+Usage:
+    python scripts/migrate_chunks.py [--index-dir data/vector_db/index]
+"""
+
+import sys
+import os
+
+# Ensure project root is on PYTHONPATH
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import argparse
+import json
+import pickle
+import subprocess
+
+from app.retrieval.chunk_store import ChunkStore, write_chunk_store
+
+
+# Runs in a fresh interpreter so each format is measured in isolation
+MEASURE_SNIPPET = """
+import json, pickle, resource, sys, time
+sys.path.insert(0, {root!r})
+from app.retrieval.chunk_store import ChunkStore
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+if {fmt!r} == "pickle":
+    with open({path!r}, "rb") as f:
+        chunks = pickle.load(f)
+else:
+    chunks = ChunkStore({path!r})
+loaded = time.perf_counter() - started
+# Typical request: decode the top-3 hits
+for i in range(min(3, len(chunks))):
+    chunks[i]
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"load_ms": loaded * 1000, "rss_delta_kb": after - before}}))
+"""
+
+
+def measure(fmt: str, path: str) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output(
+        [sys.executable, "-c", MEASURE_SNIPPET.format(root=root, fmt=fmt, path=path)]
+    )
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--index-dir", default="data/vector_db/index")
+    parser.add_argument(
+        "--remove-pickle", action="store_true",
+        help="Delete chunks.pkl after a successful migration",
+    )
+    args = parser.parse_args()
+
+    pickle_path = os.path.join(args.index_dir, "chunks.pkl")
+
+    print("=" * 70)
+    print("📦 MIGRATING CHUNKS TO MEMORY-MAPPED STORE")
+    print("=" * 70)
+
+    if not os.path.exists(pickle_path):
+        print(f"\n❌ Error: {pickle_path} not found!")
+        return
+
+    with open(pickle_path, "rb") as f:
+        chunks = pickle.load(f)
+
+    write_chunk_store(chunks, args.index_dir)
+    store = ChunkStore(args.index_dir)
+    assert len(store) == len(chunks), "chunk count mismatch after migration"
+    store.close()
+
+    print(f"\n✅ Migrated {len(chunks)} chunks into {args.index_dir}")
+
+    pickle_stats = measure("pickle", pickle_path)
+    store_stats = measure("store", args.index_dir)
+
+    print(f"\n{'format':<10}{'load ms':>12}{'RSS delta KB':>16}")
+    print(f"{'pickle':<10}{pickle_stats['load_ms']:>12.2f}{pickle_stats['rss_delta_kb']:>16}")
+    print(f"{'mmap':<10}{store_stats['load_ms']:>12.2f}{store_stats['rss_delta_kb']:>16}")
+
+    if args.remove_pickle:
+        os.remove(pickle_path)
+        print(f"\n🗑️  Removed {pickle_path}")
+
+
+if __name__ == "__main__":
+    main()
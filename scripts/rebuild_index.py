@@ -1,19 +1,111 @@
 """
 Build Vector Index Script
 Run this after Role 1 completes data ingestion
+
+Every build is saved as a new index version and then published; running
+servers swap it in without a restart (see README "Index updates").
+
+Usage:
+    python scripts/rebuild_index.py                      # full rebuild
+    python scripts/rebuild_index.py --incremental        # apply only what changed
+    python scripts/rebuild_index.py --activate VERSION   # roll back to a kept version
 """
 
 import sys
 import os
+import argparse
+import time
 
 # Ensure project root is on PYTHONPATH
 sys.path.insert(
     0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 )
 
+from app.config import CHUNKS_FILE
+from app.retrieval.index_versions import (
+    list_versions,
+    new_version,
+    publish_version,
+    version_dir,
+)
 from app.retrieval.vector_store import VectorStore
 
 
+def publish(vector_store: VectorStore, version: str):
+    """Make the saved version the one servers load"""
+    publish_version(version, {"chunks": len(vector_store.chunks),
+                              "index_type": vector_store.index_type})
+    print(f"\n🚀 Published index version {version}")
+    print(f"📁 Index location: {vector_store.index_dir}")
+
+
+def print_cache_stats(vector_store: VectorStore):
+    """Embedding cache hit rate and the encode time it saved"""
+    cache = vector_store.embedding_cache
+    if cache is None:
+        return
+
+    stats = cache.stats()
+    saved = stats["seconds_saved"]
+    print(f"\n🗃️  Embedding cache: {stats['hits']} hits / {stats['misses']} misses "
+          f"({stats['hit_rate']:.1%} hit rate)")
+    print(f"   Encoding took {stats['encode_seconds']:.1f}s"
+          + (f", cache saved ~{saved:.1f}s" if saved is not None else ""))
+
+
+def print_lexical_stats(vector_store: VectorStore):
+    """Size of the BM25 index built next to the FAISS index"""
+    lexical = vector_store.lexical_index
+    if lexical is None:
+        return
+
+    print(f"\n🔤 Lexical index: {len(lexical.terms)} terms, "
+          f"{len(lexical.doc_ids)} postings, {lexical.nbytes() / 1e6:.2f} MB")
+
+
+def update_index():
+    """
+    Diff the latest ingestion output against the saved index and apply only
+    the difference (new chunks embedded, vanished chunks removed)
+    """
+    print("=" * 70)
+    print("🔁  UPDATING VECTOR INDEX INCREMENTALLY")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    vector_store = VectorStore()
+
+    try:
+        vector_store.load_index()
+    except FileNotFoundError:
+        print("\n⚠️ No existing index found, falling back to a full build.")
+        return build_index()
+
+    print("\n📂 Loading cleaned chunks...")
+    new_chunks = vector_store.read_chunks()
+
+    try:
+        stats = vector_store.apply_updates(new_chunks)
+    except ValueError as e:
+        print(f"\n⚠️ {e}")
+        return build_index()
+
+    # Saved as a new version: servers keep reading the current one untouched
+    print("\n💾 Saving vector index to disk...")
+    version = new_version()
+    vector_store.save_index(version_dir(version))
+    publish(vector_store, version)
+
+    print("\n" + "=" * 70)
+    print("✅ VECTOR INDEX UPDATED")
+    print("=" * 70)
+    print(f"\n➕ Added: {stats['added']}  ➖ Removed: {stats['removed']}  "
+          f"= Unchanged: {stats['unchanged']}")
+    print(f"⏱️  Took {time.perf_counter() - started:.1f}s")
+    print_cache_stats(vector_store)
+    print_lexical_stats(vector_store)
+
+
 def build_index():
     """
     Build vector index from cleaned chunks
@@ -22,19 +114,20 @@ def build_index():
     print("🏗️  BUILDING VECTOR INDEX")
     print("=" * 70)
 
-    chunks_path = "data/processed/cleaned_chunks.json"
+    chunks_path = CHUNKS_FILE
 
     # Step 1: Check if cleaned chunks exist
     if not os.path.exists(chunks_path):
         print(f"\n❌ Error: {chunks_path} not found!")
         print("\nPlease ensure Role 1 (Data Ingestion) has completed their work.")
-        print("Required file: data/processed/cleaned_chunks.json")
+        print(f"Required file: {chunks_path}")
         return
 
     try:
         # Step 2: Initialize Vector Store
         print("\n🔄 Initializing Vector Store...")
-        vector_store = VectorStore()
+        version = new_version()
+        vector_store = VectorStore(index_dir=version_dir(version))
 
         # Step 3: Load chunks
         print("\n📂 Loading cleaned chunks...")
@@ -49,21 +142,46 @@ def build_index():
         print("\n💾 Saving vector index to disk...")
         vector_store.save_index()
 
+        # Step 6: Point the manifest at it
+        publish(vector_store, version)
+
         print("\n" + "=" * 70)
         print("✅ VECTOR INDEX BUILT SUCCESSFULLY!")
         print("=" * 70)
-        print("\n📁 Index location: data/vector_db/index/")
+        print_cache_stats(vector_store)
+        print_lexical_stats(vector_store)
         print("\nNext step:")
         print("👉 Start the API and test the RAG pipeline")
 
     except Exception as e:
         print(f"\n❌ Error while building index: {str(e)}")
         print("\nPlease check:")
-        print("  - cleaned_chunks.json is valid JSON")
+        print("  - every line of the chunks file is valid JSON")
         print("  - 'text' field exists in each chunk")
         print("  - sentence-transformers & faiss are installed")
         print("  - You have write permissions")
 
 
 if __name__ == "__main__":
-    build_index()
+    parser = argparse.ArgumentParser(description="Build or update the vector index")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only embed new chunks and drop removed ones instead of rebuilding",
+    )
+    parser.add_argument(
+        "--activate", metavar="VERSION",
+        help="Publish an already built version again (rollback)",
+    )
+    args = parser.parse_args()
+
+    if args.activate:
+        try:
+            publish_version(args.activate)
+            print(f"🚀 Published index version {args.activate}")
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            print("Kept versions: " + ", ".join(v["version"] for v in list_versions()))
+    elif args.incremental:
+        update_index()
+    else:
+        build_index()
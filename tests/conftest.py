@@ -0,0 +1,125 @@
+"""
+Shared fakes for pipeline-level tests: a RAGPipeline wired to an in-memory
+store and a scripted LLM (no model, index or network)
+"""
+
+import sys
+import os
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.rag.rag_pipeline as rag_pipeline_module
+from app import config
+from app.registry import registry
+
+
+class FakeStore:
+    """The embed / search methods RAGPipeline calls, with call records"""
+
+    index_version = "v1"
+    dimension = 4
+
+    def __init__(self):
+        self.encode_calls = []
+        self.search_calls = []
+
+    def embed_queries(self, queries):
+        self.encode_calls.append(list(queries))
+        vectors = np.zeros((len(queries), self.dimension), dtype="float32")
+        vectors[:, 0] = 1.0
+        return vectors
+
+    def search_vectors(self, query_embeddings, top_k=3, queries=None, filters=None,
+                       with_vectors=False):
+        self.search_calls.append(list(queries or []))
+        return [
+            [{"text": f"Tip for {q}.", "metadata": {"grade": 2}, "score": 0.9}]
+            for q in queries
+        ]
+
+    def search_batch_with_embeddings(self, queries, top_k=3, filters=None, with_vectors=False):
+        embeddings = self.embed_queries(queries)
+        return embeddings, self.search_vectors(embeddings, top_k, queries, filters, with_vectors)
+
+
+class FakeLLM:
+    """
+    Answers with the prompt it was given (so tests can see what reached
+    it); prompts containing `fail_on` raise. Translations are tagged
+    with the target language.
+    """
+
+    def __init__(self, fail_on=None, delay=0.0):
+        self.fail_on = fail_on
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt):
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("upstream failed")
+        return f"ANSWER {prompt}"
+
+    def generate(self, prompt, temperature=0.3, max_tokens=450):
+        self.calls.append(("generate", prompt))
+        return self._answer(prompt)
+
+    def translate(self, text, target_language):
+        if target_language.lower() == "english":
+            return text
+        self.calls.append(("translate", target_language))
+        return f"[{target_language}] {text}"
+
+    async def agenerate(self, prompt, temperature=0.3, max_tokens=450):
+        self.calls.append(("generate", prompt))
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self._answer(prompt)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def atranslate(self, text, target_language):
+        return self.translate(text, target_language)
+
+    async def astream_generate(self, prompt, temperature=0.3, max_tokens=450):
+        self.calls.append(("generate", prompt))
+        answer = self._answer(prompt)
+        middle = len(answer) // 2
+        yield answer[:middle]
+        yield answer[middle:]
+
+    async def astream_translate(self, text, target_language):
+        translated = self.translate(text, target_language)
+        middle = len(translated) // 2
+        yield translated[:middle]
+        yield translated[middle:]
+
+
+@pytest.fixture
+def make_pipeline(monkeypatch):
+    """
+    make_pipeline(llm=None, store=None, semantic_cache=False) -> RAGPipeline
+    using the fakes above (reachable as pipeline.llm / pipeline.vector_store)
+    """
+
+    def make(llm=None, store=None, semantic_cache=False):
+        store = store or FakeStore()
+        llm = llm or FakeLLM()
+        monkeypatch.setattr(config, "EMBED_BATCH_WINDOW_MS", 0.0)
+        monkeypatch.setattr(config, "SEMANTIC_CACHE_ENABLED", semantic_cache)
+        monkeypatch.setattr(rag_pipeline_module, "get_vector_store", lambda: store)
+        monkeypatch.setattr(registry, "llm", lambda provider="groq": llm)
+        return rag_pipeline_module.RAGPipeline()
+
+    return make
@@ -0,0 +1,118 @@
+"""
+Tests for parallel multi-document ingestion and page checkpoints
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import config
+from app.ingestion.batch_ingest import WorkerStats, find_documents, iter_document_pages
+
+
+def fake_count(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return int(f.read())
+
+
+def fake_task(path, page_numbers):
+    pages = [
+        {"text": f"{os.path.basename(path)} page {n}",
+         "metadata": {"source": os.path.basename(path), "page": n}}
+        for n in page_numbers
+    ]
+    return {"pages": pages, "worker": os.getpid(), "seconds": 0.001}
+
+
+def flaky_task(path, page_numbers):
+    if 3 in page_numbers:
+        raise RuntimeError("OCR crashed")
+    return fake_task(path, page_numbers)
+
+
+def gated_task(path, page_numbers):
+    # The last page only finishes once the caller has its first page
+    if 8 in page_numbers:
+        deadline = time.monotonic() + 5
+        while not os.path.exists(path + ".go"):
+            if time.monotonic() > deadline:
+                raise RuntimeError("first page never handed out")
+            time.sleep(0.01)
+    return fake_task(path, page_numbers)
+
+
+def _make_docs(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "nested").mkdir(parents=True)
+    (docs / "a.pdf").write_text("6")
+    (docs / "nested" / "b.pdf").write_text("3")
+    (docs / "notes.txt").write_text("first page\fsecond page")
+    (docs / "ignored.docx").write_text("x")
+    return docs
+
+
+def _run(paths, tmp_path, task_fn, stats):
+    return list(iter_document_pages(
+        paths, workers=2, checkpoint_dir=str(tmp_path / "ckpt"), stats=stats,
+        count_fn=fake_count, task_fn=task_fn,
+    ))
+
+
+def test_documents_come_back_in_document_and_page_order(tmp_path):
+    paths = find_documents([str(_make_docs(tmp_path))])
+    assert [os.path.basename(p) for p in paths] == ["a.pdf", "b.pdf", "notes.txt"]
+
+    pages = _run(paths, tmp_path, fake_task, WorkerStats())
+
+    assert [(p["metadata"]["source"], p["metadata"]["page"]) for p in pages] == (
+        [("a.pdf", n) for n in range(1, 7)]
+        + [("b.pdf", n) for n in range(1, 4)]
+        + [("notes.txt", 1), ("notes.txt", 2)]
+    )
+    assert pages[-1]["text"] == "second page"
+
+
+def test_interrupted_run_resumes_from_checkpoint(tmp_path):
+    paths = find_documents([str(_make_docs(tmp_path))])
+
+    first = WorkerStats()
+    pages = _run(paths, tmp_path, flaky_task, first)
+    assert first.failed > 0
+    assert ("a.pdf", 3) not in [(p["metadata"]["source"], p["metadata"]["page"]) for p in pages]
+
+    second = WorkerStats()
+    pages = _run(paths, tmp_path, fake_task, second)
+    # Only the pages lost in the first run are extracted again
+    assert second.resumed == 9 - first.failed
+    assert sum(second.pages.values()) == first.failed
+    assert len(pages) == 11
+
+
+def test_pages_are_handed_out_before_the_document_finishes(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "INGEST_PAGES_PER_TASK", 1)
+    doc = tmp_path / "long.pdf"
+    doc.write_text("8")
+
+    pages = iter_document_pages(
+        [str(doc)], workers=2, checkpoint_dir=str(tmp_path / "ckpt"), stats=WorkerStats(),
+        count_fn=fake_count, task_fn=gated_task,
+    )
+    assert next(pages)["metadata"]["page"] == 1
+    (tmp_path / "long.pdf.go").write_text("")
+
+    assert [p["metadata"]["page"] for p in pages] == list(range(2, 9))
+
+
+def test_torn_checkpoint_line_is_dropped_on_resume(tmp_path):
+    paths = find_documents([str(_make_docs(tmp_path))])
+    _run(paths, tmp_path, flaky_task, WorkerStats())
+    for checkpoint in (tmp_path / "ckpt").iterdir():
+        with open(checkpoint, "a", encoding="utf-8") as f:
+            f.write('{"text": "half a pa')
+
+    assert len(_run(paths, tmp_path, fake_task, WorkerStats())) == 11
+    third = WorkerStats()
+    assert len(_run(paths, tmp_path, fake_task, third)) == 11
+    assert third.resumed == 9
@@ -0,0 +1,120 @@
+"""
+Tests for batch retrieval and batch chat (VectorStore.search_batch,
+RAGPipeline.query_batch / aquery_batch, POST /chat/batch)
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+import faiss
+import numpy as np
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import config
+from app.main import app
+from app.rag.rag_pipeline import CASUAL_ANSWER
+from app.registry import registry
+from app.retrieval.vector_store import VectorStore
+from conftest import FakeLLM
+
+
+QUERIES = [f"How do I teach topic {i} to my class?" for i in range(5)]
+
+
+class OneHotModel:
+    """'... topic <i> ...' embeds onto axis i"""
+
+    dimension = 8
+    encode_calls = 0
+
+    def encode(self, texts, batch_size=32):
+        OneHotModel.encode_calls += 1
+        vectors = np.zeros((len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate(texts):
+            vectors[row, int(text.split("topic ")[1].split()[0])] = 1.0
+        return vectors
+
+
+class CountingIndex:
+    def __init__(self, index):
+        self.index, self.d, self.search_calls = index, index.d, 0
+
+    def search(self, x, k, params=None):
+        self.search_calls += 1
+        return self.index.search(x, k, params=params)
+
+
+def test_search_batch_is_one_encode_and_one_search(tmp_path):
+    store = VectorStore(index_dir=str(tmp_path))
+    store._embedding_model = OneHotModel()
+    flat = faiss.IndexFlatIP(8)
+    flat.add(np.eye(8, dtype="float32"))
+    store.index = CountingIndex(flat)
+    store.chunks = [{"text": f"chunk about topic {i}"} for i in range(8)]
+    OneHotModel.encode_calls = 0
+
+    results = store.search_batch(QUERIES, top_k=1)
+
+    assert OneHotModel.encode_calls == 1
+    assert store.index.search_calls == 1
+    assert [r[0]["text"] for r in results] == [f"chunk about topic {i}" for i in range(5)]
+
+
+def test_query_batch_retrieves_once_and_keeps_positions(make_pipeline):
+    pipeline = make_pipeline()
+    queries = QUERIES[:2] + ["hello"] + QUERIES[2:]
+
+    results = dict(pipeline.query_batch(queries))
+
+    store = pipeline.vector_store
+    assert len(store.encode_calls) == 1 and len(store.search_calls) == 1
+    # The casual query is answered without retrieval
+    assert "hello" not in store.encode_calls[0]
+    assert results[2]["answer"] == CASUAL_ANSWER
+    for position, query in enumerate(queries):
+        if position != 2:
+            assert query in results[position]["answer"]
+
+
+def test_aquery_batch_tags_each_result_and_isolates_failures(make_pipeline):
+    pipeline = make_pipeline(llm=FakeLLM(fail_on="topic 3"))
+
+    async def collect():
+        return [item async for item in pipeline.aquery_batch(QUERIES)]
+
+    results = dict(asyncio.run(collect()))
+
+    assert sorted(results) == list(range(5))
+    assert results[3] == {"error": "upstream failed"}
+    for position in (0, 1, 2, 4):
+        assert QUERIES[position] in results[position]["answer"]
+
+
+def test_chat_batch_streams_ndjson_with_capped_concurrency(make_pipeline, monkeypatch):
+    llm = FakeLLM(fail_on="topic 1", delay=0.02)
+    pipeline = make_pipeline(llm=llm)
+
+    async def arag_pipeline():
+        return pipeline
+
+    monkeypatch.setattr(registry, "arag_pipeline", arag_pipeline)
+    monkeypatch.setattr(config, "BATCH_MAX_CONCURRENCY", 2)
+    client = TestClient(app)
+
+    response = client.post("/chat/batch", json={"queries": QUERIES, "concurrency": 8})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == list(range(5))
+    for line in lines:
+        assert line["query"] == QUERIES[line["index"]]
+        if line["index"] == 1:
+            assert line["error"] == "upstream failed"
+        else:
+            assert QUERIES[line["index"]] in line["answer"]
+    assert llm.max_in_flight == 2
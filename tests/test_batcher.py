@@ -0,0 +1,118 @@
+"""
+Tests for query micro-batching
+Uses a small in-memory FAISS index and a deterministic fake encoder
+"""
+
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.retrieval.batcher import QueryBatcher
+
+
+class FakeStore:
+    """Implements the embed_queries/search_vectors pair QueryBatcher uses"""
+
+    def __init__(self):
+        self.encode_calls = []
+        self.search_filters = []
+        self.lock = threading.Lock()
+        vectors = np.eye(4, dtype="float32")
+        self.index = faiss.IndexFlatIP(4)
+        self.index.add(vectors)
+
+    def embed_queries(self, queries):
+        with self.lock:
+            self.encode_calls.append(len(queries))
+        return np.stack([np.eye(4, dtype="float32")[int(q[1:]) % 4] for q in queries])
+
+    def search_vectors(self, embeddings, top_k, queries=None, filters=None, with_vectors=False):
+        self.search_filters.append(filters)
+        _, ids = self.index.search(embeddings, top_k)
+        return [[{"text": f"chunk-{i}"} for i in row] for row in ids]
+
+
+def test_concurrent_queries_share_encode_calls():
+    store = FakeStore()
+    batcher = QueryBatcher(store, window_ms=50, max_batch_size=16)
+
+    with ThreadPoolExecutor(16) as pool:
+        futures = list(pool.map(lambda i: batcher.submit(f"q{i}", 1), range(16)))
+        results = [f.result(timeout=5) for f in futures]
+
+    batcher.close()
+
+    assert sum(store.encode_calls) == 16
+    assert len(store.encode_calls) < 16
+    for i, (embedding, chunks) in enumerate(results):
+        assert embedding.shape == (1, 4)
+        assert chunks == [{"text": f"chunk-{i % 4}"}]
+
+
+def test_per_request_top_k_is_respected_and_errors_propagate():
+    store = FakeStore()
+    batcher = QueryBatcher(store, window_ms=20, max_batch_size=8)
+
+    small = batcher.submit("q1", 1)
+    large = batcher.submit("q2", 3)
+    assert len(small.result(timeout=5)[1]) == 1
+    assert len(large.result(timeout=5)[1]) == 3
+
+    def broken(queries):
+        raise RuntimeError("model crashed")
+
+    store.embed_queries = broken
+    failed = batcher.submit("q3", 1)
+    batcher.close()
+
+    try:
+        failed.result(timeout=5)
+        assert False, "expected the encoder error"
+    except RuntimeError as e:
+        assert "model crashed" in str(e)
+
+
+def test_queries_with_different_filters_share_the_encode():
+    store = FakeStore()
+    batcher = QueryBatcher(store, window_ms=50, max_batch_size=8)
+
+    futures = [
+        batcher.submit("q0", 1, {"grade": 6}),
+        batcher.submit("q1", 1, {"grade": "6"}),
+        batcher.submit("q2", 1),
+    ]
+    results = [f.result(timeout=5) for f in futures]
+    batcher.close()
+
+    assert store.encode_calls == [3]
+    assert sorted(map(str, store.search_filters)) == ["None", "{'grade': 6}"]
+    assert [chunks for _, chunks in results] == [
+        [{"text": "chunk-0"}], [{"text": "chunk-1"}], [{"text": "chunk-2"}]
+    ]
+
+
+def test_cancelled_waiter_does_not_stop_the_batcher():
+    import asyncio
+
+    store = FakeStore()
+    batcher = QueryBatcher(store, window_ms=50, max_batch_size=8)
+
+    async def cancel_one():
+        # What a client disconnect does to RAGPipeline._aembed_and_search
+        task = asyncio.ensure_future(asyncio.wrap_future(batcher.submit("q0", 1)))
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(cancel_one())
+    later = batcher.submit("q1", 1)
+
+    assert later.result(timeout=5)[1] == [{"text": "chunk-1"}]
+    assert batcher._worker.is_alive()
+    batcher.close()
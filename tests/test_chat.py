@@ -0,0 +1,137 @@
+"""
+Tests for the HTTP routes
+"""
+
+import sys
+import os
+import json
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.main import app
+from app.registry import registry
+from conftest import FakeLLM
+
+
+class FakePipeline:
+    def __init__(self):
+        self.calls = []
+
+    async def aretrieve(self, user_query, filters=None):
+        self.calls.append((user_query, filters))
+        return [{"text": "Use picture books.", "metadata": {"grade": 2}, "score": 0.8}]
+
+
+def test_search_returns_context_without_llm(monkeypatch):
+    pipeline = FakePipeline()
+
+    async def arag_pipeline():
+        return pipeline
+
+    monkeypatch.setattr(registry, "arag_pipeline", arag_pipeline)
+    client = TestClient(app)
+
+    response = client.post("/search", json={"query": "reading", "filters": {"grade": 2}})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"text": "Use picture books.", "metadata": {"grade": 2}, "score": 0.8}
+    ]
+    assert pipeline.calls == [("reading", {"grade": 2})]
+    assert client.post("/search", json={"query": "x", "filters": {"colour": "red"}}).status_code == 422
+
+
+def test_admin_reload_requires_the_token(monkeypatch):
+    from app import config
+
+    calls = []
+    monkeypatch.setattr(
+        registry, "reload_vector_store",
+        lambda force=False: calls.append(force) or {"reloaded": True, "index_version": "v2"},
+    )
+    client = TestClient(app)
+
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "")
+    assert client.post("/admin/reload").status_code == 404
+
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.post("/admin/reload?force=true", headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 200
+    assert response.json() == {"reloaded": True, "index_version": "v2"}
+    assert calls == [True]
+
+
+def _events(response):
+    """Parse an SSE body, checking each frame is event + data + blank line"""
+    assert response.text.endswith("\n\n")
+    events = []
+    for frame in response.text[:-2].split("\n\n"):
+        event_line, data_line = frame.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+def _stream_client(monkeypatch, pipeline):
+    async def arag_pipeline():
+        return pipeline
+
+    monkeypatch.setattr(registry, "arag_pipeline", arag_pipeline)
+    return TestClient(app)
+
+
+def test_chat_stream_sends_tokens_then_sources_then_done(make_pipeline, monkeypatch):
+    client = _stream_client(monkeypatch, make_pipeline())
+
+    response = client.post(
+        "/chat/stream",
+        json={"query": "How do I teach fractions?", "return_sources": True},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response)
+    kinds = [kind for kind, _ in events]
+    assert kinds == ["token", "token", "sources", "done"]
+    answer = "".join(data["text"] for kind, data in events if kind == "token")
+    assert answer.startswith("ANSWER") and "How do I teach fractions?" in answer
+    assert events[2][1]["sources"][0]["metadata"] == {"grade": 2}
+
+
+def test_chat_stream_translates_non_english_answers(make_pipeline, monkeypatch):
+    pipeline = make_pipeline()
+    client = _stream_client(monkeypatch, pipeline)
+
+    events = _events(client.post(
+        "/chat/stream", json={"query": "How do I teach fractions?", "language": "Hindi"}
+    ))
+
+    answer = "".join(data["text"] for kind, data in events if kind == "token")
+    assert answer.startswith("[Hindi] ANSWER")
+    assert [kind for kind, _ in pipeline.llm.calls] == ["generate", "translate"]
+    assert events[-1] == ("done", {})
+
+
+def test_chat_stream_serves_cache_hits(make_pipeline, monkeypatch):
+    pipeline = make_pipeline(semantic_cache=True)
+    client = _stream_client(monkeypatch, pipeline)
+    body = {"query": "How do I teach fractions?", "return_sources": True}
+
+    first = _events(client.post("/chat/stream", json=body))
+    second = _events(client.post("/chat/stream", json=body))
+
+    assert len(pipeline.llm.calls) == 1
+    assert [kind for kind, _ in second] == ["token", "sources", "done"]
+    assert second[0][1]["text"] == "".join(d["text"] for k, d in first if k == "token")
+
+
+def test_chat_stream_reports_pipeline_errors(make_pipeline, monkeypatch):
+    client = _stream_client(monkeypatch, make_pipeline(llm=FakeLLM(fail_on="fractions")))
+
+    events = _events(client.post("/chat/stream", json={"query": "How do I teach fractions?"}))
+
+    assert events == [("error", {"detail": "upstream failed"})]
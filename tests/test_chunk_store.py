@@ -0,0 +1,41 @@
+"""
+Tests for the memory-mapped chunk store
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.retrieval.chunk_store import ChunkStore, write_chunk_store
+
+
+def test_round_trip_with_interned_metadata(tmp_path):
+    meta = {"source": "NCERT", "category": "pedagogy", "language": "English"}
+    chunks = [
+        {"text": "Use stories to teach fractions.", "metadata": meta},
+        {"content": "ಕನ್ನಡ ಪಠ್ಯ ಉದಾಹರಣೆ", "metadata": {"language": "Kannada"}},
+        {"text": "", "metadata": meta},
+    ]
+
+    write_chunk_store(chunks, str(tmp_path))
+    store = ChunkStore(str(tmp_path))
+
+    assert len(store) == 3
+    assert store[0] == {"text": "Use stories to teach fractions.", "metadata": meta}
+    assert store[1]["text"] == "ಕನ್ನಡ ಪಠ್ಯ ಉದಾಹರಣೆ"
+    assert store[-1]["text"] == ""
+    assert [c["metadata"] for c in store] == [meta, {"language": "Kannada"}, meta]
+    assert len(store._meta_table) == 2
+
+    # Returned metadata must not alias the shared interned table
+    store[0]["metadata"]["source"] = "changed"
+    assert store[0]["metadata"]["source"] == "NCERT"
+    store.close()
+
+
+def test_empty_store(tmp_path):
+    write_chunk_store([], str(tmp_path))
+    store = ChunkStore(str(tmp_path))
+    assert len(store) == 0
+    assert list(store) == []
@@ -0,0 +1,94 @@
+"""
+Tests for the sentence- and token-aware chunker
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingestion.chunker import Chunker, approximate_token_count, chunk_text
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def _chunker(max_tokens=12, overlap_tokens=0):
+    # budget = max_tokens - 2 special tokens
+    return Chunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens,
+                   count_tokens=count_words)
+
+
+def _page(text, page=1, source="a.pdf", **metadata):
+    return {"text": text, "metadata": {"source": source, "page": page, **metadata}}
+
+
+def test_chunks_pack_whole_sentences_within_budget():
+    text = "One two three. Four five six. Seven eight nine ten. Eleven twelve."
+    chunks = list(_chunker(max_tokens=11).iter_chunks([_page(text)]))
+
+    assert [c["text"] for c in chunks] == [
+        "One two three. Four five six.",
+        "Seven eight nine ten. Eleven twelve.",
+    ]
+    assert all(count_words(c["text"]) <= 9 for c in chunks)
+
+
+def test_overlong_sentence_is_split_by_words():
+    text = " ".join(f"w{i}" for i in range(25)) + "."
+    chunks = chunk_text(text, max_tokens=12, overlap_tokens=0, count_tokens=count_words)
+
+    assert [count_words(c["text"]) for c in chunks] == [10, 10, 5]
+
+
+def test_overlap_repeats_trailing_sentences():
+    text = "A b c. D e f. G h i. J k l."
+    chunks = list(_chunker(max_tokens=8, overlap_tokens=3).iter_chunks([_page(text)]))
+
+    assert [c["text"] for c in chunks] == ["A b c. D e f.", "D e f. G h i.", "G h i. J k l."]
+
+
+def test_sections_and_documents_start_new_chunks():
+    pages = [
+        _page("Intro text here. Chapter 2 Methods start here."),
+        _page("Other document.", source="b.pdf"),
+    ]
+    chunks = list(_chunker(max_tokens=40, overlap_tokens=5).iter_chunks(pages))
+
+    assert [c["text"] for c in chunks] == [
+        "Intro text here.",
+        "Chapter 2 Methods start here.",
+        "Other document.",
+    ]
+
+
+def test_measurements_are_not_section_headings():
+    pages = [_page("Mix the flour well. 2.5 kg of rice is enough. "
+                   "1.2 Sharing Food comes next. UNIT iv is a review.")]
+    chunks = list(_chunker(max_tokens=40).iter_chunks(pages))
+
+    assert [c["text"] for c in chunks] == [
+        "Mix the flour well. 2.5 kg of rice is enough.",
+        "1.2 Sharing Food comes next.",
+        "UNIT iv is a review.",
+    ]
+
+
+def test_metadata_comes_from_pages():
+    pages = [
+        _page("First page sentence.", page=3, language="Hindi", grade=6, ocr=True),
+        _page("Second page sentence.", page=4, language="Hindi", grade=6, ocr=False),
+    ]
+    chunks = list(_chunker(max_tokens=40).iter_chunks(pages))
+
+    assert chunks == [{
+        "text": "First page sentence. Second page sentence.",
+        "metadata": {"source": "a.pdf", "page": 3, "page_end": 4,
+                     "language": "Hindi", "grade": 6},
+    }]
+
+
+def test_approximate_count_errs_high():
+    assert approximate_token_count("Teachers, students.") >= 4
+    assert approximate_token_count("internationalization") > 1
@@ -0,0 +1,74 @@
+"""
+Tests for context assembly: MMR reranking and token-budget packing
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rag.context_builder import ContextBuilder, mmr_order
+
+
+def _words(text):
+    return len(text.split())
+
+
+def _unit(*values):
+    v = np.array(values, dtype="float32")
+    return v / np.linalg.norm(v)
+
+
+def test_mmr_skips_near_duplicates():
+    vectors = np.stack([_unit(1, 0, 0), _unit(1, 0.01, 0), _unit(0.6, 0.8, 0)])
+    relevance = np.array([1.0, 0.99, 0.8], dtype="float32")
+
+    assert mmr_order(vectors, relevance, 2, 1.0) == [0, 1]
+    assert mmr_order(vectors, relevance, 2, 0.5) == [0, 2]
+
+
+def test_rerank_keeps_retrieval_order_without_vectors():
+    builder = ContextBuilder(max_chunks=3, max_tokens=100, mmr_lambda=0.5, count_tokens=_words)
+    candidates = [{"text": "a", "score": 0.9}, {"text": "b", "score": 0.8}]
+
+    assert builder.rerank(candidates) == candidates
+
+
+def test_pack_respects_budget_and_cuts_at_sentence_boundary():
+    builder = ContextBuilder(max_chunks=5, max_tokens=14, mmr_lambda=1.0, count_tokens=_words)
+    chunks = [
+        {"text": "One two three four five.", "vector": np.zeros(3)},
+        {"text": "Six seven. Eight nine ten. Eleven twelve thirteen.", "vector": np.zeros(3)},
+        {"text": "Never reached."},
+    ]
+
+    packed, used = builder.pack(chunks)
+
+    # 2 header tokens + 5, then 2 header tokens + the sentences that fit
+    assert [c["text"] for c in packed] == ["One two three four five.", "Six seven. Eight nine ten."]
+    assert packed[1]["trimmed"] is True
+    assert used == 14
+    assert all("vector" not in c for c in packed)
+
+
+def test_pack_cuts_an_overlong_first_sentence_instead_of_dropping_it():
+    builder = ContextBuilder(max_chunks=5, max_tokens=6, mmr_lambda=1.0, count_tokens=_words)
+    chunks = [
+        {"text": "One two three four five six seven eight. Nine."},
+        {"text": "Short one."},
+    ]
+
+    packed, used = builder.pack(chunks)
+
+    assert [c["text"] for c in packed] == ["One two three four"]
+    assert packed[0]["trimmed"] is True
+    assert used == 6
+
+
+def test_pack_stops_at_max_chunks():
+    builder = ContextBuilder(max_chunks=2, max_tokens=1000, mmr_lambda=1.0, count_tokens=_words)
+    packed, _ = builder.pack([{"text": f"chunk {i}."} for i in range(5)])
+
+    assert len(packed) == 2
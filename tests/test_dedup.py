@@ -0,0 +1,66 @@
+"""
+Tests for MinHash/LSH near-duplicate chunk removal
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingestion.dedup import choose_bands, dedup_chunks, dedup_jsonl
+from app.ingestion.pipeline import read_jsonl, write_jsonl
+
+
+def _corpus(n=300, words=60, seed=0):
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(3000)]
+    return [" ".join(rng.choice(vocab) for _ in range(words)) for _ in range(n)]
+
+
+def _chunks():
+    texts = _corpus()
+    chunks = [{"text": t, "metadata": {"source": "module1.pdf", "page": i}}
+              for i, t in enumerate(texts)]
+
+    # A later edition repeats every tenth paragraph with one word changed
+    for i in range(0, len(texts), 10):
+        words = texts[i].split()
+        words[30] = "changed"
+        chunks.append({"text": " ".join(words),
+                       "metadata": {"source": "module2.pdf", "page": i}})
+    return chunks
+
+
+def test_choose_bands_stays_below_threshold():
+    bands, rows = choose_bands(128, 0.85)
+    assert bands * rows <= 128
+    assert (1 / bands) ** (1 / rows) <= 0.85
+
+
+def test_near_duplicates_merge_into_first_occurrence():
+    chunks = _chunks()
+    kept, report = dedup_chunks(chunks, threshold=0.8)
+
+    assert report.chunks_in == 330
+    assert report.chunks_out == len(kept) == 300
+    assert abs(report.ratio - 30 / 330) < 1e-9
+    assert report.bytes_removed > 0
+    assert [c["text"] for c in kept] == [c["text"] for c in chunks[:300]]
+    assert kept[10]["metadata"] == {
+        "source": "module1.pdf", "page": 10,
+        "also_in": [{"source": "module2.pdf", "page": 10}],
+    }
+    assert "also_in" not in kept[11]["metadata"]
+
+
+def test_jsonl_dedup_matches_in_memory(tmp_path):
+    chunks = _chunks()
+    src, out = str(tmp_path / "raw.jsonl"), str(tmp_path / "chunks.jsonl")
+    write_jsonl(chunks, src)
+
+    report = dedup_jsonl(src, out, threshold=0.8)
+
+    assert list(read_jsonl(out)) == dedup_chunks(chunks, threshold=0.8)[0]
+    assert report.removed == 30
+    assert sorted(os.listdir(tmp_path)) == ["chunks.jsonl", "raw.jsonl"]
@@ -0,0 +1,138 @@
+"""
+Tests for the embedding backends (ONNX Runtime vs sentence-transformers)
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.retrieval.embedding_backend import (
+    MANIFEST_FILE,
+    MIN_COSINE,
+    TOKENIZER_FILE,
+    EmbeddingBackend,
+    OnnxBackend,
+    mean_pool,
+    onnx_model_dir,
+)
+
+
+WORDS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "reading", "maths", "class", "games", "story"]
+MAX_LENGTH = 5
+
+
+@pytest.fixture
+def tiny_export(tmp_path):
+    """Export-layout directory whose 'transformer' is an embedding lookup"""
+    onnx = pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    tokenizers = pytest.importorskip("tokenizers")
+    from onnx import TensorProto, helper, numpy_helper
+
+    table = np.random.default_rng(0).normal(size=(len(WORDS), 4)).astype(np.float32)
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["table", "input_ids"], ["last_hidden_state"])],
+        "tiny",
+        [
+            helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "sequence"]),
+            helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "sequence"]),
+        ],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, None)],
+        [numpy_helper.from_array(table, "table")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 14)])
+    model.ir_version = 8
+    onnx.save(model, str(tmp_path / "model.onnx"))
+
+    tokenizer = tokenizers.Tokenizer(
+        tokenizers.models.WordLevel({w: i for i, w in enumerate(WORDS)}, unk_token="[UNK]")
+    )
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer.post_processor = tokenizers.processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)]
+    )
+    tokenizer.save(str(tmp_path / TOKENIZER_FILE))
+
+    (tmp_path / MANIFEST_FILE).write_text(json.dumps({
+        "model_name": "tiny",
+        "dimension": 4,
+        "max_seq_length": MAX_LENGTH,
+        "pooling": "mean",
+        "pad_token": "[PAD]",
+        "model_file": "model.onnx",
+        "int8_file": None,
+    }))
+    return tmp_path, table
+
+
+def test_mean_pool_ignores_padding():
+    hidden = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+
+    np.testing.assert_allclose(mean_pool(hidden, mask), [[2.0, 3.0]])
+
+
+def test_onnx_backend_pools_real_tokens_in_input_order(tiny_export):
+    model_dir, table = tiny_export
+    backend = OnnxBackend(str(model_dir), threads=1)
+    texts = ["story", "reading maths class games story", "maths", "class games"]
+
+    vectors = backend.encode(texts, batch_size=2)
+
+    for text, vector in zip(texts, vectors):
+        # [CLS] words [SEP], truncated to the model's max length
+        ids = ([2] + [WORDS.index(w) for w in text.split()])[:MAX_LENGTH - 1] + [3]
+        np.testing.assert_allclose(vector, table[ids].mean(axis=0), rtol=1e-5)
+    # Padding inside a batch does not change a text's vector
+    np.testing.assert_allclose(vectors[2], backend.encode(["maths"])[0], rtol=1e-5)
+
+
+def test_cache_key_separates_variants(tiny_export):
+    class TorchLike(EmbeddingBackend):
+        model_name, variant = "tiny", "torch"
+
+        def encode(self, texts, batch_size=32):
+            return np.zeros((len(texts), 4), dtype="float32")
+
+    assert TorchLike().cache_key == "tiny"
+    assert OnnxBackend(str(tiny_export[0])).cache_key == "tiny@onnx"
+
+
+def test_backend_without_encode_fails_when_created():
+    class Incomplete(EmbeddingBackend):
+        model_name, variant = "tiny", "torch"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_onnx_export_matches_sentence_transformers():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("sentence_transformers")
+    model_dir = onnx_model_dir()
+    if not os.path.exists(os.path.join(model_dir, MANIFEST_FILE)):
+        pytest.skip("No ONNX export; run scripts/export_onnx.py")
+
+    from app.retrieval.embedding_backend import SentenceTransformerBackend
+
+    texts = [
+        "How can I help students who are struggling with reading?",
+        "Ways to build foundational numeracy in early grades",
+        "बच्चों को गणित कैसे पढ़ाएं?",
+    ]
+    expected = SentenceTransformerBackend(OnnxBackend(model_dir).model_name).encode(texts)
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+
+    for quantized in (False, True):
+        try:
+            backend = OnnxBackend(model_dir, quantized=quantized)
+        except FileNotFoundError:
+            continue
+        vectors = backend.encode(texts)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        assert (vectors * expected).sum(axis=1).min() >= MIN_COSINE[backend.variant]
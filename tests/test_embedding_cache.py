@@ -0,0 +1,79 @@
+"""
+Tests for the on-disk embedding cache
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.retrieval.embedding_cache import EmbeddingCache
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, texts):
+        self.seen.append(list(texts))
+        return np.array([[len(t), 1.0, 0.0, 0.5] for t in texts], dtype="float32")
+
+
+def test_only_misses_are_encoded_and_cache_persists(tmp_path):
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(str(tmp_path), "model/a", dimension=4, dtype="float32")
+
+    first = cache.encode(["a", "ccc", "bb", "a"], encoder, batch_size=2)
+    # Deduplicated, longest first, in batches of two
+    assert encoder.seen == [["ccc", "bb"], ["a"]]
+    assert first[:, 0].tolist() == [1, 3, 2, 1]
+
+    reopened = EmbeddingCache(str(tmp_path), "model/a", dimension=4, dtype="float32")
+    second = reopened.encode(["bb", "dddd"], encoder)
+
+    assert encoder.seen[-1] == ["dddd"]
+    assert second[:, 0].tolist() == [2, 4]
+    assert reopened.stats()["hits"] == 1
+    assert reopened.stats()["seconds_saved"] is not None
+
+
+def test_models_do_not_share_vectors(tmp_path):
+    encoder = CountingEncoder()
+    EmbeddingCache(str(tmp_path), "model-a", 4).encode(["x"], encoder)
+    EmbeddingCache(str(tmp_path), "model-b", 4).encode(["x"], encoder)
+    assert len(encoder.seen) == 2
+
+
+def test_partial_write_is_ignored(tmp_path):
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(str(tmp_path), "m", dimension=4, dtype="float16")
+    cache.encode(["one", "two"], encoder)
+
+    # Simulate a crash after vectors were appended but before keys were
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.zeros(4, dtype="float16").tobytes())
+
+    reopened = EmbeddingCache(str(tmp_path), "m", dimension=4, dtype="float16")
+    assert len(reopened) == 2
+    result = reopened.encode(["two", "three"], encoder)
+    assert result[:, 0].tolist() == [3, 5]
+
+
+def test_switching_dtype_back_and_forth_keeps_rows_apart(tmp_path):
+    encoder = CountingEncoder()
+    EmbeddingCache(str(tmp_path), "m", 4, dtype="float16").encode(["a", "bb"], encoder)
+    EmbeddingCache(str(tmp_path), "m", 4, dtype="float32").encode(["ccc", "dddd"], encoder)
+
+    half = EmbeddingCache(str(tmp_path), "m", 4, dtype="float16")
+    result = half.encode(["a", "bb", "ccc", "dddd"], encoder)
+
+    # Each text gets its own vector; float32-only texts are encoded anew
+    assert result[:, 0].tolist() == [1, 2, 3, 4]
+    assert encoder.seen[-1] == ["dddd", "ccc"]
+    assert half.meta["dtype"] == "float16"
+
+    full = EmbeddingCache(str(tmp_path), "m", 4, dtype="float32")
+    assert full.encode(["ccc", "dddd"], encoder)[:, 0].tolist() == [3, 4]
+    assert full.stats()["hits"] == 2
@@ -0,0 +1,75 @@
+"""
+Tests for choosing between direct (single-call) generation in the target
+language and generate-in-English-then-translate
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import config
+from app.rag.prompt import get_user_prompt_in_language
+from app.utils.metrics import metrics
+
+
+QUERY = "How can I help students who struggle with reading?"
+
+
+@pytest.fixture
+def direct_kannada(monkeypatch):
+    monkeypatch.setattr(config, "DIRECT_GENERATION_LANGUAGES", {"kannada"})
+
+
+def test_direct_generation_is_opt_in(make_pipeline):
+    assert config.DIRECT_GENERATION_LANGUAGES == set()
+    assert make_pipeline().generation_mode("Kannada") == "translate"
+
+
+def test_direct_language_makes_one_generate_call(make_pipeline, direct_kannada):
+    metrics.reset()
+    pipeline = make_pipeline()
+
+    response = pipeline.query(QUERY, language="Kannada")
+
+    kinds = [kind for kind, _ in pipeline.llm.calls]
+    assert kinds == ["generate"]
+    assert "Write the ENTIRE response in Kannada" in pipeline.llm.calls[0][1]
+    assert response["answer"].startswith("ANSWER")
+    assert metrics.snapshot()["latency"]["rag.answer_ms.direct"]["count"] == 1
+
+
+def test_async_and_stream_use_direct_mode_too(make_pipeline, direct_kannada):
+    pipeline = make_pipeline()
+
+    async def run():
+        await pipeline.aquery(QUERY, language="Kannada")
+        return [event async for event, _ in pipeline.astream(QUERY + " again", language="Kannada")]
+
+    events = asyncio.run(run())
+
+    assert [kind for kind, _ in pipeline.llm.calls] == ["generate", "generate"]
+    assert events[-1] == "done"
+
+
+@pytest.mark.parametrize("language,calls", [
+    ("English", ["generate"]),
+    ("Hindi", ["generate", "translate"]),
+])
+def test_other_languages_keep_their_path(make_pipeline, direct_kannada, language, calls):
+    pipeline = make_pipeline()
+
+    pipeline.query(QUERY, language=language)
+
+    assert [kind for kind, _ in pipeline.llm.calls] == calls
+    assert "Write the ENTIRE response" not in pipeline.llm.calls[0][1]
+
+
+def test_direct_prompt_names_the_target_language():
+    prompt = get_user_prompt_in_language(QUERY, "Use picture books.", "Hindi")
+
+    assert QUERY in prompt and "Use picture books." in prompt
+    assert prompt.endswith("Response (in Hindi):")
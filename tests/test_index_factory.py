@@ -0,0 +1,149 @@
+"""
+Tests for the FAISS index factory
+"""
+
+import sys
+import os
+
+import faiss
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.retrieval.index_factory import (
+    INDEX_TYPES,
+    apply_search_params,
+    build_index,
+    index_memory_bytes,
+    read_index,
+    remove_ids,
+    rescore_candidates,
+)
+
+
+def _vectors(n=2000, d=32, seed=0):
+    x = np.random.default_rng(seed).standard_normal((n, d)).astype("float32")
+    faiss.normalize_L2(x)
+    return x
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_every_type_finds_exact_matches(index_type):
+    x = _vectors()
+    index, _ = build_index(x, index_type, {"nprobe": 16, "pq_m": 8})
+    _, ids = index.search(x[:20], 1)
+
+    # PQ is lossy; the others should return the query vector itself
+    expected = 0.5 if index_type == "ivf_pq" else 0.95
+    assert (ids[:, 0] == np.arange(20)).mean() >= expected
+
+
+def test_params_are_clamped_to_corpus_size():
+    _, params = build_index(_vectors(n=200), "ivf_pq", {"nlist": 1024, "pq_m": 7})
+    assert params["nlist"] == 200 // 39
+    assert 32 % params["pq_m"] == 0
+
+
+def test_search_params_reach_wrapped_indexes():
+    x = _vectors()
+    ivf, _ = build_index(x, "ivf_flat")
+    ivf.reset()  # ID maps can only wrap empty indexes
+    wrapped = faiss.IndexIDMap2(ivf)
+    apply_search_params(wrapped, {"nprobe": 5})
+    assert faiss.extract_index_ivf(ivf).nprobe == 5
+
+    hnsw, _ = build_index(x, "hnsw")
+    hnsw.reset()
+    apply_search_params(faiss.IndexIDMap2(hnsw), {"ef_search": 99})
+    assert hnsw.hnsw.efSearch == 99
+
+    with pytest.raises(ValueError):
+        build_index(x, "annoy")
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_add_and_remove_by_stable_id(index_type):
+    x = _vectors()
+    ids = np.arange(len(x), dtype="int64") * 1_000_003 + 17
+    index, _ = build_index(x[:-1], index_type, {"nprobe": 64, "pq_m": 8}, ids=ids[:-1])
+
+    index = remove_ids(index, ids[:5])
+    index.add_with_ids(x[-1:], ids[-1:])
+
+    assert index.ntotal == len(x) - 5
+    _, found = index.search(x[[5, 6, len(x) - 1]], 1)
+    if index_type != "ivf_pq":
+        assert found[:, 0].tolist() == [ids[5], ids[6], ids[-1]]
+    assert not set(ids[:5]) & set(index.search(x[:5], 1)[1][:, 0])
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "hnsw"])
+def test_quantized_indexes_are_smaller_and_removable(index_type):
+    x = _vectors()
+    ids = np.arange(len(x), dtype="int64") * 11
+    sizes = {}
+    for quantization in ("float32", "float16", "int8"):
+        index, params = build_index(x, index_type, {"quantization": quantization}, ids=ids)
+        assert params["quantization"] == quantization
+        sizes[quantization] = index_memory_bytes(index)
+
+        index = remove_ids(index, ids[:5])
+        assert index.ntotal == len(x) - 5
+
+    assert sizes["int8"] < sizes["float16"] < sizes["float32"]
+
+
+def test_hnsw_rebuild_takes_vectors_from_the_caller():
+    x = _vectors(n=200)
+    ids = np.arange(len(x), dtype="int64") * 11
+    index, _ = build_index(x, "hnsw", {"quantization": "int8"}, ids=ids)
+    # Stand-in for the full-precision rows: anything the codes cannot produce
+    full = _vectors(n=200, seed=1)
+
+    index = remove_ids(index, ids[:5], vectors_of=lambda keep: full[keep // 11])
+
+    assert index.ntotal == len(x) - 5
+    _, found = index.search(full[[10, 20]], 1)
+    assert found[:, 0].tolist() == [ids[10], ids[20]]
+
+
+def test_ivf_pq_reports_pq_quantization():
+    _, params = build_index(_vectors(), "ivf_pq", {"quantization": "int8", "pq_m": 8})
+    assert params["quantization"] == "pq"
+
+
+def test_rescoring_restores_exact_ranking():
+    x = _vectors()
+    queries = x[:10] + 0.05 * _vectors(n=10, seed=1)
+    exact = (queries @ x.T).argsort(axis=1)[:, ::-1][:, :5]
+
+    index, _ = build_index(x, "flat", {"quantization": "int8"})
+    _, candidates = index.search(queries, 20)
+    candidates[:, -1] = -1  # padding from short result lists is ignored
+
+    scores, rows = rescore_candidates(queries, candidates, x, 5)
+
+    assert (rows == exact).all()
+    assert np.allclose(scores, np.take_along_axis(queries @ x.T, exact, axis=1), atol=1e-5)
+
+
+@pytest.mark.parametrize("index_type,quantization", [
+    ("flat", "float32"), ("flat", "int8"), ("ivf_flat", "float32"), ("ivf_pq", None), ("hnsw", "float16"),
+])
+def test_mmapped_index_matches_and_survives_file_replacement(tmp_path, index_type, quantization):
+    x = _vectors()
+    params = {"nprobe": 16, "pq_m": 8, **({"quantization": quantization} if quantization else {})}
+    index, _ = build_index(x, index_type, params, ids=np.arange(len(x)) + 100)
+    path = str(tmp_path / "faiss.index")
+    faiss.write_index(index, path)
+
+    mapped = read_index(path, index_type, mmap=True)
+    apply_search_params(mapped, params)
+    expected = index.search(x[:10], 5)
+
+    # A new build is renamed over the file while the old one is mapped
+    faiss.write_index(build_index(x[:100], "flat")[0], path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+    np.testing.assert_array_equal(mapped.search(x[:10], 5)[1], expected[1])
@@ -0,0 +1,162 @@
+"""
+Tests for versioned indexes and hot-reloading the serving vector store
+Builds small real indexes with a deterministic fake embedding model
+"""
+
+import sys
+import os
+import json
+import threading
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.registry as registry_module
+from app import config
+from app.registry import Registry
+from app.retrieval.index_versions import (
+    current_index_dir,
+    current_version,
+    list_versions,
+    new_version,
+    publish_version,
+    version_dir,
+)
+from app.retrieval.vector_store import VectorStore
+
+
+class HashModel:
+    """Same text -> same unit vector; no model download"""
+
+    model_name, variant, cache_key, dimension = "reload-test-model", "test", "reload-test", 16
+
+    def encode(self, texts, batch_size=32):
+        return np.stack([
+            np.random.default_rng(zlib.crc32(t.encode())).standard_normal(self.dimension)
+            for t in texts
+        ]).astype("float32")
+
+
+@pytest.fixture
+def index_root(monkeypatch, tmp_path):
+    root = tmp_path / "vector_db"
+    root.mkdir()
+    monkeypatch.setattr(config, "INDEX_ROOT", str(root))
+    monkeypatch.setattr(config, "EMBEDDING_MODEL", HashModel.model_name)
+    monkeypatch.setattr(config, "EMBEDDING_CACHE_DIR", "")
+    monkeypatch.setattr(config, "INDEX_MMAP", True)
+    monkeypatch.setattr(
+        registry_module, "_load_embedding_model", lambda name, backend: HashModel()
+    )
+    return root
+
+
+def _publish(root, texts):
+    chunks_file = root / f"chunks-{len(list_versions())}.jsonl"
+    chunks_file.write_text(
+        "\n".join(json.dumps({"text": t, "metadata": {"grade": 1}}) for t in texts)
+    )
+    version = new_version()
+    store = VectorStore(chunks_file=str(chunks_file), index_dir=version_dir(version))
+    store.load_chunks()
+    store.create_embeddings()
+    store.save_index()
+    publish_version(version)
+    return version
+
+
+def test_publish_prunes_old_versions_and_rolls_back(index_root, monkeypatch):
+    monkeypatch.setattr(config, "INDEX_KEEP_VERSIONS", 2)
+    assert current_index_dir() == os.path.join(str(index_root), "index")
+
+    for version in ("v0", "v1", "v2"):
+        os.makedirs(version_dir(version))
+        publish_version(version)
+
+    assert current_version() == "v2"
+    assert [v["version"] for v in list_versions()] == ["v1", "v2"]
+    assert not os.path.exists(version_dir("v0"))
+
+    publish_version("v1")
+    assert current_index_dir() == version_dir("v1")
+    with pytest.raises(FileNotFoundError):
+        publish_version("v0")
+
+
+def test_reload_under_load_drops_no_requests(index_root, monkeypatch):
+    _publish(index_root, [f"old lesson {i}" for i in range(20)])
+    registry = Registry()
+    old_store = registry.vector_store()
+
+    # Make the new version slow to load: searches must not wait for it
+    open_store = registry_module._open_vector_store
+
+    def slow_open(index_dir=None):
+        time.sleep(0.5)
+        return open_store(index_dir)
+
+    monkeypatch.setattr(registry_module, "_open_vector_store", slow_open)
+
+    stop = threading.Event()
+    errors, latencies, seen = [], [], []
+    lock = threading.Lock()
+
+    def client(n):
+        i = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                results = registry.vector_store().search(f"lesson {n}-{i}", top_k=2)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                seen.append(results[0]["text"].split()[0])
+            i += 1
+
+    clients = [threading.Thread(target=client, args=(n,)) for n in range(4)]
+    for thread in clients:
+        thread.start()
+
+    time.sleep(0.1)
+    _publish(index_root, [f"new lesson {i}" for i in range(30)])
+    result = registry.reload_vector_store()
+    time.sleep(0.1)
+    stop.set()
+    for thread in clients:
+        thread.join()
+
+    assert result["reloaded"] and result["chunks"] == 30
+    assert errors == []
+    # Nothing queued behind the 0.5s load
+    assert max(latencies) < 0.25
+    assert seen[0] == "old" and seen[-1] == "new"
+    assert registry.status()["last_index_reload"]["index_dir"] == current_index_dir()
+
+    # A search holding the old store still finishes on it
+    assert old_store.search("lesson", top_k=1)[0]["text"].startswith("old")
+    assert registry.reload_vector_store()["reloaded"] is False
+
+
+def test_watcher_picks_up_a_published_version(index_root):
+    _publish(index_root, ["old lesson"])
+    registry = Registry()
+    registry.vector_store()
+    registry.start_index_watcher(interval=0.02)
+
+    try:
+        _publish(index_root, ["new lesson"])
+        deadline = time.monotonic() + 5
+        while registry.vector_store().index_dir != current_index_dir():
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+    finally:
+        registry._watcher_stop.set()
+
+    assert registry.vector_store().search("lesson", top_k=1)[0]["text"] == "new lesson"
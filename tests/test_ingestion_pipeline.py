@@ -0,0 +1,56 @@
+"""
+Tests for the streaming ingestion stages
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingestion.chunker import iter_chunks
+from app.ingestion.pipeline import ChunkFile, StageMeter, read_jsonl, write_jsonl
+from app.ingestion.text_cleaner import clean_pages
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def _pages(n_pages, words_per_page):
+    for p in range(n_pages):
+        text = " ".join(f"w{p}_{i}." for i in range(words_per_page))
+        yield {"text": text, "metadata": {"source": "doc.txt", "page": p + 1}}
+
+
+def test_clean_pages_drops_empty_pages():
+    pages = [{"text": "  42  ", "metadata": {}}, {"text": "a   b", "metadata": {"page": 2}}]
+
+    assert list(clean_pages(pages)) == [{"text": "a b", "metadata": {"page": 2}}]
+
+
+def test_jsonl_round_trip_is_lazy_and_reiterable(tmp_path):
+    path = str(tmp_path / "chunks.jsonl")
+    chunks = list(iter_chunks(_pages(3, 40), max_tokens=27, overlap_tokens=0,
+                              count_tokens=count_words))
+
+    assert write_jsonl(iter(chunks), path) == len(chunks)
+    assert not os.path.exists(path + ".tmp")
+    assert list(read_jsonl(path)) == chunks
+
+    chunk_file = ChunkFile(path)
+    assert list(chunk_file) == chunks
+    assert list(chunk_file) == chunks
+
+
+def test_stage_meter_reports_stages_in_pipeline_order():
+    meter = StageMeter()
+    pages = meter.wrap("load", _pages(4, 20))
+    chunks = meter.wrap("chunk", iter_chunks(pages, max_tokens=12, overlap_tokens=0,
+                                                count_tokens=count_words))
+    assert len(list(chunks)) == 8
+
+    report = meter.report()
+    assert [row["stage"] for row in report] == ["load", "chunk", "write"]
+    assert report[0]["items"] == 4
+    assert report[1]["items"] == 8
+    assert all(row["mb_per_s"] > 0 for row in report)
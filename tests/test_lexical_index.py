@@ -0,0 +1,67 @@
+"""
+Tests for the BM25 lexical index and rank fusion
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.retrieval.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+
+TEXTS = [
+    "Classroom management tips for new teachers",
+    "The Jadui Pitara activity kit for foundational learning",
+    "Reading circles help teachers build fluency",
+    "ನಲಿ ಕಲಿ activity cards for Kannada medium classes",
+    "Assessment rubrics and classroom observation for teachers",
+]
+
+
+def test_exact_terms_rank_first():
+    index = LexicalIndex.build(TEXTS)
+
+    rows, scores = index.search("jadui pitara", 3)
+    assert rows[0] == 1
+    assert len(rows) == 1
+
+    rows, _ = index.search("ನಲಿ ಕಲಿ cards", 2)
+    assert rows[0] == 3
+
+    rows, scores = index.search("classroom teachers", 5)
+    assert set(rows[:2]) == {0, 4}
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_unknown_terms_return_nothing():
+    rows, scores = LexicalIndex.build(TEXTS).search("photosynthesis", 3)
+    assert len(rows) == len(scores) == 0
+
+
+def test_save_load_round_trip(tmp_path):
+    index = LexicalIndex.build(TEXTS)
+    path = str(tmp_path / "lexical.npz")
+    index.save(path)
+    loaded = LexicalIndex.load(path)
+
+    assert len(loaded) == len(TEXTS)
+    for query in ("reading fluency", "activity", "ನಲಿ"):
+        assert list(loaded.search(query, 3)[0]) == list(index.search(query, 3)[0])
+
+
+def test_tokenizer_keeps_indic_words_whole():
+    assert tokenize("ಕನ್ನಡ ಪಠ್ಯ, हिंदी Text") == ["ಕನ್ನಡ", "ಪಠ್ಯ", "हिंदी", "text"]
+
+
+def test_common_terms_do_not_outweigh_rare_ones():
+    texts = [f"teachers note {i}" for i in range(20)] + ["teachers pitara"]
+    rows, _ = LexicalIndex.build(texts).search("teachers pitara", 1)
+    assert rows[0] == 20
+
+
+def test_reciprocal_rank_fusion():
+    rows, scores = reciprocal_rank_fusion([[5, 2, -1], [2, 9]], top_k=3, k=60)
+
+    assert rows == [2, 5, 9]
+    assert scores[0] == 1 / 62 + 1 / 61
@@ -0,0 +1,123 @@
+"""
+Tests for the async LLM client wrapper
+Upstream calls are replaced with a fake coroutine, no network needed
+"""
+
+import asyncio
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rag.llm import FALLBACK_ANSWER, LLMConfig, ThinkStripper
+from app.translation.translator import TranslationCache
+
+
+def _fake_completion(content):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+
+def test_async_calls_respect_concurrency_cap():
+    llm = LLMConfig(api_key="test-key", max_concurrency=3, translation_cache=TranslationCache())
+    in_flight = 0
+    peak = 0
+
+    async def fake_create(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _fake_completion("<think>plan</think>Use group work and short recaps.")
+
+    llm.async_client.chat.completions.create = fake_create
+
+    async def run():
+        return await asyncio.gather(*(llm.agenerate("q") for _ in range(20)))
+
+    answers = asyncio.run(run())
+
+    assert peak == 3
+    assert answers == ["Use group work and short recaps."] * 20
+
+
+def test_atranslate_skips_upstream_for_english():
+    llm = LLMConfig(api_key="test-key", translation_cache=TranslationCache())
+
+    async def fail_create(**kwargs):
+        raise AssertionError("English must not be translated")
+
+    llm.async_client.chat.completions.create = fail_create
+
+    assert asyncio.run(llm.atranslate("Hello", "English")) == "Hello"
+
+
+def _strip_in_pieces(text, size):
+    stripper = ThinkStripper()
+    out = [stripper.feed(text[i:i + size]) for i in range(0, len(text), size)]
+    out.append(stripper.flush())
+    return "".join(out)
+
+
+def test_think_stripper_matches_full_string_cleaning():
+    llm = LLMConfig(api_key="test-key", translation_cache=TranslationCache())
+    raw = "<think>\nweigh options <b> </thin\n</think>\n\nStart with a <i>story</i>. Then <think>x</think>ask why."
+
+    for size in (1, 2, 3, 7, len(raw)):
+        assert _strip_in_pieces(raw, size) == llm._clean_response(raw)
+
+
+def test_think_stripper_drops_unterminated_reasoning():
+    assert _strip_in_pieces("Answer first. <think>never closed", 4).strip() == "Answer first."
+
+
+def _fake_stream(pieces):
+    async def stream():
+        for piece in pieces:
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))]
+            )
+    return stream()
+
+
+def test_astream_generate_streams_and_falls_back():
+    llm = LLMConfig(api_key="test-key", translation_cache=TranslationCache())
+    pieces = ["<thi", "nk>hmm</th", "ink>Use ", "peer tutoring ", "and ", "recaps."]
+
+    async def create(**kwargs):
+        return _fake_stream(pieces)
+
+    async def collect():
+        return [t async for t in llm.astream_generate("q")]
+
+    llm.async_client.chat.completions.create = create
+    streamed = asyncio.run(collect())
+    assert "".join(streamed) == "Use peer tutoring and recaps."
+    assert len(streamed) > 1
+
+    pieces = ["<think>x</think>", "Ok."]
+    assert asyncio.run(collect()) == [FALLBACK_ANSWER]
+
+
+def test_token_usage_is_recorded():
+    from app.utils.metrics import metrics
+
+    llm = LLMConfig(api_key="test-key", translation_cache=TranslationCache())
+    usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+
+    async def fake_create(**kwargs):
+        response = _fake_completion("Use group work and short recaps.")
+        response.usage = usage
+        return response
+
+    llm.async_client.chat.completions.create = fake_create
+    before = metrics.snapshot()["counters"].get("llm.prompt_tokens", 0)
+
+    asyncio.run(llm.agenerate("q"))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["llm.prompt_tokens"] == before + 120
+    assert snapshot["latency"]["llm.completion_tokens.generate"]["count"] >= 1
@@ -0,0 +1,117 @@
+"""
+Tests for metadata-filtered retrieval: precomputed ID sets, FAISS selector
+search across index types and the lexical side
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.retrieval.chunk_store import ChunkStore, write_chunk_store
+from app.retrieval.index_factory import (
+    build_index,
+    exact_subset_search,
+    selector_search_params,
+)
+from app.retrieval.lexical_index import LexicalIndex
+from app.retrieval.metadata_filter import MetadataFilterIndex, filters_key
+
+FIELDS = ["language", "grade", "source"]
+
+
+def _chunks():
+    chunks = []
+    for i in range(200):
+        chunks.append({
+            "text": f"chunk {i} about {'fractions' if i % 2 else 'reading'}",
+            "metadata": {
+                "language": "Hindi" if i % 4 == 0 else "English",
+                "grade": 6 + i % 3,
+                "source": f"module{i % 5}.pdf",
+            },
+        })
+    chunks[7]["metadata"]["also_in"] = [{"source": "extra.pdf", "grade": 6}]
+    return chunks
+
+
+def _vectors(n, d=32, seed=0):
+    x = np.random.default_rng(seed).standard_normal((n, d)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def _expected(chunks, predicate):
+    return {i for i, c in enumerate(chunks) if predicate(c["metadata"])}
+
+
+def test_and_across_fields_or_within_field(tmp_path):
+    chunks = _chunks()
+    write_chunk_store(chunks, str(tmp_path))
+    index = MetadataFilterIndex.build(ChunkStore(str(tmp_path)).metadata_groups(), fields=FIELDS)
+
+    match = index.match({"language": "hindi", "grade": ["6", 7]})
+    assert set(match.rows.tolist()) == _expected(
+        chunks, lambda m: m["language"] == "Hindi" and m["grade"] in (6, 7)
+    )
+    assert list(match.rows) == sorted(match.rows)
+
+    # Merged near-duplicates are found under every copy's metadata
+    assert set(index.match({"source": "extra.pdf"}).rows.tolist()) == {7}
+
+    assert len(index.match({"grade": 12})) == 0
+    assert len(index.match({"subject": "math"})) == 0
+    assert index.match({}) is None and index.match({"grade": []}) is None
+
+
+def test_filters_key_ignores_order_case_and_type():
+    assert filters_key({"grade": [7, "6"], "language": "Hindi"}) == filters_key(
+        {"language": "hindi", "grade": ["6", 7]}
+    )
+    assert filters_key(None) == "" and filters_key({"grade": None}) == ""
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "ivf_pq", "hnsw"])
+def test_filtered_search_returns_only_matches(index_type):
+    chunks = _chunks()
+    vectors = _vectors(len(chunks))
+    ids = np.arange(len(chunks), dtype="int64") * 1_000_003 + 17
+    index, _ = build_index(vectors, index_type, {"nprobe": 64}, ids=ids)
+
+    groups = ((c["metadata"], np.array([i])) for i, c in enumerate(chunks))
+    match = MetadataFilterIndex.build(groups, labels=ids, fields=FIELDS).match(
+        {"language": "Hindi", "grade": 6}
+    )
+    allowed = set(ids[match.rows].tolist())
+
+    # Queries are non-matching chunks: a post-filtered top-k would come back empty
+    queries = vectors[[1, 2, 3]]
+    _, labels = index.search(queries, 5, params=selector_search_params(index, match.selector))
+
+    found = labels[labels >= 0]
+    assert len(found) > 0
+    assert set(found.tolist()) <= allowed
+
+
+def test_exact_subset_search_matches_brute_force():
+    vectors = _vectors(100)
+    rows = np.array([3, 10, 42, 77], dtype="int64")
+    scores, top = exact_subset_search(vectors[:2], rows, vectors, 2)
+
+    expected = rows[np.argsort(-(vectors[:2] @ vectors[rows].T), axis=1)[:, :2]]
+    assert np.array_equal(top, expected)
+    assert scores.shape == (2, 2)
+
+
+def test_lexical_search_respects_allowed_rows():
+    texts = [c["text"] for c in _chunks()]
+    lexical = LexicalIndex.build(texts)
+
+    allowed = np.array([1, 5, 9], dtype="int64")
+    rows, _ = lexical.search("fractions", 10, allowed)
+    assert set(rows.tolist()) == {1, 5, 9}
+
+    rows, _ = lexical.search("fractions", 10, np.array([0, 2], dtype="int64"))
+    assert len(rows) == 0
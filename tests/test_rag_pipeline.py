@@ -0,0 +1,77 @@
+"""
+Tests for RAGPipeline responses handed to concurrent and cached callers
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conftest import FakeLLM
+
+
+QUERY = "How do I teach fractions?"
+
+
+class SlowLLM(FakeLLM):
+    """Holds generate() until released, so duplicates pile up behind it"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def generate(self, prompt, temperature=0.3, max_tokens=450):
+        self.release.wait(5)
+        return super().generate(prompt, temperature, max_tokens)
+
+
+def test_coalesced_callers_get_independent_sources(make_pipeline):
+    llm = SlowLLM()
+    pipeline = make_pipeline(llm=llm)
+    responses = []
+
+    def ask():
+        responses.append(pipeline.query(QUERY, return_sources=True))
+
+    threads = [threading.Thread(target=ask) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    # Let the duplicates join the first call before it finishes
+    time.sleep(0.1)
+    llm.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(llm.calls) == 1
+    responses[0]["sources"][0]["metadata"]["grade"] = 99
+    responses[0]["sources"].clear()
+    assert responses[1]["sources"][0]["metadata"] == {"grade": 2}
+    assert responses[2]["sources"][0]["metadata"] == {"grade": 2}
+
+
+def test_async_coalesced_callers_get_independent_sources(make_pipeline):
+    pipeline = make_pipeline(llm=FakeLLM(delay=0.02))
+
+    async def run():
+        return await asyncio.gather(
+            *(pipeline.aquery(QUERY, return_sources=True) for _ in range(3))
+        )
+
+    first, second, _ = asyncio.run(run())
+    first["sources"][0]["metadata"]["grade"] = 99
+
+    assert second["sources"][0]["metadata"] == {"grade": 2}
+
+
+def test_cache_hits_do_not_share_the_cached_sources(make_pipeline):
+    pipeline = make_pipeline(semantic_cache=True)
+    pipeline.query(QUERY, return_sources=True)
+
+    hit = pipeline.query(QUERY, return_sources=True)
+    hit["sources"][0]["metadata"]["grade"] = 99
+
+    assert len(pipeline.llm.calls) == 1
+    assert pipeline.query(QUERY, return_sources=True)["sources"][0]["metadata"] == {"grade": 2}
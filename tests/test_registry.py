@@ -0,0 +1,129 @@
+"""
+Tests for the process-wide model / index registry
+"""
+
+import sys
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.registry as registry_module
+from app.registry import Registry
+
+
+def test_concurrent_callers_share_one_load(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def slow_llm(provider):
+        with lock:
+            calls.append(provider)
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr(registry_module, "_load_llm", slow_llm)
+    registry = Registry()
+
+    with ThreadPoolExecutor(8) as pool:
+        clients = list(pool.map(lambda _: registry.llm("groq"), range(8)))
+
+    assert calls == ["groq"]
+    assert all(c is clients[0] for c in clients)
+    assert registry.status()["components"]["llm:groq"]["state"] == "ready"
+
+
+def test_failed_load_is_reported_and_retried(monkeypatch):
+    attempts = []
+
+    def flaky_llm(provider):
+        attempts.append(provider)
+        if len(attempts) == 1:
+            raise ValueError("GROQ_API_KEY not found")
+        return object()
+
+    monkeypatch.setattr(registry_module, "_load_llm", flaky_llm)
+    registry = Registry()
+
+    with pytest.raises(ValueError):
+        registry.llm()
+    status = registry.status()["components"]["llm:groq"]
+    assert status == {"state": "failed", "error": "GROQ_API_KEY not found"}
+
+    registry.llm()
+    assert registry.status()["components"]["llm:groq"]["state"] == "ready"
+    assert not registry.is_ready()
+
+
+def test_vector_store_fetches_the_model_on_first_use(monkeypatch, tmp_path):
+    from app.retrieval.vector_store import VectorStore
+
+    class Model:
+        dimension, variant, cache_key = 8, "onnx", "m@onnx"
+
+    loads = []
+    monkeypatch.setattr(
+        registry_module, "_load_embedding_model", lambda name, backend: loads.append(name) or Model()
+    )
+
+    # A store can be created (and preloaded before fork) without a model session
+    store = VectorStore(embedding_model_name="lazy-test-model", index_dir=str(tmp_path))
+    assert loads == []
+
+    assert store.dimension == 8
+    assert loads == ["lazy-test-model"]
+
+
+def test_not_ready_until_the_embedding_model_has_loaded(monkeypatch):
+    registry = Registry()
+
+    class Store:
+        # Like a store with a loaded index: only encoding needs the model
+        def embed_queries(self, queries):
+            registry.embedding_model()
+
+    class Pipeline:
+        vector_store = Store()
+
+    def slow_model(name, backend):
+        time.sleep(0.3)
+        return object()
+
+    monkeypatch.setattr(registry_module, "_load_rag_pipeline", Pipeline)
+    monkeypatch.setattr(registry_module, "_load_embedding_model", slow_model)
+
+    # Without warm-up: a loaded pipeline alone is not enough
+    registry.rag_pipeline()
+    assert not registry.is_ready()
+
+    warm_up = registry.start_warm_up()
+    while warm_up.is_alive():
+        ready = registry.is_ready()
+        model_states = [
+            c["state"] for name, c in registry.status()["components"].items()
+            if name.startswith("embedding_model:")
+        ]
+        if ready:
+            assert model_states == ["ready"]
+        time.sleep(0.01)
+
+    assert registry.is_ready()
+
+
+def test_importing_the_app_does_not_load_models():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = (
+        "import sys, app.main; "
+        "print(any(m in sys.modules for m in ('torch', 'sentence_transformers')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=root, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "False"
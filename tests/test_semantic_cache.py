@@ -0,0 +1,59 @@
+"""
+Tests for the semantic answer cache
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rag.semantic_cache import SemanticCache
+
+
+def _unit(*values):
+    v = np.array(values, dtype="float32")
+    return v / np.linalg.norm(v)
+
+
+def test_similar_query_same_language_hits():
+    cache = SemanticCache(dimension=3, threshold=0.9)
+    cache.store(_unit(1, 0, 0), "English", {"answer": "A", "sources": []}, "v1")
+
+    assert cache.lookup(_unit(1, 0.1, 0), "English", "v1") == {"answer": "A", "sources": []}
+    assert cache.lookup(_unit(1, 0.1, 0), "Hindi", "v1") is None
+    assert cache.lookup(_unit(0, 1, 0), "English", "v1") is None
+
+
+def test_ttl_expiry_and_lru_bound():
+    cache = SemanticCache(dimension=3, threshold=0.9, max_entries=2, ttl_seconds=0)
+    cache.store(_unit(1, 0, 0), "English", {"answer": "A", "sources": []})
+    assert cache.lookup(_unit(1, 0, 0), "English") is None
+    assert len(cache) == 0
+
+    cache = SemanticCache(dimension=3, threshold=0.9, max_entries=2)
+    cache.store(_unit(1, 0, 0), "English", {"answer": "A", "sources": []})
+    cache.store(_unit(0, 1, 0), "English", {"answer": "B", "sources": []})
+    cache.lookup(_unit(1, 0, 0), "English")
+    cache.store(_unit(0, 0, 1), "English", {"answer": "C", "sources": []})
+
+    assert len(cache) == 2
+    assert cache.lookup(_unit(0, 1, 0), "English") is None
+    assert cache.lookup(_unit(1, 0, 0), "English")["answer"] == "A"
+
+
+def test_index_rebuild_invalidates_entries():
+    cache = SemanticCache(dimension=3, threshold=0.9)
+    cache.store(_unit(1, 0, 0), "English", {"answer": "A", "sources": []}, "v1")
+
+    assert cache.lookup(_unit(1, 0, 0), "English", "v2") is None
+    assert len(cache) == 0
+
+
+def test_scope_must_match():
+    cache = SemanticCache(dimension=3, threshold=0.9)
+    cache.store(_unit(1, 0, 0), "English", {"answer": "A", "sources": []}, "v1", scope='{"grade": ["6"]}')
+
+    assert cache.lookup(_unit(1, 0, 0), "English", "v1") is None
+    assert cache.lookup(_unit(1, 0, 0), "English", "v1", scope='{"grade": ["6"]}')["answer"] == "A"
@@ -0,0 +1,84 @@
+"""
+Tests for request coalescing (single-flight)
+"""
+
+import asyncio
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.helpers import normalize_query
+from app.utils.metrics import metrics
+from app.utils.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_async_duplicates_share_one_call():
+    metrics.reset()
+    flight = AsyncSingleFlight("test_async")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"answer": "shared"}
+
+    async def run():
+        key = normalize_query("How to teach  Fractions?")
+        return await asyncio.gather(*(flight.do(key, work) for _ in range(25)))
+
+    results = asyncio.run(run())
+
+    assert calls == 1
+    assert all(r == {"answer": "shared"} for r in results)
+    assert metrics.snapshot()["counters"]["singleflight.test_async.coalesced"] == 24
+
+
+def test_async_errors_reach_every_waiter():
+    flight = AsyncSingleFlight("test_async_error")
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("k", work) for _ in range(5)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_threaded_duplicates_share_one_call_and_errors():
+    flight = SingleFlight("test_sync")
+    calls = 0
+    started = threading.Event()
+
+    def work():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.05)
+        return 42
+
+    with ThreadPoolExecutor(8) as pool:
+        leader = pool.submit(flight.do, "k", work)
+        started.wait()
+        followers = [pool.submit(flight.do, "k", work) for _ in range(7)]
+        assert leader.result() == 42
+        assert [f.result() for f in followers] == [42] * 7
+
+    assert calls == 1
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
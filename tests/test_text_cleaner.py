@@ -0,0 +1,57 @@
+"""
+Tests for the single-pass text cleaning engine
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingestion.text_cleaner import DEFAULT_RULES, TextCleaner
+
+
+def test_stopwords_are_removed_as_whole_words_only():
+    cleaner = TextCleaner.from_rules(DEFAULT_RULES)
+
+    text = "A policymaker read the policy framework and frameworks."
+    assert cleaner.clean(text) == "A policymaker read the and frameworks."
+
+
+def test_stopword_case_rules():
+    cleaner = TextCleaner.from_rules(DEFAULT_RULES)
+
+    # lowercase entries match any case, capitalised entries match exactly
+    assert cleaner.clean("Policy POLICY policy") == ""
+    assert cleaner.clean("NEP says nep") == "says nep"
+
+
+def test_whitespace_numbers_and_phrases_in_one_pass():
+    cleaner = TextCleaner.from_rules(DEFAULT_RULES)
+
+    text = "  Page 57\n\nsee  Guidelines\nfor   implementation\tin 2020  "
+    assert cleaner.clean(text) == "Page see in 2020"
+
+
+def test_rules_load_from_file(tmp_path):
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({
+        "drop_patterns": [r"\[\d+\]"],
+        "stopwords": ["Chapter"],
+        "collapse_whitespace": False,
+    }))
+    cleaner = TextCleaner.from_file(str(rules))
+
+    assert cleaner.clean("Chapter one[12]  ends") == "one  ends"
+
+
+def test_clean_pages_keeps_metadata():
+    cleaner = TextCleaner(stopwords=["draft"])
+    pages = [
+        {"text": "draft", "metadata": {"page": 1}},
+        {"text": "final  text", "metadata": {"page": 2}},
+    ]
+
+    assert list(cleaner.clean_pages(pages)) == [
+        {"text": "final text", "metadata": {"page": 2}}
+    ]
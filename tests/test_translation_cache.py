@@ -0,0 +1,137 @@
+"""
+Tests for the two-tier translation cache
+"""
+
+import asyncio
+import sqlite3
+import sys
+import os
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rag.llm import LLMConfig
+from app.translation.translator import TranslationCache
+
+
+def test_lru_eviction_and_counters():
+    cache = TranslationCache(max_entries=2)
+    cache.put("one", "Hindi", "m", "एक")
+    cache.put("two", "Hindi", "m", "दो")
+    assert cache.get("one", "Hindi", "m") == "एक"
+
+    cache.put("three", "Hindi", "m", "तीन")
+
+    assert cache.get("two", "Hindi", "m") is None
+    assert cache.get("three", "Hindi", "m") == "तीन"
+    assert cache.stats() == {
+        "hits_memory": 2,
+        "hits_disk": 0,
+        "misses": 1,
+        "memory_entries": 2,
+    }
+
+
+def test_key_normalizes_text_and_separates_language_and_model():
+    cache = TranslationCache()
+    cache.put("Hello  teachers\n", "Kannada", "m1", "ನಮಸ್ಕಾರ ಶಿಕ್ಷಕರೇ")
+
+    assert cache.get(" Hello teachers", "kannada", "m1") == "ನಮಸ್ಕಾರ ಶಿಕ್ಷಕರೇ"
+    assert cache.get("Hello teachers", "Hindi", "m1") is None
+    assert cache.get("Hello teachers", "Kannada", "m2") is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "translations.sqlite3")
+
+    first = TranslationCache(db_path=db_path)
+    first.put("Hello", "Hindi", "m", "नमस्ते")
+    first.close()
+
+    second = TranslationCache(db_path=db_path)
+    assert second.get("Hello", "Hindi", "m") == "नमस्ते"
+    assert second.hits_disk == 1
+    second.close()
+
+
+def test_disk_hits_only_write_when_recency_is_stale(tmp_path):
+    db_path = str(tmp_path / "translations.sqlite3")
+    first = TranslationCache(db_path=db_path)
+    first.put("Hello", "Hindi", "m", "नमस्ते")
+    first.close()
+
+    def disk_hit():
+        # Fresh process: the memory tier is empty, the hit comes from disk
+        cache = TranslationCache(db_path=db_path, touch_interval_seconds=60)
+        assert cache.get("Hello", "Hindi", "m") == "नमस्ते"
+        changes = cache._conn.total_changes
+        last_used = cache._conn.execute("SELECT last_used FROM translations").fetchone()[0]
+        cache.close()
+        return changes, last_used
+
+    assert disk_hit()[0] == 0
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE translations SET last_used = 0")
+    conn.commit()
+    conn.close()
+
+    changes, last_used = disk_hit()
+    assert changes == 1 and last_used > 0
+
+
+def test_repeated_translation_costs_one_upstream_call():
+    llm = LLMConfig(api_key="test-key", translation_cache=TranslationCache())
+    calls = 0
+
+    async def fake_create(**kwargs):
+        nonlocal calls
+        calls += 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="नमस्ते"))]
+        )
+
+    llm.async_client.chat.completions.create = fake_create
+
+    async def run():
+        return [await llm.atranslate("Hello!", "Hindi") for _ in range(5)]
+
+    assert asyncio.run(run()) == ["नमस्ते"] * 5
+    assert calls == 1
+
+
+def test_async_lookups_keep_disk_io_off_the_event_loop(tmp_path):
+    db_path = str(tmp_path / "translations.sqlite3")
+    first = TranslationCache(db_path=db_path)
+    first.put("Hello", "Hindi", "m", "नमस्ते")
+    first.close()
+
+    cache = TranslationCache(db_path=db_path)
+    disk_threads = []
+    for name in ("_disk_get", "_disk_put"):
+        method = getattr(cache, name)
+
+        def traced(*args, method=method):
+            disk_threads.append(threading.get_ident())
+            return method(*args)
+
+        setattr(cache, name, traced)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        from_disk = await cache.aget("Hello", "Hindi", "m")
+        from_memory = await cache.aget("Hello", "Hindi", "m")
+        await cache.aput("Bye", "Hindi", "m", "अलविदा")
+        return loop_thread, from_disk, from_memory
+
+    loop_thread, from_disk, from_memory = asyncio.run(run())
+    cache.close()
+
+    assert from_disk == from_memory == "नमस्ते"
+    assert cache.stats()["hits_disk"] == 1 and cache.stats()["hits_memory"] == 1
+    # One read (the memory hit never reaches disk) and one write
+    assert len(disk_threads) == 2 and loop_thread not in disk_threads
+    reopened = TranslationCache(db_path=db_path)
+    assert reopened.get("Bye", "Hindi", "m") == "अलविदा"
+    reopened.close()
@@ -0,0 +1,129 @@
+"""
+Tests for saving a loaded vector store (in place, to a new directory,
+after an incremental update)
+"""
+
+import sys
+import os
+import json
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.registry as registry_module
+import app.retrieval.vector_store as vector_store_module
+from app import config
+from app.retrieval.vector_store import VECTORS_FILE, VectorStore
+
+
+class HashModel:
+    model_name, variant, cache_key, dimension = "save-test-model", "test", "save-test", 16
+
+    def encode(self, texts, batch_size=32):
+        return np.stack([
+            np.random.default_rng(zlib.crc32(t.encode())).standard_normal(self.dimension)
+            for t in texts
+        ]).astype("float32")
+
+
+def _write_chunks(path, texts):
+    path.write_text("\n".join(json.dumps({"text": t}) for t in texts))
+    return str(path)
+
+
+@pytest.fixture
+def quantized_dir(monkeypatch, tmp_path):
+    """An int8 index (re-scored from vectors.f32) saved in tmp_path/v1"""
+    monkeypatch.setattr(config, "EMBEDDING_CACHE_DIR", "")
+    monkeypatch.setattr(
+        registry_module, "_load_embedding_model", lambda name, backend: HashModel()
+    )
+    chunks_file = _write_chunks(tmp_path / "chunks.jsonl", [f"lesson {i}" for i in range(40)])
+    store = VectorStore(
+        embedding_model_name=HashModel.model_name, chunks_file=chunks_file,
+        index_dir=str(tmp_path / "v1"), index_params={"quantization": "int8"},
+    )
+    store.load_chunks()
+    store.create_embeddings()
+    store.save_index()
+    return tmp_path
+
+
+def _load(index_dir, mmap=False):
+    store = VectorStore(embedding_model_name=HashModel.model_name, index_dir=str(index_dir))
+    store.load_index(mmap=mmap)
+    return store
+
+
+def test_resaving_keeps_full_precision_vectors(quantized_dir):
+    store = _load(quantized_dir / "v1")
+    original = np.array(store.full_vectors)
+
+    store.save_index(str(quantized_dir / "v2"))
+    moved = _load(quantized_dir / "v2")
+    assert moved.full_vectors is not None
+    np.testing.assert_array_equal(np.asarray(moved.full_vectors), original)
+
+    # In place: nothing it reads from is rewritten or dropped
+    moved.save_index()
+    assert os.path.exists(quantized_dir / "v2" / VECTORS_FILE)
+    assert _load(quantized_dir / "v2").search("lesson 3", top_k=1)[0]["text"] == "lesson 3"
+
+
+def test_update_after_resave_still_rescores(quantized_dir):
+    store = _load(quantized_dir / "v1")
+    store.save_index(str(quantized_dir / "v2"))
+
+    store = _load(quantized_dir / "v2")
+    chunks_file = _write_chunks(
+        quantized_dir / "more.jsonl", [f"lesson {i}" for i in range(41)]
+    )
+    store.apply_updates(VectorStore(chunks_file=chunks_file).read_chunks())
+    store.save_index(str(quantized_dir / "v3"))
+
+    updated = _load(quantized_dir / "v3")
+    assert updated.full_vectors is not None and len(updated.full_vectors) == 41
+    assert updated.search("lesson 40", top_k=1)[0]["text"] == "lesson 40"
+
+
+def test_hnsw_removal_rebuilds_from_full_precision_rows(quantized_dir, monkeypatch):
+    chunks_file = str(quantized_dir / "chunks.jsonl")
+    store = VectorStore(
+        embedding_model_name=HashModel.model_name, chunks_file=chunks_file,
+        index_dir=str(quantized_dir / "hnsw"), index_type="hnsw",
+        index_params={"quantization": "int8"},
+    )
+    store.load_chunks()
+    store.create_embeddings()
+    store.save_index()
+
+    rebuilt_from = []
+    remove_ids = vector_store_module.remove_ids
+
+    def spy(index, ids, vectors_of=None):
+        def recorded(keep):
+            rebuilt_from.append((keep, vectors_of(keep)))
+            return rebuilt_from[-1][1]
+        return remove_ids(index, ids, vectors_of=recorded if vectors_of else None)
+
+    monkeypatch.setattr(vector_store_module, "remove_ids", spy)
+    store = _load(quantized_dir / "hnsw")
+    fewer = _write_chunks(quantized_dir / "fewer.jsonl", [f"lesson {i}" for i in range(30)])
+    assert store.apply_updates(VectorStore(chunks_file=fewer).read_chunks())["removed"] == 10
+
+    (keep, vectors), = rebuilt_from
+    np.testing.assert_array_equal(vectors, store.full_vectors[store._id_map.rows(keep)])
+    assert store.search("lesson 7", top_k=1)[0]["text"] == "lesson 7"
+
+
+def test_mmapped_store_refuses_to_overwrite_its_directory(quantized_dir):
+    store = _load(quantized_dir / "v1", mmap=True)
+
+    with pytest.raises(ValueError):
+        store.save_index()
+
+    store.save_index(str(quantized_dir / "v2"))
+    assert _load(quantized_dir / "v2").full_vectors is not None